@@ -0,0 +1,233 @@
+"""
+Benchmarks of the PetroBuffer scalar and batch APIs.
+
+Times each public function on one row (called in a Python loop) and on
+batches of rows, and reports the throughput in rows per second. Results can
+be saved as a JSON baseline, and a later run compared against it, failing
+if any function at any size has slowed by more than a threshold.
+
+Usage
+-----
+    python benchmarks/benchmark.py                           # print results
+    python benchmarks/benchmark.py --save baseline.json      # save a baseline
+    python benchmarks/benchmark.py --compare baseline.json   # exit 1 on a regression
+    python benchmarks/benchmark.py --sizes 1 1000 --only calcBuffer
+
+Baselines are specific to the machine they were recorded on, so compare
+runs from the same machine only. The batch composition benchmarks at 10^7
+rows need around 4 GB of memory.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import warnings
+
+import numpy as np
+import petrobuffer as pb
+from petrobuffer import calibration
+from petrobuffer import core
+from petrobuffer import ferric
+
+default_sizes = [1, 10**3, 10**6, 10**7]
+
+# least time spent timing each function at each size, in seconds
+min_time = 0.2
+
+# the low and high iron melts of the test suite
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'tests'))
+from conftest import high_iron, low_iron
+
+# ------------------------------ INPUTS ------------------------------------
+
+def _inputs(n, seed=0):
+    """
+    Returns the inputs for n rows: T, P, fO2, compositions with total iron
+    as FeO (a mix of low and high iron melts) and with FeO and Fe2O3, and
+    the matching mole fractions.
+    """
+    if n == 1:
+        _, comp_fe2o3 = pb.get_ironOxide(dict(low_iron), -1, 1473.15, 1e4, buffer='FMQ')
+        return {'T': 1473.15, 'P': 1e4, 'fO2': -1.0, 'comp': dict(low_iron),
+                'comp_fe2o3': comp_fe2o3,
+                'mol': core.wtOxides_to_molOxides({k.lower(): v for k, v in low_iron.items()}),
+                'mol_fe2o3': core.wtOxides_to_molOxides(
+                    {k.lower(): v for k, v in comp_fe2o3.items()})}
+
+    rng = np.random.default_rng(seed)
+    T = rng.uniform(1273.15, 1673.15, n)
+    P = rng.uniform(1, 3e4, n)
+    fO2 = rng.uniform(-3, 2, n)
+    high = rng.random(n) < 0.1
+    comp = {k: np.where(high, high_iron[k], low_iron[k]) for k in low_iron}
+    _, comp_fe2o3 = pb.get_ironOxide_batch(comp, fO2, T, P, buffer='FMQ')
+    melt = pb.MeltComposition.from_dict(comp)
+    melt_fe2o3 = pb.MeltComposition.from_dict(comp_fe2o3)
+
+    return {'T': T, 'P': P, 'fO2': fO2, 'comp': comp, 'comp_fe2o3': comp_fe2o3,
+            'mol': melt.to_dict(mol=True), 'mol_fe2o3': melt_fe2o3.to_dict(mol=True)}
+
+# ------------------------------ BENCHMARKS --------------------------------
+
+# name: (scalar call, batch call), each a function of the inputs returning a
+# function of no arguments which runs the benchmark once
+benchmarks = {
+    'calcBuffer': (
+        lambda x: lambda: pb.buffers.calcBuffer('FMQ', x['T'], x['P']),
+        lambda x: lambda: pb.buffers.calcBuffer('FMQ', x['T'], x['P'])),
+    'convert_buffer': (
+        lambda x: lambda: pb.convert_buffer(x['fO2'], 'FMQ', 'IW', x['T'], x['P']),
+        lambda x: lambda: pb.convert_buffer(x['fO2'], 'FMQ', 'IW', x['T'], x['P'])),
+    'get_ironOxide': (
+        lambda x: lambda: pb.get_ironOxide(dict(x['comp']), x['fO2'], x['T'], x['P'],
+                                           buffer='FMQ'),
+        lambda x: lambda: pb.get_ironOxide_batch(x['comp'], x['fO2'], x['T'], x['P'],
+                                                 buffer='FMQ')),
+    'get_meltfO2': (
+        lambda x: lambda: pb.get_meltfO2(dict(x['comp_fe2o3']), x['T'], x['P'], buffer='FMQ'),
+        lambda x: lambda: pb.get_meltfO2_batch(x['comp_fe2o3'], x['T'], x['P'],
+                                               buffer='FMQ')),
+    'fo2_to_iron_kc91': (
+        lambda x: lambda: ferric.fo2_to_iron_kc91(x['mol'], x['T'], core.bar_to_pa(x['P']),
+                                                  x['fO2']*2.302585),
+        None),
+    'iron_to_fo2_kc91': (
+        lambda x: lambda: ferric.iron_to_fo2_kc91(x['mol_fe2o3'], x['T'],
+                                                  core.bar_to_pa(x['P'])),
+        None),
+    'fo2_to_iron_r13': (
+        lambda x: lambda: ferric.fo2_to_iron_r13(x['mol'], x['T'], core.bar_to_gpa(x['P']),
+                                                 x['fO2']*2.302585),
+        None),
+    'iron_to_fo2_r13': (
+        lambda x: lambda: ferric.iron_to_fo2_r13(x['mol_fe2o3'], x['T'],
+                                                 core.bar_to_gpa(x['P'])),
+        None),
+}
+
+def _time(run, n):
+    """Returns the best throughput of `run` over repeats taking `min_time`."""
+    run()    # warm up
+    best, total, calls = float('inf'), 0.0, 1
+    while total < min_time:
+        start = time.perf_counter()
+        for _ in range(calls):
+            run()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed/calls)
+        total += elapsed
+        if elapsed < min_time/10:
+            calls *= 10    # time more calls at once when each is very quick
+    return n/best
+
+def run_benchmarks(sizes=default_sizes, only=None, out=sys.stdout):
+    """
+    Runs the benchmarks, printing each result as it is measured.
+
+    Parameters
+    ----------
+    sizes : list of int
+        Numbers of rows. Size 1 times single scalar calls.
+    only : list of str, optional
+        Names of the benchmarks to run. Defaults to all of them.
+    out : file, optional
+        Where to print the results. Nothing is printed if None.
+
+    Returns
+    -------
+    dict
+        {benchmark name: {size: rows per second}}
+    """
+    names = list(benchmarks) if only is None else only
+    results = {name: {} for name in names}
+    for n in sizes:
+        inputs = _inputs(n)
+        for name in names:
+            scalar, batch = benchmarks[name]
+            make = scalar if n == 1 or batch is None else batch
+            rate = _time(make(inputs), n)
+            results[name][str(n)] = rate
+            if out is not None:
+                print(f"{name:<20} {n:>10} rows {rate:>14.4g} rows/s", file=out, flush=True)
+        del inputs
+    return results
+
+def environment():
+    """Describes the machine and versions a set of results was recorded with."""
+    return {'python': platform.python_version(), 'numpy': np.__version__,
+            'machine': platform.machine(), 'processor': platform.processor(),
+            'system': platform.platform()}
+
+# ------------------------------ BASELINES ---------------------------------
+
+def save(results, path):
+    """Saves results, with the environment they were recorded in, as JSON."""
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2)
+
+def compare(results, baseline, threshold):
+    """
+    Compares results to a baseline.
+
+    Parameters
+    ----------
+    results : dict
+        {benchmark name: {size: rows per second}}
+    baseline : dict
+        A baseline loaded from JSON, as written by `save`.
+    threshold : float
+        Largest permitted fractional drop in throughput, e.g. 0.25 fails
+        any path running at less than 75% of its baseline speed.
+
+    Returns
+    -------
+    list of tuple
+        (name, size, baseline rows/s, new rows/s, ratio) of every path which
+        has regressed by more than `threshold`.
+    """
+    regressions = []
+    for name, sizes in results.items():
+        for size, rate in sizes.items():
+            old = baseline['results'].get(name, {}).get(size)
+            if old is not None and rate < old*(1 - threshold):
+                regressions.append((name, size, old, rate, rate/old))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the PetroBuffer APIs.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=default_sizes,
+                        help="Numbers of rows to time (default 1 1000 1000000 10000000).")
+    parser.add_argument('--only', nargs='+', choices=list(benchmarks),
+                        help="Benchmarks to run (default all).")
+    parser.add_argument('--save', help="Save the results as a JSON baseline.")
+    parser.add_argument('--compare', help="Compare the results with a JSON baseline.")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="Largest permitted fractional slowdown (default 0.25).")
+    args = parser.parse_args(argv)
+    # the random conditions stray outside the calibrations; the check still runs
+    warnings.simplefilter('ignore', calibration.CalibrationWarning)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = run_benchmarks(args.sizes, args.only)
+    if args.save:
+        save(results, args.save)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for name, size, old, new, ratio in regressions:
+            print(f"REGRESSION {name} at {size} rows: {old:.4g} -> {new:.4g} rows/s"
+                  f" ({ratio:.0%} of baseline)", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} of {args.compare}.")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
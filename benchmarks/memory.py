@@ -0,0 +1,189 @@
+"""
+Memory profile of the PetroBuffer conversion pipelines.
+
+Measures, with `tracemalloc`, the peak memory of `get_ironOxide` and
+`get_meltfO2` in scalar and batch form, and of each stage of the batch
+pipelines (wt% -> mole fractions -> ferric model -> recalculated wt%).
+NumPy reports its array allocations to `tracemalloc`, so the peaks include
+every temporary array.
+
+Each stage's peak is also given as a number of temporaries: the peak in
+bytes divided by the size of the stage's inputs. A stage is flagged when
+it allocates more than `--max-temporaries` per input array, and the run
+then exits with status 1.
+
+Usage
+-----
+    python benchmarks/memory.py --rows 100000
+    python benchmarks/memory.py --rows 100000 --max-temporaries 4
+"""
+import argparse
+import sys
+import tracemalloc
+import warnings
+
+import numpy as np
+import petrobuffer as pb
+from petrobuffer import calibration
+from petrobuffer import buffers
+from petrobuffer import conversions
+from petrobuffer import core
+
+from benchmark import _inputs
+
+default_rows = 10**5
+default_max_temporaries = 4
+
+def _measure(run):
+    """Returns the result of run() and the peak memory it allocated, in bytes."""
+    tracemalloc.start()    # starting afresh also resets the peak
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        result = run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak - start
+
+def _nbytes(*arrays):
+    """Total size of the array inputs of a stage, ignoring scalars."""
+    total = 0
+    for a in arrays:
+        if isinstance(a, pb.MeltComposition):
+            total += a.wt.nbytes
+        elif isinstance(a, dict):
+            total += sum(np.asarray(v).nbytes for v in a.values())
+        else:
+            total += np.asarray(a).nbytes
+    return total
+
+# ------------------------------ STAGES ------------------------------------
+
+def ironOxide_stages(x):
+    """
+    Runs the stages of `get_ironOxide_batch` one at a time, yielding the
+    name, peak memory and input size of each.
+    """
+    (melt, names), peak = _measure(lambda: conversions._batch_composition(x['comp']))
+    yield 'composition', peak, _nbytes(x['comp'])
+
+    (melt, use_kc91), peak = _measure(lambda: conversions._total_iron_composition(melt))
+    yield 'normalisation', peak, _nbytes(melt)
+
+    mol, peak = _measure(lambda: melt.mol)
+    yield 'mole conversion', peak, _nbytes(melt)
+
+    buffer, peak = _measure(lambda: buffers.calcBuffer_array('FMQ', x['T'], x['P']))
+    yield 'buffer offset', peak, _nbytes(x['T'], x['P'])
+
+    lnfO2 = (x['fO2'] + buffer)*np.log(10)
+    F, peak = _measure(lambda: conversions._dispatch(use_kc91, conversions._iron_kernels,
+                                                     melt, x['T'], x['P'], lnfO2))
+    yield 'model evaluation', peak, _nbytes(mol, x['T'], x['P'], lnfO2)
+
+    def recalculate():
+        mol_new = mol.copy()
+        i_feo, i_fe2o3 = core.oxideIndex['feo'], core.oxideIndex['fe2o3']
+        mol_new[:, i_feo] = mol_new[:, i_feo]/(2*F + 1)
+        mol_new[:, i_fe2o3] = mol_new[:, i_feo]*F
+        return core.molOxides_to_wtOxides_array(mol_new, out=mol_new)
+    _, peak = _measure(recalculate)
+    yield 'recalculated wt%', peak, _nbytes(mol, F)
+
+def meltfO2_stages(x):
+    """
+    Runs the stages of `get_meltfO2_batch` one at a time, yielding the
+    name, peak memory and input size of each.
+    """
+    (melt, names), peak = _measure(lambda: conversions._batch_composition(x['comp_fe2o3']))
+    yield 'composition', peak, _nbytes(x['comp_fe2o3'])
+
+    use_kc91, peak = _measure(lambda: conversions._ferric_models(melt))
+    yield 'model selection', peak, _nbytes(melt)
+
+    mol, peak = _measure(lambda: melt.mol)
+    yield 'mole conversion', peak, _nbytes(melt)
+
+    _, peak = _measure(lambda: conversions._dispatch(use_kc91, conversions._fo2_kernels,
+                                                     melt, x['T'], x['P']))
+    yield 'model evaluation', peak, _nbytes(mol, x['T'], x['P'])
+
+    _, peak = _measure(lambda: buffers.calcBuffer_array('FMQ', x['T'], x['P']))
+    yield 'buffer offset', peak, _nbytes(x['T'], x['P'])
+
+pipelines = {'get_ironOxide': (
+                 lambda x: pb.get_ironOxide(dict(x['comp']), x['fO2'], x['T'], x['P'],
+                                            buffer='FMQ'),
+                 lambda x: pb.get_ironOxide_batch(x['comp'], x['fO2'], x['T'], x['P'],
+                                                  buffer='FMQ'),
+                 ironOxide_stages),
+             'get_meltfO2': (
+                 lambda x: pb.get_meltfO2(dict(x['comp_fe2o3']), x['T'], x['P'], buffer='FMQ'),
+                 lambda x: pb.get_meltfO2_batch(x['comp_fe2o3'], x['T'], x['P'],
+                                                buffer='FMQ'),
+                 meltfO2_stages)}
+
+def profile(rows=default_rows, max_temporaries=default_max_temporaries, out=sys.stdout):
+    """
+    Profiles the memory of each pipeline, printing a report.
+
+    Parameters
+    ----------
+    rows : int
+        Number of rows in the batch runs.
+    max_temporaries : float
+        Largest permitted peak allocation of a stage, in multiples of the
+        size of its inputs.
+    out : file, optional
+        Where to print the report. Nothing is printed if None.
+
+    Returns
+    -------
+    list of tuple
+        (pipeline, stage, temporaries per input) of every flagged stage.
+    """
+    scalar_inputs, batch_inputs = _inputs(1), _inputs(rows)
+    flagged = []
+
+    def report(text):
+        if out is not None:
+            print(text, file=out)
+
+    for name, (scalar, batch, stages) in pipelines.items():
+        _, scalar_peak = _measure(lambda: scalar(scalar_inputs))
+        _, batch_peak = _measure(lambda: batch(batch_inputs))
+        report(f"{name}")
+        report(f"  scalar peak {scalar_peak:>12,d} B")
+        report(f"  batch  peak {batch_peak:>12,d} B  ({batch_peak/rows:,.0f} B/row)")
+
+        for stage, peak, input_bytes in stages(batch_inputs):
+            temporaries = peak/input_bytes if input_bytes else 0.0
+            flag = temporaries > max_temporaries
+            if flag:
+                flagged.append((name, stage, temporaries))
+            report(f"    {stage:<18} {peak:>12,d} B  {peak/rows:>6,.0f} B/row"
+                   f"  {temporaries:5.2f} x inputs{'  FLAGGED' if flag else ''}")
+
+    return flagged
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile the memory of PetroBuffer's\
+         conversion pipelines.")
+    parser.add_argument('--rows', type=int, default=default_rows,
+                        help=f"Number of rows in the batch runs (default {default_rows}).")
+    parser.add_argument('--max-temporaries', type=float, default=default_max_temporaries,
+                        help="Largest permitted stage allocation, in multiples of the size of\
+                             its inputs (default %(default)s).")
+    args = parser.parse_args(argv)
+    # the random conditions stray outside the calibrations; the check still runs
+    warnings.simplefilter('ignore', calibration.CalibrationWarning)
+
+    flagged = profile(args.rows, args.max_temporaries)
+    for name, stage, temporaries in flagged:
+        print(f"FLAGGED {name}: '{stage}' allocates {temporaries:.2f} x its inputs"
+              f" (limit {args.max_temporaries})", file=sys.stderr)
+
+    return 1 if flagged else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Start-up time of PetroBuffer's scalar path.
+
+Times, in a fresh interpreter, importing petrobuffer and calculating one
+scalar buffer value, which should not import NumPy. The best of several
+runs is compared against a budget, and the run exits with status 1 if it
+is over budget or NumPy was imported.
+
+Usage
+-----
+    python benchmarks/startup.py
+    python benchmarks/startup.py --budget 0.05 --repeats 5
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+# seconds allowed to import petrobuffer and calculate one scalar buffer value,
+# in a fresh interpreter (about a quarter of the time taken to import NumPy)
+default_budget = 0.05
+
+_scalar_script = """
+import json, sys, time
+start = time.perf_counter()
+import petrobuffer
+from petrobuffer import buffers
+buffers.calcBuffer('FMQ', 1473.15, 1e4)
+print(json.dumps({'seconds': time.perf_counter() - start, 'numpy': 'numpy' in sys.modules}))
+"""
+
+def measure(repeats=3):
+    """
+    Runs the scalar script `repeats` times in fresh interpreters.
+
+    Returns
+    -------
+    float
+        Least time taken, in seconds.
+    bool
+        Whether any run imported NumPy.
+    """
+    runs = [json.loads(subprocess.run([sys.executable, '-c', _scalar_script],
+                                      capture_output=True, text=True, check=True).stdout)
+            for _ in range(repeats)]
+    return min(run['seconds'] for run in runs), any(run['numpy'] for run in runs)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time importing PetroBuffer and one scalar\
+         buffer calculation.")
+    parser.add_argument('--budget', type=float, default=default_budget,
+                        help="Largest permitted time in seconds (default %(default)s).")
+    parser.add_argument('--repeats', type=int, default=3,
+                        help="Number of runs, of which the fastest is kept (default %(default)s).")
+    args = parser.parse_args(argv)
+
+    seconds, numpy_imported = measure(args.repeats)
+    print(f"import + scalar calcBuffer: {seconds*1000:.1f} ms"
+          f" (budget {args.budget*1000:.1f} ms)")
+    if numpy_imported:
+        print("FLAGGED the scalar path imported NumPy", file=sys.stderr)
+    if seconds > args.budget:
+        print(f"FLAGGED start-up took {seconds*1000:.1f} ms, over the budget", file=sys.stderr)
+
+    return 1 if numpy_imported or seconds > args.budget else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,4 +9,40 @@ __version__ = "0.0.1"
 __author__ = 'Philippa Liggins'
 
 # ----------------- IMPORTS ----------------- #
-from petrobuffer.conversions import *
\ No newline at end of file
+# Submodules, and the functions of `petrobuffer.conversions`, are imported on
+# first access (PEP 562), so `import petrobuffer` does not import NumPy.
+import importlib
+
+_submodules = ['buffers', 'cache', 'calibration', 'cli', 'composition', 'conversions', 'core',
+               'ferric', 'instrument', 'outofcore', 'parallel', 'prepared', 'schema', 'uncertainty']
+
+_attributes = {'get_relative_fo2': 'conversions',
+               'get_relative_fo2_all': 'conversions',
+               'get_absolute_fo2': 'conversions',
+               'convert_buffer': 'conversions',
+               'get_ironOxide': 'conversions',
+               'get_meltfO2': 'conversions',
+               'get_ironOxide_batch': 'conversions',
+               'get_meltfO2_batch': 'conversions',
+               'RowStatus': 'conversions',
+               'calcBuffer': 'buffers',
+               'MeltComposition': 'composition',
+               'column_index': 'composition',
+               'CompositionSchema': 'schema'}
+
+__all__ = list(_attributes)
+
+def __getattr__(name):
+    if name in _submodules:
+        value = importlib.import_module(f'{__name__}.{name}')
+    elif name in _attributes:
+        module = importlib.import_module(f'{__name__}.{_attributes[name]}')
+        value = getattr(module, name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value    # later lookups skip __getattr__
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_submodules) | set(_attributes))
@@ -1,4 +1,181 @@
+from typing import Callable, NamedTuple
 from petrobuffer import core
+from petrobuffer import instrument
+from petrobuffer.cache import BufferCache
+from petrobuffer.calibration import CalibrationRange
+
+# --------------------------- BUFFER REGISTRY ---------------------------- #
+
+class Branch(NamedTuple):
+    """
+    One calibrated equation of a buffer, and the conditions it is used under.
+
+    Attributes
+    ----------
+    equation : callable
+        Function of (coefficients, T, P), with T in K and P in bar, returning
+        log10(fO2). E.g. `frost1991_equation` or `campbell2009_equation`.
+    coefficients : tuple
+        Coefficients passed to `equation`.
+    T_max : float, default=inf
+        The branch is used at temperatures below T_max (K).
+    P_max : float, default=inf
+        The branch is used at pressures up to and including P_max (bar).
+    """
+    equation: Callable
+    coefficients: tuple
+    T_max: float = float('inf')
+    P_max: float = float('inf')
+
+# {buffer name: branches}. The first branch whose T_max and P_max bound the
+# conditions is used, and the last branch otherwise (e.g. for NaN T or P).
+buffer_registry = {}
+
+# {buffer name: CalibrationRange} of the buffers registered with one, across
+# all of their branches
+buffer_calibration = {}
+
+# {(branch, other branch): Branch evaluating branch - other branch in one
+# equation, or None if they cannot be combined}, see `buffer_difference`
+_difference_branches = {}
+
+def register_buffer(name:str, branches, overwrite:bool=False, calibration=None):
+    """
+    Adds a buffer to the registry used by `calcBuffer`.
+
+    Parameters
+    ----------
+    name : str
+        Name of the buffer, e.g. 'ReReO2'.
+    branches : list of Branch
+        Equations making up the buffer, in the order they are checked.
+        The last branch covers all remaining conditions, so must have no
+        T_max or P_max.
+    overwrite : bool, default=False
+        Whether an existing buffer of the same name may be replaced.
+    calibration : CalibrationRange, optional
+        T and P range the buffer is calibrated over, which batch
+        conversions check their conditions against.
+    """
+    if not overwrite and buffer_name(name) in buffer_registry:
+        raise core.InputError(f"A buffer called '{name}' is already registered.")
+    if len(branches) == 0:
+        raise core.InputError(f"Buffer '{name}' must have at least one branch.")
+    branches = tuple(Branch(*br) for br in branches)
+    if branches[-1].T_max != float('inf') or branches[-1].P_max != float('inf'):
+        raise core.InputError(f"The last branch of buffer '{name}' must cover all remaining\
+             conditions, with no T_max or P_max.")
+
+    if buffer_name(name) in buffer_registry:
+        # replace the existing entry, whatever case it was registered in
+        name = buffer_name(name)
+        unregister_buffer(name)
+
+    buffer_registry[name] = branches
+    if calibration is not None:
+        buffer_calibration[name] = CalibrationRange(*calibration)
+
+    # precompute the combined equations of this buffer with every other one
+    for other in buffer_registry.values():
+        for branch in buffer_registry[name]:
+            for other_branch in other:
+                _difference_branches[(branch, other_branch)] = _difference_branch(branch, other_branch)
+                _difference_branches[(other_branch, branch)] = _difference_branch(other_branch, branch)
+
+    # cached values of a replaced buffer are stale
+    clear_cache()
+
+def unregister_buffer(name:str):
+    """
+    Removes a buffer, with its calibration range and combined equations,
+    from the registry used by `calcBuffer`.
+
+    Parameters
+    ----------
+    name : str
+        Name of the buffer, matched case-insensitively.
+    """
+    name = buffer_name(name)
+    branches = _branches(name)
+    del buffer_registry[name]
+    buffer_calibration.pop(name, None)
+
+    # keep the combined equations of branches another buffer still uses
+    remaining = {branch for other in buffer_registry.values() for branch in other}
+    for pair in list(_difference_branches):
+        if any(branch in branches and branch not in remaining for branch in pair):
+            del _difference_branches[pair]
+    clear_cache()
+
+def buffer_name(name:str)->str:
+    """
+    Returns the registered name of a buffer, matched case-insensitively.
+    Unrecognised names are returned unchanged.
+    """
+    if name in buffer_registry:
+        return name
+    for registered in buffer_registry:
+        if registered.lower() == name.lower():
+            return registered
+    return name
+
+def _branches(name):
+    """Returns the registered branches of a buffer."""
+    try:
+        return buffer_registry[name]
+    except KeyError:
+        raise core.InputError(f"'{name}' not recognized as a buffer.") from None
+
+# --------------------------- BUFFER CACHE ------------------------------- #
+
+# process-wide cache of scalar buffer values, see `enable_cache`
+_cache = None
+
+def enable_cache(maxsize:int=4096, T_tolerance:float=None, P_tolerance:float=None):
+    """
+    Enables a process-wide cache of scalar `calcBuffer` values, which is
+    also used by `get_relative_fo2`, `get_absolute_fo2` and `convert_buffer`.
+
+    The cache is thread-safe, so a single cache can serve a pool of threads.
+    Enabling it again replaces the existing cache.
+
+    Parameters
+    ----------
+    maxsize : int, default=4096
+        Largest number of (buffer, T, P) values held before the least
+        recently used is evicted.
+    T_tolerance : float, optional
+        If given, temperatures are rounded to a multiple of this step (K)
+        and the buffer is evaluated at the rounded temperature.
+    P_tolerance : float, optional
+        If given, pressures are rounded to a multiple of this step (bar)
+        and the buffer is evaluated at the rounded pressure.
+
+    Returns
+    -------
+    BufferCache
+        The new cache.
+    """
+    global _cache
+    _cache = BufferCache(calcBuffer_scalar, maxsize, T_tolerance, P_tolerance)
+    return _cache
+
+def disable_cache():
+    """Disables and discards the process-wide buffer cache."""
+    global _cache
+    _cache = None
+
+def cache_info():
+    """
+    Returns the hits, misses, maximum and current size of the process-wide
+    buffer cache, or None if it is not enabled.
+    """
+    return None if _cache is None else _cache.info()
+
+def clear_cache():
+    """Empties the process-wide buffer cache, if it is enabled."""
+    if _cache is not None:
+        _cache.clear()
 
 def calcBuffer(name, T, P):
     """
@@ -8,56 +185,336 @@ def calcBuffer(name, T, P):
     Parameters
     ----------
     buffer_name : str
-        Possible buffers are: QIF, IW, WM, IM, CoCoO, FMQ, NNO, MH.    
+        Possible buffers are: QIF, IW, WM, IM, CoCoO, FMQ, NNO, MH, and
+        any added with `register_buffer`.
     T : float
         Temperature in degrees K    
     P : float
         Pressure in bar
 
+    Returns
+    -------
+    float
+        absolute fO2, as log10(fO2). If `T` or `P` are arrays, the
+        result of `calcBuffer_array` is returned instead.
+
+    Notes
+    -----
+    Scalar calls are served from the process-wide cache while one is
+    enabled with `enable_cache`.
+    """
+
+    # plain Python numbers take the scalar path without importing NumPy
+    if not (isinstance(T, (int, float)) and isinstance(P, (int, float))):
+        import numpy as np
+        if np.ndim(T) > 0 or np.ndim(P) > 0:
+            return calcBuffer_array(name, T, P)
+
+    if _cache is not None:
+        return _cache.get(name, T, P)
+
+    return calcBuffer_scalar(name, T, P)
+
+def calcBuffer_scalar(name, T, P):
+    """
+    Calculates the fO2 of a given buffer at a single T and P, without
+    using the cache.
+
+    Parameters
+    ----------
+    buffer_name : str
+        Possible buffers are: QIF, IW, WM, IM, CoCoO, FMQ, NNO, MH, and
+        any added with `register_buffer`.
+    T : float
+        Temperature in degrees K
+    P : float
+        Pressure in bar
+
     Returns
     -------
     float
         absolute fO2, as log10(fO2)
     """
 
-    if name == 'QIF':
-        if T < 573+273.15:
-            return frost1991('QIF_lowT', T, P)
-        else:
-            return frost1991('QIF_highT', T, P)
-    elif name == 'IW':
-        if core.bar_to_gpa(P) > 10:
-            return calc_iw_highp(core.bar_to_gpa(P), T)
-        else:
-            return frost1991('IW', T, P)
-    elif name == 'WM':
-        return frost1991('WM', T, P)
-    elif name == 'IM':
-        return frost1991('IM', T, P)
-    elif name == 'CoCoO':
-        return frost1991('CoCoO', T, P)
-    elif name == 'FMQ':
-        if T < 573+273.15:
-            return frost1991('FMQ_lowT', T, P)
-        else:
-            return frost1991('FMQ_highT', T, P)
-    elif name == 'NNO':
-        if core.bar_to_gpa(P) > 10:
-            return calc_nno_highp(core.bar_to_gpa(P), T)
-        else:
-            return frost1991('NNO', T, P)
-    elif name == 'MH':
-        if T < 573+273.15:
-            return frost1991('MH_lowT', T, P)
-        elif T < 682+273.15:
-            return frost1991('MH_midT', T, P)
-        else:
-            return frost1991('MH_highT', T, P)
-    else:
-        raise core.InputError(f"'{name}' not recognized as a buffer.")
+    branches = _branches(name)
+    for branch in branches:
+        # an infinite T_max bounds nothing, as in `branch_masks`, and the last
+        # branch takes any conditions the others don't, including NaN
+        if (((T < branch.T_max or branch.T_max == float('inf')) and P <= branch.P_max)
+                or branch is branches[-1]):
+            if instrument._active is not None:    # checked inline, as this path is hot
+                instrument.count_branch(name, branches.index(branch))
+            return branch.equation(branch.coefficients, T, P)
+
+def calcBuffer_array(name, T, P):
+    """
+    Calculates the fO2 of a given buffer over arrays of T and P.
+
+    `T` and `P` are broadcast against each other, and each temperature
+    and pressure branch of the buffer is evaluated only on the points
+    which fall within it.
+
+    Parameters
+    ----------
+    buffer_name : str
+        Possible buffers are: QIF, IW, WM, IM, CoCoO, FMQ, NNO, MH, and
+        any added with `register_buffer`.
+    T : float or array-like
+        Temperature in degrees K
+    P : float or array-like
+        Pressure in bar
+
+    Returns
+    -------
+    numpy.ndarray
+        absolute fO2, as log10(fO2), with the broadcast shape of `T` and `P`
+    """
+    import numpy as np
+
+    T, P = np.broadcast_arrays(np.asarray(T, dtype=float),
+                               np.asarray(P, dtype=float))
+
+    fO2 = np.empty(T.shape)
+    for branch, mask in branch_masks(name, T, P):
+        if mask is None:
+            return branch.equation(branch.coefficients, T, P)
+        fO2[mask] = branch.equation(branch.coefficients, T[mask], P[mask])
+
+    return fO2
+
+def branch_masks(name, T, P):
+    """
+    Yields each branch of a buffer which is used for some of the T, P
+    points, with a boolean mask of those points.
+
+    Parameters
+    ----------
+    name : str
+        Name of a registered buffer.
+    T : numpy.ndarray
+        Temperature in degrees K
+    P : numpy.ndarray
+        Pressure in bar, with the same shape as `T`
+
+    Yields
+    ------
+    Branch
+        A branch of the buffer
+    numpy.ndarray or None
+        The points the branch is used for, or None if it is used for all
+        of them.
+    """
+    remaining = None
+    for i, branch in enumerate(_branches(name)):
+        mask = remaining
+        if branch.T_max != float('inf'):
+            mask = T < branch.T_max if mask is None else mask & (T < branch.T_max)
+        if branch.P_max != float('inf'):
+            mask = P <= branch.P_max if mask is None else mask & (P <= branch.P_max)
+
+        if mask is None or mask.all():
+            if instrument.enabled():
+                instrument.count_branch(name, i, T.size)
+            yield branch, None
+            return
+        if mask.any():
+            if instrument.enabled():
+                instrument.count_branch(name, i, int(mask.sum()))
+            yield branch, mask
+            remaining = ~mask if remaining is None else remaining & ~mask
+
+# ------------------------ ALL BUFFERS AT ONCE -------------------------- #
+
+class BufferMatrix(NamedTuple):
+    """
+    Values of several buffers at N conditions.
+
+    Attributes
+    ----------
+    names : tuple of str
+        Names of the buffers, labelling the columns of `values`.
+    values : numpy.ndarray
+        (N, n_buffers) array of log10(fO2), column i being buffer names[i].
+    """
+    names: tuple
+    values: 'numpy.ndarray'
+
+    def column(self, name):
+        """Returns the values of one buffer."""
+        return self.values[:, self.names.index(buffer_name(name))]
+
+    def to_dict(self):
+        """Returns the values as a dict of {buffer name: column}."""
+        return {name: self.values[:, i] for i, name in enumerate(self.names)}
+
+def calcBuffers(T, P, names=None):
+    """
+    Calculates the fO2 of every registered buffer (or those in `names`) over
+    arrays of T and P in a single pass.
+
+    The 1/T and (P-1)/T terms are calculated once and shared by all the
+    Frost (1991) branches, and each buffer is written straight into its
+    column of the result. Any other branches, such as the high pressure IW
+    and NNO equations, are evaluated only on the points they are used for.
+
+    Parameters
+    ----------
+    T : float or array-like
+        Temperature in degrees K
+    P : float or array-like
+        Pressure in bar
+    names : list of str, optional
+        Buffers to calculate. Defaults to all registered buffers.
+
+    Returns
+    -------
+    BufferMatrix
+        Buffer names, and an (N, n_buffers) array of absolute fO2 as log10(fO2)
+    """
+    import numpy as np
+    T, P = np.broadcast_arrays(np.atleast_1d(np.asarray(T, dtype=float)),
+                               np.atleast_1d(np.asarray(P, dtype=float)))
+    T, P = T.ravel(), P.ravel()
+    names = tuple(buffer_registry) if names is None else tuple(buffer_name(n) for n in names)
+
+    # terms shared by every Frost (1991) branch
+    inv_T = 1/T
+    PT = (P - 1)*inv_T
+    term = np.empty(len(T))
+
+    # fill one contiguous row per buffer, returned transposed as columns
+    values = np.empty((len(names), len(T)))
+    for j, name in enumerate(names):
+        for branch, mask in branch_masks(name, T, P):
+            if branch.equation is frost1991_equation and mask is None:
+                a, b, c = branch.coefficients
+                np.multiply(inv_T, a, out=values[j])
+                values[j] += np.multiply(PT, c, out=term)
+                values[j] += b
+            elif branch.equation is frost1991_equation:
+                a, b, c = branch.coefficients
+                values[j, mask] = a*inv_T[mask] + b + c*PT[mask]
+            elif mask is None:
+                values[j] = branch.equation(branch.coefficients, T, P)
+            else:
+                values[j, mask] = branch.equation(branch.coefficients, T[mask], P[mask])
+
+    return BufferMatrix(names, values.T)
+
+# ------------------------ BUFFER DIFFERENCES --------------------------- #
+
+def _as_polynomial(branch):
+    """
+    Returns the coefficients of a branch in the form of `campbell2009_equation`,
+    or None if its equation is of another form.
+    """
+    if branch.equation is campbell2009_equation:
+        return branch.coefficients
+    if branch.equation is frost1991_equation:
+        # a/T + b + c(P-1)/T = b + (a - c + c*P[GPa]*1e4)/T
+        a, b, c = branch.coefficients
+        return (b,), (a - c, core.gpa_to_bar(c))
+    return None
+
+def _difference_branch(branch, other):
+    """Returns one Branch evaluating `branch` - `other`, if they can be combined."""
+    if branch.equation is frost1991_equation and other.equation is frost1991_equation:
+        return Branch(frost1991_equation,
+                      tuple(x - y for x, y in zip(branch.coefficients, other.coefficients)))
+
+    polynomial, other_polynomial = _as_polynomial(branch), _as_polynomial(other)
+    if polynomial is None or other_polynomial is None:
+        return None
+
+    def subtract(x, y):
+        n = max(len(x), len(y))
+        return tuple(xi - yi for xi, yi in zip(x + (0,)*(n - len(x)), y + (0,)*(n - len(y))))
+
+    return Branch(campbell2009_equation, (subtract(polynomial[0], other_polynomial[0]),
+                                          subtract(polynomial[1], other_polynomial[1])))
+
+def buffer_difference(old_buffer, new_buffer, T, P):
+    """
+    Calculates the difference between two buffers, log10(fO2) of `old_buffer`
+    minus that of `new_buffer`, over arrays of T and P.
+
+    For each combination of the branches of the two buffers, the two
+    equations are combined into one with precomputed coefficient
+    differences (e.g. (a1-a2)/T + (b1-b2) + (c1-c2)(P-1)/T for two Frost
+    (1991) branches), so each point is evaluated once rather than once per
+    buffer.
+
+    Parameters
+    ----------
+    old_buffer : str
+        Name of the buffer to subtract from.
+    new_buffer : str
+        Name of the buffer to subtract.
+    T : float or array-like
+        Temperature in degrees K
+    P : float or array-like
+        Pressure in bar
+
+    Returns
+    -------
+    numpy.ndarray
+        log10(fO2) of `old_buffer` minus log10(fO2) of `new_buffer`
+    """
+    import numpy as np
+    T, P = np.broadcast_arrays(np.asarray(T, dtype=float),
+                               np.asarray(P, dtype=float))
+
+    difference = np.empty(T.shape)
+    for branch, mask in branch_masks(old_buffer, T, P):
+        T_b, P_b = (T, P) if mask is None else (T[mask], P[mask])
+
+        difference_b = np.empty(T_b.shape)
+        for other, other_mask in branch_masks(new_buffer, T_b, P_b):
+            T_o, P_o = (T_b, P_b) if other_mask is None else (T_b[other_mask], P_b[other_mask])
+
+            combined = _difference_branches.get((branch, other))
+            if combined is not None:
+                value = combined.equation(combined.coefficients, T_o, P_o)
+            else:
+                value = (branch.equation(branch.coefficients, T_o, P_o) -
+                         other.equation(other.coefficients, T_o, P_o))
+
+            if other_mask is None:
+                difference_b = value
+            else:
+                difference_b[other_mask] = value
+
+        if mask is None:
+            return difference_b
+        difference[mask] = difference_b
+
+    return difference
 
 # --------------------- DEFINE BUFFER EQUATIONS ------------------------ #
 
+# (a, b, c) of each buffer equation listed in Frost (1991)
+frost1991_coefficients = {'QIF_lowT':  (-29435.7,  7.391, 0.044),
+                          'QIF_highT': (-29520.8,  7.492, 0.050),
+                          'IW':        (-27489.0,  6.702, 0.055),
+                          'WM':        (-32807.0, 13.012, 0.083),
+                          'IM':        (-28690.6,  8.130, 0.056),
+                          'CoCoO':     (-24332.6,  7.295, 0.052),
+                          'FMQ_lowT':  (-26455.3, 10.344, 0.092),
+                          'FMQ_highT': (-25096.3,  8.735, 0.110),
+                          'NNO':       (-24930.0,  9.360, 0.046),
+                          'MH_lowT':   (-25497.5, 14.330, 0.019),
+                          'MH_midT':   (-26452.6, 15.455, 0.019),
+                          'MH_highT':  (-25700.6, 14.558, 0.019)
+                          }
+
+# ((a0, a1, ...), (b0, b1, ...)) of the high pressure buffers of Campbell et al.
+# (2009), with P in GPa
+campbell2009_coefficients = {'IW':  ((6.54106, 0.0012324),
+                                     (-28163.6, 546.32, -1.13412, 0.0019274)),
+                             'NNO': ((8.699, 0.01642, -0.0002755, 2.683e-6, -1.015e-8),
+                                     (-24205, 444.73, -0.59288, 0.0015292))
+                             }
+
 def frost1991(buffer_name, T, P):
     """
     Calculate mineral buffer at given T and P as listed in Frost 1991
@@ -83,21 +540,28 @@ def frost1991(buffer_name, T, P):
     Volume 25
     """
 
-    coefficients = {'QIF_lowT':  (-29435.7,  7.391, 0.044),
-                    'QIF_highT': (-29520.8,  7.492, 0.050),
-                    'IW':        (-27489.0,  6.702, 0.055),
-                    'WM':        (-32807.0, 13.012, 0.083),
-                    'IM':        (-28690.6,  8.130, 0.056),
-                    'CoCoO':     (-24332.6,  7.295, 0.052),
-                    'FMQ_lowT':  (-26455.3, 10.344, 0.092),
-                    'FMQ_highT': (-25096.3,  8.735, 0.110),
-                    'NNO':       (-24930.0,  9.360, 0.046),
-                    'MH_lowT':   (-25497.5, 14.330, 0.019),
-                    'MH_midT':   (-26452.6, 15.455, 0.019),
-                    'MH_highT':  (-25700.6, 14.558, 0.019)
-                    }
+    return frost1991_equation(frost1991_coefficients[buffer_name], T, P)
+
+def frost1991_equation(coefficients, T, P):
+    """
+    Evaluates a buffer of the form log10(fO2) = a/T + b + c*(P-1)/T, as used
+    by Frost (1991).
+
+    Parameters
+    ----------
+    coefficients : tuple
+        (a, b, c)
+    T : float
+        Temperature in degrees K
+    P : float
+        Pressure in bar
 
-    a, b, c = coefficients[buffer_name]
+    Returns
+    -------
+    float
+        log10(fO2)
+    """
+    a, b, c = coefficients
 
     return a/T + b + c*(P-1)/T
 
@@ -176,4 +640,64 @@ def calc_nno_highp(P, T):
     log_fO2 = (8.699 + 0.01642*P -0.0002755*P**2 + 2.683e-6*P**3 - 1.015e-8*P**4) + (
             -24205 + 444.73*P - 0.59288*P**2 + 0.0015292*P**3)/T
 
-    return log_fO2
\ No newline at end of file
+    return log_fO2
+
+def campbell2009_equation(coefficients, T, P):
+    """
+    Evaluates a buffer of the form log10(fO2) = sum(a_i*P^i) + sum(b_i*P^i)/T,
+    as used by Campbell et al. (2009), where P is in GPa.
+
+    Parameters
+    ----------
+    coefficients : tuple
+        ((a0, a1, ...), (b0, b1, ...))
+    T : float
+        Temperature in degrees K
+    P : float
+        Pressure in bar
+
+    Returns
+    -------
+    float
+        log10(fO2)
+    """
+    a, b = coefficients
+    P = core.bar_to_gpa(P)
+
+    return sum(ai*P**i for i, ai in enumerate(a)) + sum(bi*P**i for i, bi in enumerate(b))/T
+
+# ------------------------ REGISTER THE BUFFERS ------------------------- #
+
+_lowT = 573+273.15     # K
+_midT = 682+273.15     # K
+_highP = core.gpa_to_bar(10)   # bar
+
+# T-P ranges of the calibrations, approximately those of the experiments they
+# were fitted to. Frost (1991) equations are taken as valid up to _highP, above
+# which IW and NNO switch to Campbell et al. (2009).
+_frost1991 = 'Frost (1991)'
+_campbell2009 = 'Frost (1991); Campbell et al. (2009)'
+_25C, _565C, _1200C = 25+273.15, 565+273.15, 1200+273.15     # K
+
+register_buffer('QIF', [(frost1991_equation, frost1991_coefficients['QIF_lowT'], _lowT),
+                        (frost1991_equation, frost1991_coefficients['QIF_highT'])],
+                calibration=(150+273.15, _1200C, 0, _highP, _frost1991))
+register_buffer('IW', [(frost1991_equation, frost1991_coefficients['IW'], float('inf'), _highP),
+                       (campbell2009_equation, campbell2009_coefficients['IW'])],
+                calibration=(_565C, 2500, 0, core.gpa_to_bar(60), _campbell2009))
+register_buffer('WM', [(frost1991_equation, frost1991_coefficients['WM'])],
+                calibration=(_565C, _1200C, 0, _highP, _frost1991))
+register_buffer('IM', [(frost1991_equation, frost1991_coefficients['IM'])],
+                calibration=(300+273.15, _565C, 0, _highP, _frost1991))
+register_buffer('CoCoO', [(frost1991_equation, frost1991_coefficients['CoCoO'])],
+                calibration=(_25C, _1200C, 0, _highP, _frost1991))
+register_buffer('FMQ', [(frost1991_equation, frost1991_coefficients['FMQ_lowT'], _lowT),
+                        (frost1991_equation, frost1991_coefficients['FMQ_highT'])],
+                calibration=(_25C, _1200C, 0, _highP, _frost1991))
+register_buffer('NNO', [(frost1991_equation, frost1991_coefficients['NNO'], float('inf'), _highP),
+                        (campbell2009_equation, campbell2009_coefficients['NNO'])],
+                calibration=(_25C, 2500, 0, core.gpa_to_bar(60), _campbell2009))
+register_buffer('MH', [(frost1991_equation, frost1991_coefficients['MH_lowT'], _lowT),
+                       (frost1991_equation, frost1991_coefficients['MH_midT'], _midT),
+                       (frost1991_equation, frost1991_coefficients['MH_highT'])],
+                calibration=(_25C, 1100+273.15, 0, _highP, _frost1991))
@@ -0,0 +1,98 @@
+import math
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+class CacheInfo(NamedTuple):
+    """Hit/miss statistics of a `BufferCache`."""
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+class BufferCache:
+    """
+    Thread-safe, bounded least-recently-used cache of buffer values, keyed
+    on (buffer, T, P).
+
+    If a tolerance is set for T or P, conditions are rounded to the nearest
+    multiple of that tolerance before the lookup, and the buffer is
+    evaluated at the rounded conditions. All calls falling on the same
+    rounded point then share one cached value, whatever order they
+    arrive in.
+
+    Non-finite conditions (NaN or infinite T or P) are neither rounded nor
+    stored: the buffer is evaluated directly, as it would be uncached.
+
+    Parameters
+    ----------
+    function : callable
+        Function of (name, T, P) returning the value to cache, e.g.
+        `buffers.calcBuffer_scalar`.
+    maxsize : int, default=4096
+        Largest number of values held before the least recently used is
+        evicted.
+    T_tolerance : float, optional
+        Rounding step applied to temperatures (K).
+    P_tolerance : float, optional
+        Rounding step applied to pressures (bar).
+    """
+
+    def __init__(self, function, maxsize=4096, T_tolerance=None, P_tolerance=None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self.function = function
+        self.maxsize = maxsize
+        self.T_tolerance = T_tolerance
+        self.P_tolerance = P_tolerance
+
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, name, T, P):
+        """
+        Returns the cached value at (name, T, P), evaluating and storing it
+        if it is not already held.
+        """
+        if not (math.isfinite(T) and math.isfinite(P)):
+            return self.function(name, T, P)
+        if self.T_tolerance is not None:
+            T = round(T/self.T_tolerance)*self.T_tolerance
+        if self.P_tolerance is not None:
+            P = round(P/self.P_tolerance)*self.P_tolerance
+        key = (name, T, P)
+
+        with self._lock:
+            try:
+                value = self._values[key]
+            except KeyError:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._values.move_to_end(key)
+                return value
+
+        # evaluate outside the lock, so other threads are not held up
+        value = self.function(name, T, P)
+
+        with self._lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+            while len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+
+        return value
+
+    def info(self):
+        """Returns the hit/miss statistics of the cache."""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.maxsize, len(self._values))
+
+    def clear(self):
+        """Removes all cached values and resets the statistics."""
+        with self._lock:
+            self._values.clear()
+            self._hits = 0
+            self._misses = 0
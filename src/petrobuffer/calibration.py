@@ -0,0 +1,156 @@
+import warnings
+from contextlib import contextmanager
+from typing import NamedTuple
+
+# the CalibrationSummary batch calls add their range checks to, or None while
+# each batch call warns on its own
+_active = None
+
+class CalibrationRange(NamedTuple):
+    """
+    Temperatures and pressures a buffer or ferric model was calibrated over.
+
+    Attributes
+    ----------
+    T_min, T_max : float
+        Temperature range, in K.
+    P_min, P_max : float
+        Pressure range, in bar.
+    source : str, default=''
+        Where the calibration comes from.
+    """
+    T_min: float
+    T_max: float
+    P_min: float
+    P_max: float
+    source: str = ''
+
+    def outside(self, T, P):
+        """Returns a mask of the T, P points outside the range (NaN points
+        included)."""
+        return ~((T >= self.T_min) & (T <= self.T_max) & (P >= self.P_min) & (P <= self.P_max))
+
+class RangeCount(NamedTuple):
+    """Number of points checked against a calibration range, and of those
+    outside it."""
+    checked: int
+    outside: int
+
+    @property
+    def fraction(self):
+        """Fraction of the points checked which were outside the range."""
+        return self.outside/self.checked if self.checked else 0.0
+
+class CalibrationWarning(UserWarning):
+    """
+    Warns that some rows of a batch call were outside the calibrated range
+    of a buffer or ferric model. The counts are held in `summary`.
+    """
+    def __init__(self, message, summary):
+        super().__init__(message)
+        self.summary = summary
+
+class CalibrationSummary:
+    """
+    Counts of the points checked against, and outside, the calibration
+    range of each buffer and ferric model used by batch calls.
+
+    Attributes
+    ----------
+    counts : dict
+        {buffer or model name: RangeCount}
+    """
+
+    def __init__(self):
+        self.counts = {}
+
+    def check(self, name, calibration_range, T, P, mask=None):
+        """
+        Counts the T, P points, or those selected by `mask`, outside a
+        calibration range. Nothing is counted if the range is None.
+        """
+        if calibration_range is None:
+            return
+        outside = calibration_range.outside(T, P)
+        if mask is None:
+            checked, n_outside = outside.size, int(outside.sum())
+        else:
+            checked, n_outside = int(mask.sum()), int((outside & mask).sum())
+        self.add(name, RangeCount(checked, n_outside))
+
+    def add(self, name, count):
+        """Adds a RangeCount to the counts of a buffer or model."""
+        old = self.counts.get(name, RangeCount(0, 0))
+        self.counts[name] = RangeCount(old.checked + count.checked, old.outside + count.outside)
+
+    def update(self, other):
+        """Adds all the counts of another CalibrationSummary."""
+        for name, count in other.counts.items():
+            self.add(name, count)
+
+    def out_of_range(self):
+        """Whether any of the points checked were outside their range."""
+        return any(count.outside for count in self.counts.values())
+
+    def message(self):
+        """Describes the points outside their calibration range, per buffer
+        and model."""
+        parts = [f"{name} {count.outside} of {count.checked} ({count.fraction:.1%})"
+                 for name, count in self.counts.items() if count.outside]
+        return "Points outside the calibrated T-P range: " + ", ".join(parts) + "."
+
+    def warn(self, stacklevel=2):
+        """Issues one CalibrationWarning if any points were out of range."""
+        if self.out_of_range():
+            warnings.warn(CalibrationWarning(self.message(), self), stacklevel=stacklevel + 1)
+
+    def __repr__(self):
+        return f"CalibrationSummary({self.counts})"
+
+def report(summary, stacklevel=2):
+    """
+    Reports the range checks of one batch call: added to the summary of an
+    enclosing `collect` block if there is one, otherwise warned about.
+    """
+    if _active is not None:
+        _active.update(summary)
+    else:
+        summary.warn(stacklevel + 1)
+
+@contextmanager
+def collect(warn=True):
+    """
+    Collects the range checks of every batch call inside the block into
+    one summary, rather than each call warning on its own.
+
+    Collection is process-wide, like `instrument.instrument`. A nested
+    block adds its counts to the enclosing one when it ends.
+
+    Parameters
+    ----------
+    warn : bool, default=True
+        Whether to issue one CalibrationWarning when the block ends if any
+        points were out of range. Ignored inside another `collect` block.
+
+    Yields
+    ------
+    CalibrationSummary
+        The counts, filled in as the block runs.
+
+    Examples
+    --------
+    >>> with collect() as summary:
+    ...     for chunk in chunks:
+    ...         get_meltfO2_batch(chunk, T, P)
+    >>> summary.counts['kc1991'].fraction
+    """
+    global _active
+    previous, _active = _active, CalibrationSummary()
+    try:
+        yield _active
+    finally:
+        summary, _active = _active, previous
+    if previous is not None:
+        previous.update(summary)
+    elif warn:
+        summary.warn(stacklevel=3)
@@ -0,0 +1,176 @@
+import argparse
+import csv
+import itertools
+import sys
+
+import numpy as np
+from petrobuffer import core
+from petrobuffer import calibration
+from petrobuffer import conversions
+from petrobuffer.composition import feot_names
+from petrobuffer.schema import CompositionSchema
+
+def _parser():
+    parser = argparse.ArgumentParser(prog='petrobuffer',
+        description="Stream a CSV of melt analyses through the PetroBuffer redox\
+             conversions, writing one output row per input row.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('input', help="CSV file of oxide wt%%, T and P, or '-' for stdin.")
+    common.add_argument('-o', '--output', default='-',
+                        help="CSV file to write, or '-' for stdout (default).")
+    common.add_argument('--T-column', default='T', help="Temperature column (default 'T').")
+    common.add_argument('--P-column', default='P', help="Pressure column, in bar (default 'P').")
+    common.add_argument('--celsius', action='store_true', help="Temperatures are in Celsius.")
+    common.add_argument('--buffer', help="Buffer the fO2 is relative to.")
+    common.add_argument('--force-model', choices=['kc1991', 'r2013'],
+                        help="Use one model for every row.")
+    common.add_argument('--chunk-size', type=int, default=10000,
+                        help="Number of rows converted at a time (default 10000).")
+
+    fo2 = subparsers.add_parser('fo2', parents=[common],
+                                help="Calculate melt fO2 from FeO and Fe2O3 (get_meltfO2).")
+    fo2.set_defaults(run=_run_fo2)
+
+    iron = subparsers.add_parser('ironoxide', parents=[common],
+                                 help="Calculate Fe2O3/FeO from fO2 (get_ironOxide).")
+    iron.add_argument('--fO2-column', default='fO2', help="fO2 column (default 'fO2').")
+    iron.add_argument('--not-normalised', action='store_true',
+                      help="Only recalculate FeO and Fe2O3, without normalising.")
+    iron.set_defaults(run=_run_ironoxide)
+
+    return parser
+
+def _column(header, name):
+    """Returns the position of a named column, matched case-insensitively."""
+    lower = [h.strip().lower() for h in header]
+    if name.lower() not in lower:
+        raise core.InputError(f"Column '{name}' not found in the input.")
+    return lower.index(name.lower())
+
+def _oxide_columns(header):
+    """Returns the positions of the oxide columns of a header, and their
+    CompositionSchema."""
+    index = [i for i, h in enumerate(header) if h.strip().lower() in core.oxideIndex
+             or h.strip().lower() in feot_names]
+    return index, CompositionSchema([header[i].strip() for i in index])
+
+def _to_float(rows, index, header, first_line):
+    """
+    Parses the given columns of a chunk of rows, with blank cells as NaN.
+
+    Raises an InputError naming the line of any row too short to hold the
+    columns, or any cell which isn't a number.
+    """
+    values = np.empty((len(rows), len(index)))
+    for line, (row, out) in enumerate(zip(rows, values), first_line):
+        if len(row) <= max(index, default=-1):
+            raise core.InputError(f"Line {line} has {len(row)} columns, expected"
+                                  f" {len(header)}.")
+        try:
+            out[:] = [float(row[i]) if row[i].strip() else np.nan for i in index]
+        except ValueError:
+            i = next(i for i in index if row[i].strip() and not _is_number(row[i]))
+            raise core.InputError(f"Line {line}: '{row[i]}' in column '{header[i].strip()}'"
+                                  " is not a number.") from None
+    return values
+
+def _is_number(cell):
+    try:
+        float(cell)
+    except ValueError:
+        return False
+    return True
+
+def _chunks(reader, size):
+    """Yields the line number of the first row of each chunk, and its rows."""
+    while True:
+        first_line = reader.line_num + 1
+        rows = list(itertools.islice(reader, size))
+        if not rows:
+            return
+        yield first_line, rows
+
+def _run_fo2(args, header, reader, writer):
+    oxides, schema = _oxide_columns(header)
+    i_T, i_P = _column(header, args.T_column), _column(header, args.P_column)
+    result_name = 'fO2' if args.buffer is None else f'fO2_{args.buffer}'
+    writer.writerow(header + [result_name])
+
+    for line, rows in _chunks(reader, args.chunk_size):
+        T, P = _to_float(rows, [i_T, i_P], header, line).T
+        fO2, _ = conversions.get_meltfO2_batch(_to_float(rows, oxides, header, line), T, P,
+                                               celsius=args.celsius, buffer=args.buffer,
+                                               force_model=args.force_model, columns=schema)
+        writer.writerows(row + [repr(float(v))] for row, v in zip(rows, fO2))
+
+def _run_ironoxide(args, header, reader, writer):
+    oxides, schema = _oxide_columns(header)
+    i_T, i_P = _column(header, args.T_column), _column(header, args.P_column)
+    i_fO2 = _column(header, args.fO2_column)
+    header_written = False
+
+    for line, rows in _chunks(reader, args.chunk_size):
+        T, P, fO2 = _to_float(rows, [i_T, i_P, i_fO2], header, line).T
+        F, C_new = conversions.get_ironOxide_batch(_to_float(rows, oxides, header, line),
+                                                   fO2, T, P,
+                                                   celsius=args.celsius,
+                                                   normalised_comp=not args.not_normalised,
+                                                   buffer=args.buffer,
+                                                   force_model=args.force_model,
+                                                   columns=schema)
+        if not header_written:
+            writer.writerow(header + ['Fe2O3/FeO'] + [f'{sp}_new' for sp in C_new])
+            header_written = True
+        results = np.column_stack([F] + list(C_new.values()))
+        writer.writerows(row + [repr(float(v)) for v in values] for row, values in zip(rows, results))
+
+    if not header_written:
+        writer.writerow(header)
+
+def main(argv=None):
+    """
+    Entry point of the `petrobuffer` command.
+
+    Reads the input CSV in chunks of `--chunk-size` rows, maps its columns
+    once from the header, converts each chunk with the batch functions of
+    `petrobuffer.conversions`, and writes the results before reading the
+    next chunk, so memory use does not grow with the size of the file.
+
+    Parameters
+    ----------
+    argv : list of str, optional
+        Command line arguments. Defaults to `sys.argv[1:]`.
+
+    Returns
+    -------
+    int
+        Exit status.
+    """
+    args = _parser().parse_args(argv)
+    if args.chunk_size < 1:
+        raise SystemExit("petrobuffer: --chunk-size must be at least 1.")
+
+    infile = sys.stdin if args.input == '-' else open(args.input, newline='')
+    outfile = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    try:
+        reader = csv.reader(infile)
+        header = next(reader, None)
+        if header is None:
+            raise core.InputError("The input file is empty.")
+        with calibration.collect():    # one range warning for the whole file
+            args.run(args, header, reader, csv.writer(outfile))
+    except (core.InputError, KeyError) as exc:
+        print(f"petrobuffer: {getattr(exc, 'message', exc)}", file=sys.stderr)
+        return 1
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+import numpy as np
+from petrobuffer import core
+
+feot_names = ('feot', 'feo_t', 'feo(t)')
+
+def column_index(names):
+    """
+    Returns the position in `core.oxides` of each named oxide.
+
+    Names are case-insensitive, and total iron given as FeOt, FeO_t or FeO(t)
+    is placed in the FeO position.
+
+    Parameters
+    ----------
+    names : list of str
+        Oxide names, e.g. the keys of a composition dict or column headers.
+
+    Returns
+    -------
+    list of int
+        Index of each oxide in `core.oxides`
+    """
+    index = []
+    for ele in names:
+        key = 'feo' if ele.lower() in feot_names else ele.lower()
+        if key not in core.oxideIndex:
+            raise KeyError(f"Sorry, I don't know the mass of '{ele}'.")
+        index.append(core.oxideIndex[key])
+
+    if len(set(index)) != len(index):
+        raise core.InputError(f"The same oxide is given more than once in {list(names)}.")
+
+    return index
+
+def _column(values, i):
+    """Returns column `i` of a (K,) or (N, K) array, as a scalar for a single melt."""
+    return values[i] if values.ndim == 1 else values[:, i]
+
+class MeltComposition:
+    """
+    Array-backed major element composition of one or more silicate melts.
+
+    Oxides are held in the fixed order of `core.oxides`, as contiguous
+    float arrays of either shape (K,) for a single melt or (N, K) for a
+    stack of N melts. Mole fractions are calculated from the wt% on first
+    use and then reused.
+
+    Indexing with an oxide name returns its mole fraction(s), so a
+    `MeltComposition` can be passed directly to the models in
+    `petrobuffer.ferric`.
+
+    Parameters
+    ----------
+    wt : array-like
+        Major element composition(s) as weight percents, with columns in
+        the order of `core.oxides`.
+    present : array-like of bool, optional
+        Which of the oxides were given in the original analysis. Defaults
+        to all oxides with a non-zero wt% in any of the melts.
+    """
+
+    __slots__ = ('wt', 'present', '_mol')
+
+    def __init__(self, wt, present=None):
+        wt = np.ascontiguousarray(wt, dtype=float)
+        if wt.ndim not in (1, 2) or wt.shape[-1] != len(core.oxides):
+            raise core.InputError(f"Expected a composition of shape ({len(core.oxides)},)\
+                 or (N, {len(core.oxides)}), got {wt.shape}.")
+
+        if present is None:
+            present = (wt != 0).reshape(-1, len(core.oxides)).any(axis=0)
+
+        self.wt = wt
+        self.present = np.asarray(present, dtype=bool)
+        self._mol = None
+
+    @classmethod
+    def from_dict(cls, C:dict):
+        """
+        Creates a composition from a dict of oxide wt%.
+
+        Parameters
+        ----------
+        C : dict
+            Major element composition as weight percents. Values are either
+            single numbers, or equal length arrays for a stack of melts.
+
+        Returns
+        -------
+        MeltComposition
+        """
+        values = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in C.values()])
+        return cls.from_array(np.stack(values, axis=-1), list(C))
+
+    @classmethod
+    def from_array(cls, wt, columns):
+        """
+        Creates a composition from an array of oxide wt% with named columns.
+
+        Parameters
+        ----------
+        wt : array-like
+            Major element composition(s) as weight percents, either of shape
+            (K,) or (N, K).
+        columns : list of str
+            Names of the K oxides, in the order they appear in `wt`.
+
+        Returns
+        -------
+        MeltComposition
+        """
+        wt = np.asarray(wt, dtype=float)
+        index = column_index(columns)
+        if wt.shape[-1] != len(index):
+            raise core.InputError(f"Expected {len(index)} columns to match `columns`,\
+                 got shape {wt.shape}.")
+
+        full = np.zeros(wt.shape[:-1] + (len(core.oxides),))
+        full[..., index] = wt
+        present = np.zeros(len(core.oxides), dtype=bool)
+        present[index] = True
+
+        return cls(full, present)
+
+    @property
+    def mol(self):
+        """Mole fractions of the oxides, normalised to 1."""
+        if self._mol is None:
+            self._mol = core.wtOxides_to_molOxides_array(self.wt)
+        return self._mol
+
+    @property
+    def oxides(self):
+        """Names of the oxides present in the composition."""
+        return tuple(ele for ele, p in zip(core.oxides, self.present) if p)
+
+    def __len__(self):
+        return 1 if self.wt.ndim == 1 else len(self.wt)
+
+    def __getitem__(self, oxide):
+        return _column(self.mol, core.oxideIndex[oxide.lower()])
+
+    def __contains__(self, oxide):
+        return oxide.lower() in core.oxideIndex and self.present[core.oxideIndex[oxide.lower()]]
+
+    def to_dict(self, mol=False):
+        """
+        Returns the composition as a dict of the oxides present.
+
+        Parameters
+        ----------
+        mol : bool, default=False
+            Return mole fractions rather than weight percents.
+
+        Returns
+        -------
+        dict
+            {oxide: value(s)} using lowercase oxide names.
+        """
+        values = self.mol if mol else self.wt
+        return {ele: _column(values, i) for i, ele in enumerate(core.oxides) if self.present[i]}
+
+    def __repr__(self):
+        return f"MeltComposition(n={len(self)}, oxides={self.oxides})"
@@ -1,9 +1,13 @@
-# PL add warning about T/P limits
+from enum import IntEnum
 from typing import Union
 import numpy as np
 from petrobuffer import core
 from petrobuffer import buffers
+from petrobuffer import calibration
 from petrobuffer import ferric
+from petrobuffer import instrument
+from petrobuffer.composition import MeltComposition, column_index
+from petrobuffer.schema import CompositionSchema, model_species
 
 # ------------------- FO2 BUFFERS ------------------------
 
@@ -32,17 +36,48 @@ def get_relative_fo2(fO2, buffer, T, P, celsius=False):
     """
 
     if celsius == True:
-        T += 273.15    # convert temperature to K
+        T = T + 273.15    # convert temperature to K
 
-    if buffer == 'CoCoO':
-        pass
-    elif buffer == 'cocoo':
-        buffer = 'CoCoO'
-    else:
-        buffer = buffer.upper()
+    buffer = buffers.buffer_name(buffer)
 
     return fO2 - buffers.calcBuffer(buffer, T, P)
 
+def get_relative_fo2_all(fO2, T, P, celsius=False, names=None):
+    """
+    Calculates fO2 relative to every registered buffer (or those in
+    `names`) in one call.
+
+    Parameters
+    ----------
+    fO2 : float or array-like
+        absolute fO2, as log10(fO2)
+    T : float or array-like
+        Temperature in degrees K
+    P : float or array-like
+        Pressure in bar
+    celsius : bool, default=False
+        Whether temperatures are in Kelvin (`False`) or celsius (`True`)
+    names : list of str, optional
+        Buffers to give fO2 relative to. Defaults to all registered buffers.
+
+    Returns
+    -------
+    buffers.BufferMatrix
+        Buffer names, and an (N, n_buffers) array of fO2 relative to each
+        buffer, given as log10(fO2)
+    """
+
+    if celsius == True:
+        T = T + 273.15    # convert temperature to K
+
+    fO2, T, P = np.broadcast_arrays(np.atleast_1d(np.asarray(fO2, dtype=float)),
+                                    np.asarray(T, dtype=float), np.asarray(P, dtype=float))
+
+    result = buffers.calcBuffers(T, P, names)
+    np.subtract(fO2.ravel()[:, np.newaxis], result.values, out=result.values)
+
+    return result
+
 def get_absolute_fo2(fO2, buffer, T, P, celsius=False):
     """
     Main function to calculate fO2 in terms of a given buffer.
@@ -68,14 +103,9 @@ def get_absolute_fo2(fO2, buffer, T, P, celsius=False):
     """
 
     if celsius == True:
-        T += 273.15    # convert temperature to K
+        T = T + 273.15    # convert temperature to K
 
-    if buffer == 'CoCoO':
-        pass
-    elif buffer == 'cocoo':
-        buffer = 'CoCoO'
-    else:
-        buffer = buffer.upper()
+    buffer = buffers.buffer_name(buffer)
 
     return fO2 + buffers.calcBuffer(buffer, T, P)
 
@@ -104,22 +134,19 @@ def convert_buffer(fO2:Union[float, int], old_buffer:str, new_buffer:str, T:Unio
     Returns
     -------
     float
-        fO2 relative to the new buffer, given as log10(fO2)
+        fO2 relative to the new buffer, given as log10(fO2). If `T` or `P`
+        are arrays, both buffers are evaluated together with
+        `buffers.buffer_difference` and an array is returned.
     """
 
     if celsius == True:
-        T += 273.15    # convert temperature to K
+        T = T + 273.15    # convert temperature to K
     
-    bfs = [old_buffer, new_buffer]
-    for idx, buffer in enumerate(bfs):
-        if buffer == 'CoCoO':
-            pass
-        elif buffer == 'cocoo':
-            bfs[idx] = 'CoCoO'
-        else:
-            bfs[idx] = buffer.upper()
+    old_buffer = buffers.buffer_name(old_buffer)
+    new_buffer = buffers.buffer_name(new_buffer)
 
-    old_buffer, new_buffer = bfs
+    if np.ndim(T) > 0 or np.ndim(P) > 0:
+        return fO2 + buffers.buffer_difference(old_buffer, new_buffer, T, P)
     
     absolute_fo2 = fO2 + buffers.calcBuffer(old_buffer, T, P)
 
@@ -137,9 +164,10 @@ def get_ironOxide(C:dict, fO2:Union[float, int], T:Union[float, int],
 
     Parameters
     ----------
-    C : dict
+    C : dict or MeltComposition
         Major element composition of the silicate melt as weight percents.
-        Required species: Al2O3, FeOt, CaO, Na2O (+ K2O if using r2013)    
+        Required species: Al2O3, FeOt, CaO, Na2O (+ K2O if using r2013)
+        A `MeltComposition` is passed straight to `get_ironOxide_batch`.
     fO2 : float or int
         fO2 as either an absolute value given as log10(fO2), or relative
         to a buffer if one is specified in the `buffer` argument.    
@@ -165,21 +193,29 @@ def get_ironOxide(C:dict, fO2:Union[float, int], T:Union[float, int],
     float
         Fe2O3/FeO mole ratio
     dict
-        New melt major oxide composition as wt%
+        New melt major oxide composition as wt%, or a `MeltComposition`
+        if `C` was given as one.
     """
+
+    if isinstance(C, MeltComposition):
+        F, C_new = get_ironOxide_batch(C, fO2, T, P, celsius, normalised_comp, buffer,
+                                       force_model, check_calibration=False)
+        return (F[0] if C.wt.ndim == 1 else F), C_new
     
     force_options = ['kc1991', 'r2013']
     if force_model is not None and force_model not in force_options:
         raise core.InputError(f"Invalid model option. Expected either {None} or one of:\
              {force_options}")
 
-    buffer_options = ['QIF', 'IW', 'WM', 'IM', 'CoCoO', 'FMQ', 'NNO', 'MH']
+    buffer_options = list(buffers.buffer_registry)
     if buffer is not None and buffer not in buffer_options:
         raise core.InputError(f"Invalid buffer. Expected either {None} or one of:\
              {buffer_options}")
     
+    clock = instrument.stopwatch()
+
     if celsius == True:
-        T += 273.15    # convert degrees C to K
+        T = T + 273.15    # convert degrees C to K
         
     C_lower = dict((k.lower(), v) for k,v in C.items())
     original_sum = sum(C.values())
@@ -218,19 +254,24 @@ def get_ironOxide(C:dict, fO2:Union[float, int], T:Union[float, int],
         raise core.InputError(f"Some of the required species for calculating the ferric\
             /ferrous ratio are missing. Include all of {required_species}, where FeO is\
                 total iron.")
+    clock.lap('normalisation')
 
     oxide_mf = core.wtOxides_to_molOxides(C_lower.copy())
+    clock.lap('mole conversion')
 
     # convert fO2 to ln(fO2)
     if isinstance(buffer, str):
         lnfO2 = np.log(10**(get_absolute_fo2(fO2, buffer, T, P)))
     else:
         lnfO2 = np.log(10**(fO2))
+    clock.lap('buffer offset')
     
     if force_model == 'kc1991':
         F = ferric.fo2_to_iron_kc91(oxide_mf, T, core.bar_to_pa(P), lnfO2)
     elif force_model == 'r2013':
         F = ferric.fo2_to_iron_r13(oxide_mf, T, core.bar_to_gpa(P), lnfO2)
+    instrument.count_models(force_model == 'kc1991')
+    clock.lap('model evaluation')
 
     oxide_mf['feo'] = oxide_mf['feo']/(2*F + 1)
     oxide_mf['fe2o3'] = oxide_mf['feo']*F
@@ -248,12 +289,14 @@ def get_ironOxide(C:dict, fO2:Union[float, int], T:Union[float, int],
         for sp in C:
             C_lower[sp] = C_lower.pop(sp.lower())
         C_lower['Fe2O3'] = C_lower.pop('fe2o3')
+        clock.lap('recalculation')
         return F, C_lower
     else:
         C_new = core.molOxides_to_wtOxides(oxide_mf.copy())
         for sp in C:
             C_new[sp] = C_new.pop(sp.lower())
         C_new['Fe2O3'] = C_new.pop('fe2o3')
+        clock.lap('recalculation')
         return F, C_new
     
 
@@ -264,9 +307,10 @@ def get_meltfO2(C:dict, T:Union[float, int], P:Union[float, int], celsius=False,
 
     Parameters
     ----------
-    C : dict
+    C : dict or MeltComposition
         Major element composition of the silicate melt as weight percents.
         Required species: Al2O3, FeOt, CaO, Na2O (+ K2O if using r2013)
+        A `MeltComposition` is passed straight to `get_meltfO2_batch`.
     T : float
         Temperature in degrees K    
     P : float
@@ -290,16 +334,23 @@ def get_meltfO2(C:dict, T:Union[float, int], P:Union[float, int], celsius=False,
         buffer fO2 is relative to, set with `buffer`, otherwise 'absolute'.
     """
 
+    if isinstance(C, MeltComposition):
+        fO2, buffer = get_meltfO2_batch(C, T, P, celsius, buffer, force_model,
+                                        check_calibration=False)
+        return (fO2[0] if C.wt.ndim == 1 else fO2), buffer
+
     force_options = ['kc1991', 'r2013']
     if force_model is not None and force_model not in force_options:
         raise core.InputError(f"Invalid model option. Expected either {None} or one of:\
              {force_options}")
 
-    buffer_options = ['QIF', 'IW', 'WM', 'IM', 'CoCoO', 'FMQ', 'NNO', 'MH']
+    buffer_options = list(buffers.buffer_registry)
     if buffer is not None and buffer not in buffer_options:
         raise core.InputError(f"Invalid buffer. Expected either {None} or one of:\
              {buffer_options}")
     
+    clock = instrument.stopwatch()
+
     if celsius == True:
         T = core.C2K(T)    # convert degrees C to K
         
@@ -325,7 +376,10 @@ def get_meltfO2(C:dict, T:Union[float, int], P:Union[float, int], celsius=False,
         raise core.InputError(f"Some of the required species for calculating the ferric\
             /ferrous ratio are missing. Include all of {required_species}.")
 
+    clock.lap('normalisation')
+
     oxide_mf = core.wtOxides_to_molOxides(C_lower.copy())
+    clock.lap('mole conversion')
     
     if force_model == 'kc1991':
         absolute_fo2 = np.log10(np.exp(ferric.iron_to_fo2_kc91(oxide_mf, T,
@@ -333,9 +387,596 @@ def get_meltfO2(C:dict, T:Union[float, int], P:Union[float, int], celsius=False,
     elif force_model == 'r2013':
         absolute_fo2 = np.log10(np.exp(ferric.iron_to_fo2_r13(oxide_mf, T,
          core.bar_to_gpa(P)))) 
+    instrument.count_models(force_model == 'kc1991')
+    clock.lap('model evaluation')
+
+    if isinstance(buffer, str):
+        relative_fo2 = get_relative_fo2(absolute_fo2, buffer, T, P)
+        clock.lap('buffer offset')
+        return relative_fo2, buffer
+
+    else:
+        return absolute_fo2, None
+
+# ---------------------- BATCH CONVERSIONS ------------------------------------
+
+def _schema_values(C, columns=None):
+    """
+    Returns the CompositionSchema of a batch composition given as a dict
+    of columns or as an (N, K) array with `columns`, and its values as an
+    array.
+    """
+    if isinstance(C, dict):
+        schema = CompositionSchema(C)
+        values = np.broadcast_arrays(*[np.asarray(C[k], dtype=float) for k in schema.columns])
+        return schema, np.column_stack([np.ravel(v) for v in values])
+
+    if columns is None:
+        raise core.InputError("Column names must be given with `columns` when the\
+             composition is an array.")
+    if not isinstance(columns, CompositionSchema):
+        columns = CompositionSchema(columns)
+    return columns, C
+
+def _batch_composition(C, columns=None):
+    """
+    Returns a batch composition as an (N, K) `MeltComposition`, and the
+    names to report the results under.
+
+    `C` is either a `MeltComposition`, a dict of columns, or an (N, K) array
+    whose K columns are named by `columns`, a list of names or a
+    `CompositionSchema`. A 1-D array is treated as a single sample. Names
+    are None if `C` is already a `MeltComposition`.
+    """
+    if isinstance(C, MeltComposition):
+        if C.wt.ndim == 1:
+            C = MeltComposition(C.wt[np.newaxis, :], C.present)
+        return C, None
+
+    schema, wt = _schema_values(C, columns)
+    schema.require_known()
+    return schema.composition(wt), list(schema.columns)
+
+def _iron_output_names(names):
+    """
+    Returns the names to report a recalculated composition under, with total
+    iron reported as FeO and Fe2O3 appended at the end.
+    """
+    index = column_index(names)
+    i_feo, i_fe2o3 = core.oxideIndex['feo'], core.oxideIndex['fe2o3']
+    out = []
+    for ele, i in zip(names, index):
+        if i == i_feo:
+            out.append(ele if ele.lower() == 'feo' else 'FeO')
+        elif i == i_fe2o3 and i_feo not in index:
+            out.append('FeO')
+        elif i != i_fe2o3:
+            out.append(ele)
+    return out + ['Fe2O3']
+
+def _model_mask(feo_total, force_model=None):
+    """
+    Returns a mask of the rows using the Kress & Carmichael (1991) model,
+    given their total FeO content.
+    """
+    if force_model is None:
+        return feo_total < 15.0
+    return np.full(len(feo_total), force_model == 'kc1991')
+
+def _model_subsets(use_kc91):
+    """
+    Yields each ferric model used by the rows of a batch, with a mask of
+    its rows, or None if every row uses it.
+    """
+    if use_kc91.all():
+        yield 'kc1991', None
+    elif not use_kc91.any():
+        yield 'r2013', None
+    else:
+        yield 'kc1991', use_kc91
+        yield 'r2013', ~use_kc91
+
+def _take_rows(arg, index, species):
+    """
+    Returns the rows at `index` of a per-row argument of a ferric kernel:
+    an array, or a MeltComposition, which is given as a dict of the mole
+    fractions of just the named species.
+    """
+    if isinstance(arg, MeltComposition):
+        return {sp: arg[sp].take(index) for sp in species if sp in arg}
+    return arg.take(index)
+
+def _dispatch(use_kc91, kernels, *args):
+    """
+    Evaluates `kernels[model]` for the rows using each ferric model, and
+    returns the results in row order.
+
+    The model used by most rows is evaluated on every row, as gathering
+    its rows costs more than evaluating it on the few others, which are
+    then gathered, evaluated with their own model and scattered back over
+    them. `args` are the per-row arguments of the kernels: arrays with the
+    shape of `use_kc91`, or a MeltComposition, of which only the mole
+    fractions of the iron species and those in `schema.model_species` are
+    gathered.
+    """
+    n_kc91 = np.count_nonzero(use_kc91)
+    if n_kc91 == use_kc91.size:
+        return kernels['kc1991'](*args)
+    if n_kc91 == 0:
+        return kernels['r2013'](*args)
+
+    if 2*n_kc91 >= use_kc91.size:
+        major, minor, rows = 'kc1991', 'r2013', ~use_kc91
+    else:
+        major, minor, rows = 'r2013', 'kc1991', use_kc91
+
+    out = np.asarray(kernels[major](*args))
+    index = np.flatnonzero(rows)    # gathering by index beats a boolean mask
+    species = ('feo', 'fe2o3') + model_species[minor]
+    out.flat[index] = kernels[minor](*[_take_rows(arg, index, species) for arg in args])
+    return out
+
+def _check_species(present, use_kc91, iron, message=''):
+    """
+    Raises an InputError if the rows using either ferric model lack any of
+    the species that model requires, given which species are present.
+    """
+    for model, rows in _model_subsets(use_kc91):
+        species = model_species[model]
+        required_species = [species[0], *iron, *species[1:]]
+        if not all(present[core.oxideIndex[item]] for item in required_species):
+            n = len(use_kc91) if rows is None else int(rows.sum())
+            raise core.InputError(f"Some of the required species for calculating the ferric\
+                /ferrous ratio of the {n} rows using the {model} model are missing. Include\
+                    all of {required_species}{message}.")
+
+# {model: kernel of (mole fractions, T in K, P in bar, ln(fO2))} giving Fe2O3/FeO
+_iron_kernels = {
+    'kc1991': lambda C, T, P, lnfO2: ferric.fo2_to_iron_kc91(C, T, core.bar_to_pa(P), lnfO2),
+    'r2013': lambda C, T, P, lnfO2: ferric.fo2_to_iron_r13(C, T, core.bar_to_gpa(P), lnfO2)}
+
+# {model: kernel of (mole fractions, T in K, P in bar)} giving ln(fO2)
+_fo2_kernels = {
+    'kc1991': lambda C, T, P: ferric.iron_to_fo2_kc91(C, T, core.bar_to_pa(P)),
+    'r2013': lambda C, T, P: ferric.iron_to_fo2_r13(C, T, core.bar_to_gpa(P))}
+
+def _total_iron_composition(melt, force_model=None):
+    """
+    Returns a batch composition with all of its iron recast as total FeO,
+    and a mask of the rows using the Kress & Carmichael (1991) model.
+
+    Raises an InputError if the composition lacks iron, or any of the
+    species required by the models its rows use.
+    """
+    wt, present = melt.wt.copy(), melt.present.copy()
+    i_feo, i_fe2o3 = core.oxideIndex['feo'], core.oxideIndex['fe2o3']
+
+    # check iron is present in the composition, + ensure it's in the correct form
+    if present[i_fe2o3]:
+        original_sum = wt.sum(axis=1)
+        wt[:, i_feo] = (wt[:, i_feo] + 0.8998*wt[:, i_fe2o3])*100/original_sum
+        wt[:, i_fe2o3] = 0.0
+        present[i_feo], present[i_fe2o3] = True, False
+    elif not present[i_feo]:
+        raise core.InputError("Composition is missing total FeO. Please add as 'feo'.")
+
+    # check the total iron content of each row and pick an appropriate model
+    use_kc91 = _model_mask(wt[:, i_feo], force_model)
+
+    _check_species(present, use_kc91, ['feo'], ', where FeO is total iron')
+
+    return MeltComposition(wt, present), use_kc91
+
+def _ferric_models(melt, force_model=None):
+    """
+    Returns a mask of the rows of a batch composition, holding both FeO and
+    Fe2O3, using the Kress & Carmichael (1991) model.
+
+    Raises an InputError if the composition lacks either iron species, or
+    any of the species required by the models its rows use.
+    """
+    wt = melt.wt
+    i_feo, i_fe2o3 = core.oxideIndex['feo'], core.oxideIndex['fe2o3']
+
+    if not melt.present[i_feo] or not melt.present[i_fe2o3]:
+        raise core.InputError("Composition is missing an iron species. Please include\
+             both FeO and Fe2O3.")
+
+    feo_total = wt[:, i_feo] + (wt[:, i_fe2o3]/core.oxideMass['fe2o3'])*2*core.oxideMass['feo']
+    use_kc91 = _model_mask(feo_total, force_model)
+
+    _check_species(melt.present, use_kc91, ['feo', 'fe2o3'])
+
+    return use_kc91
+
+# ---------------------- ROW STATUS ---------------------------------------
+
+class RowStatus(IntEnum):
+    """
+    Status of each row of a batch conversion run with `return_status=True`.
+
+    Rows with any status other than OK are not evaluated, and are returned
+    as NaN. Where a row has several problems, the first in this list is
+    reported.
+    """
+    OK = 0
+    UNKNOWN_OXIDE = 1       # holds an oxide PetroBuffer doesn't know the mass of
+    MISSING_IRON = 2        # lacks the iron species the conversion needs
+    NON_POSITIVE_IRON = 3   # total iron, or FeO or Fe2O3 for get_meltfO2, is <= 0
+    MISSING_SPECIES = 4     # lacks a species required by the row's ferric model
+    MISSING_VALUE = 5       # any other oxide is NaN
+    INVALID_CONDITIONS = 6  # T is <= 0 K, P is < 0 bar, or T, P or fO2 is not finite
+
+def _status_composition(C, columns=None):
+    """
+    As `_batch_composition`, but leaves out any columns naming an oxide
+    without a known mass rather than raising a KeyError. Also returns a
+    mask of the rows holding a non-zero amount of any of them.
+    """
+    if isinstance(C, MeltComposition):
+        melt, names = _batch_composition(C)
+        return melt, names, np.zeros(len(melt), dtype=bool)
+
+    schema, wt = _schema_values(C, columns)
+    return schema.composition(wt), list(schema.oxide_columns), schema.unknown_rows(wt)
+
+def _row_status(melt, unknown_rows, missing_iron, non_positive_iron, use_kc91, *conditions):
+    """
+    Returns the RowStatus of each row of a batch composition, given masks of
+    the rows with each iron problem, the model each row uses, and the
+    (T, P[, fO2]) of each row.
+    """
+    missing = np.isnan(melt.wt) | ~melt.present
+    status = np.zeros(len(melt), dtype=np.int8)
+
+    def flag(rows, code):
+        status[(status == RowStatus.OK) & rows] = code
+
+    flag(unknown_rows, RowStatus.UNKNOWN_OXIDE)
+    flag(missing_iron, RowStatus.MISSING_IRON)
+    flag(non_positive_iron, RowStatus.NON_POSITIVE_IRON)
+    for model, rows in _model_subsets(use_kc91):
+        lacking = missing[:, [core.oxideIndex[sp] for sp in model_species[model]]].any(axis=1)
+        flag(lacking if rows is None else lacking & rows, RowStatus.MISSING_SPECIES)
+    flag(missing[:, melt.present].any(axis=1), RowStatus.MISSING_VALUE)
+
+    T, P = conditions[:2]
+    valid = np.isfinite(T) & (T > 0) & np.isfinite(P) & (P >= 0)
+    for values in conditions[2:]:
+        valid &= np.isfinite(values)
+    flag(~valid, RowStatus.INVALID_CONDITIONS)
+
+    return status
+
+def _ironOxide_status(melt, unknown_rows, force_model, fO2, T, P):
+    """Returns the RowStatus of each row of a batch given to `get_ironOxide_batch`."""
+    i_feo, i_fe2o3 = core.oxideIndex['feo'], core.oxideIndex['fe2o3']
+    missing = np.isnan(melt.wt) | ~melt.present
+    known = np.where(missing, 0.0, melt.wt)
+
+    # the total iron, as FeO, each row's model is picked on
+    feo_total = known[:, i_feo] + 0.8998*known[:, i_fe2o3]
+    non_positive = feo_total <= 0
+    if melt.present[i_fe2o3]:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            feo_total = feo_total*100/known.sum(axis=1)
+
+    return _row_status(melt, unknown_rows, missing[:, i_feo] & missing[:, i_fe2o3],
+                       non_positive, _model_mask(feo_total, force_model), T, P, fO2)
+
+def _meltfO2_status(melt, unknown_rows, force_model, T, P):
+    """Returns the RowStatus of each row of a batch given to `get_meltfO2_batch`."""
+    i_feo, i_fe2o3 = core.oxideIndex['feo'], core.oxideIndex['fe2o3']
+    missing = np.isnan(melt.wt) | ~melt.present
+    feo, fe2o3 = melt.wt[:, i_feo], melt.wt[:, i_fe2o3]
+
+    feo_total = feo + (fe2o3/core.oxideMass['fe2o3'])*2*core.oxideMass['feo']
+
+    return _row_status(melt, unknown_rows, missing[:, i_feo] | missing[:, i_fe2o3],
+                       (feo <= 0) | (fe2o3 <= 0), _model_mask(feo_total, force_model), T, P)
+
+# ---------------------- BATCH FUNCTIONS ----------------------------------
+
+def _check_calibration(summary, use_kc91, buffer, T, P):
+    """
+    Adds the rows of a batch outside the calibrated T-P range of their
+    ferric model, and of `buffer`, to a CalibrationSummary, unless it is None.
+    """
+    if summary is None:
+        return
+    for model, rows in _model_subsets(use_kc91):
+        summary.check(model, ferric.model_calibration[model], T, P, rows)
+    if isinstance(buffer, str):
+        summary.check(buffer, buffers.buffer_calibration.get(buffer), T, P)
+
+def _ironOxide_rows(melt, fO2, T, P, normalised_comp, buffer, force_model, clock, summary):
+    """
+    Evaluates `get_ironOxide_batch` on a batch composition, with T in K and
+    T and P broadcast to one value per row. Returns F, and the new
+    compositions as an (N, K) array of wt% and the species present. Range
+    checks are added to `summary`, unless it is None.
+    """
+    melt, use_kc91 = _total_iron_composition(melt, force_model)
+    wt, present = melt.wt, melt.present.copy()
+    i_feo, i_fe2o3 = core.oxideIndex['feo'], core.oxideIndex['fe2o3']
+    n = len(wt)
+    clock.lap('normalisation')
+
+    mol = melt.mol
+    clock.lap('mole conversion')
+
+    # convert fO2 to ln(fO2)
+    if isinstance(buffer, str):
+        lnfO2 = (fO2 + buffers.calcBuffer_array(buffer, T, P))*np.log(10)
+    else:
+        lnfO2 = np.broadcast_to(fO2, n)*np.log(10)
+    clock.lap('buffer offset')
+
+    F = _dispatch(use_kc91, _iron_kernels, melt, T, P, lnfO2)
+    instrument.count_models(use_kc91)
+    clock.lap('model evaluation')
+
+    _check_calibration(summary, use_kc91, buffer, T, P)
+    clock.lap('range check')
+
+    # hold the mole fraction of total Fe constant and recalculate XFeO and XFe2O3.
+    mol = mol.copy()
+    mol[:, i_feo] = mol[:, i_feo]/(2*F + 1)
+    mol[:, i_fe2o3] = mol[:, i_feo]*F
+    present[i_fe2o3] = True
+    wt_new = core.molOxides_to_wtOxides_array(mol, out=mol)
+
+    if normalised_comp == False:
+        wt[:, [i_feo, i_fe2o3]] = wt_new[:, [i_feo, i_fe2o3]]
+        wt_new = wt
+    clock.lap('recalculation')
+
+    return F, wt_new, present
+
+def get_ironOxide_batch(C, fO2, T, P, celsius=False, normalised_comp=True,
+                        buffer:str = None, force_model:str = None, columns=None,
+                        return_status=False, check_calibration=True):
+    """
+    Returns the ferric/ferrous (Fe2O3/FeO) mole ratios of many melts given fO2.
+
+    Vectorised version of `get_ironOxide`, which evaluates N compositions
+    in a single pass. Each row gives the same result as `get_ironOxide`
+    called on that row alone, including the choice of model.
+
+    Parameters
+    ----------
+    C : dict, numpy.ndarray or MeltComposition
+        Major element compositions of the silicate melts as weight percents.
+        Either a dict of columns, {oxide: array of N values}, an (N, K)
+        array with the oxide names given in `columns`, or a `MeltComposition`.
+        Required species: Al2O3, FeOt, CaO, Na2O (+ K2O if using r2013)
+    fO2 : float or array-like
+        fO2 as either an absolute value given as log10(fO2), or relative
+        to a buffer if one is specified in the `buffer` argument.
+    T : float or array-like
+        Temperature in degrees K
+    P : float or array-like
+        Pressure in bar
+    celsius : bool, default=False
+        If true, `T` can be given in Celsius rather than degrees Kelvin.
+    normalised_comp : bool, default=True
+        Selects whether the compositions being returned are normalised, or
+        if only the Fe2O3 and FeO is recalculated.
+    buffer : str, optional
+        The buffer `fO2` is relative to if it is not an absolute value.
+        One of QIF, IW, WM, IM, CoCoO, FMQ, NNO, MH.
+    force_model : str, optional
+        Forces the model used, rather than allowing selection based on
+        total FeO content. One from `kc1991` (Kress & Carmichael 1991)
+        or `r2013` (Righter et.al., 2013).
+    columns : list of str or CompositionSchema, optional
+        Names of the oxides in each column of `C`, if it is an array, or a
+        `CompositionSchema` compiled from them once for many calls.
+    return_status : bool, default=False
+        If true, rows which can't be evaluated, e.g. lacking a required
+        species or holding an unknown oxide, are returned as NaN rather
+        than raising an exception, and the `RowStatus` of each row is
+        returned too. Columns of unknown oxides are left out of the
+        returned compositions.
+    check_calibration : bool, default=True
+        If true, the T and P of the rows are checked against the calibrated
+        ranges of their ferric model and of `buffer`, and one
+        `calibration.CalibrationWarning` summarising the rows outside them
+        is issued. Inside a `calibration.collect` block the counts are
+        added to its summary instead.
+
+    Returns
+    -------
+    numpy.ndarray
+        Fe2O3/FeO mole ratio of each melt
+    dict or MeltComposition
+        New melt major oxide compositions as wt%, as a dict of columns, or
+        as a `MeltComposition` if `C` was given as one.
+    numpy.ndarray
+        `RowStatus` of each row, as int8. Only returned if `return_status`
+        is true.
+    """
+
+    force_options = ['kc1991', 'r2013']
+    if force_model is not None and force_model not in force_options:
+        raise core.InputError(f"Invalid model option. Expected either {None} or one of:\
+             {force_options}")
+
+    buffer_options = list(buffers.buffer_registry)
+    if buffer is not None and buffer not in buffer_options:
+        raise core.InputError(f"Invalid buffer. Expected either {None} or one of:\
+             {buffer_options}")
+
+    clock = instrument.stopwatch()
+    summary = calibration.CalibrationSummary() if check_calibration else None
+    if return_status:
+        melt, names, unknown_rows = _status_composition(C, columns)
+    else:
+        melt, names = _batch_composition(C, columns)
+    n = len(melt)
+
+    if celsius == True:
+        T = T + 273.15    # convert degrees C to K
+    T, P = np.broadcast_to(T, n), np.broadcast_to(P, n)
+
+    if not return_status:
+        F, wt_new, present = _ironOxide_rows(melt, fO2, T, P, normalised_comp, buffer,
+                                             force_model, clock, summary)
+    else:
+        fO2 = np.broadcast_to(fO2, n)
+        status = _ironOxide_status(melt, unknown_rows, force_model, fO2, T, P)
+        ok = status == RowStatus.OK
+
+        if ok.all():
+            F, wt_new, present = _ironOxide_rows(melt, fO2, T, P, normalised_comp, buffer,
+                                                 force_model, clock, summary)
+        else:
+            # evaluate the valid rows only, and leave the rest as NaN
+            F, wt_new = np.full(n, np.nan), np.full(melt.wt.shape, np.nan)
+            present = melt.present.copy()
+            present[[core.oxideIndex['feo'], core.oxideIndex['fe2o3']]] = True
+            if ok.any():
+                F[ok], wt_new[ok], present = _ironOxide_rows(
+                    MeltComposition(melt.wt[ok], melt.present), fO2[ok], T[ok], P[ok],
+                    normalised_comp, buffer, force_model, clock, summary)
+
+    if names is None:
+        C_new = MeltComposition(wt_new if C.wt.ndim == 2 else wt_new[0], present)
+    else:
+        out_names = _iron_output_names(names)
+        C_new = {sp: wt_new[:, i] for sp, i in zip(out_names, column_index(out_names))}
+
+    if summary is not None:
+        calibration.report(summary)
+
+    if return_status:
+        return F, C_new, status
+
+    return F, C_new
+
+def _meltfO2_rows(melt, T, P, buffer, force_model, clock, summary):
+    """
+    Evaluates `get_meltfO2_batch` on a batch composition, with T in K and
+    T and P broadcast to one value per row. Returns the fO2 of each row.
+    Range checks are added to `summary`, unless it is None.
+    """
+    use_kc91 = _ferric_models(melt, force_model)
+    clock.lap('normalisation')
+
+    melt.mol    # calculated once, and shared by the rows of both models
+    clock.lap('mole conversion')
+
+    lnfO2 = _dispatch(use_kc91, _fo2_kernels, melt, T, P)
+    absolute_fo2 = lnfO2/np.log(10)
+    instrument.count_models(use_kc91)
+    clock.lap('model evaluation')
+
+    _check_calibration(summary, use_kc91, buffer, T, P)
+    clock.lap('range check')
 
     if isinstance(buffer, str):
-        return get_relative_fo2(absolute_fo2, buffer, T, P), buffer
+        relative_fo2 = absolute_fo2 - buffers.calcBuffer_array(buffer, T, P)
+        clock.lap('buffer offset')
+        return relative_fo2
+
+    return absolute_fo2
+
+def get_meltfO2_batch(C, T, P, celsius=False, buffer:str = None,
+                      force_model:str = None, columns=None, return_status=False,
+                      check_calibration=True):
+    """
+    Returns the fO2 of many melts, given their FeO and Fe2O3 contents.
+
+    Vectorised version of `get_meltfO2`, which evaluates N compositions
+    in a single pass. Each row gives the same result as `get_meltfO2`
+    called on that row alone, including the choice of model.
+
+    Parameters
+    ----------
+    C : dict, numpy.ndarray or MeltComposition
+        Major element compositions of the silicate melts as weight percents.
+        Either a dict of columns, {oxide: array of N values}, an (N, K)
+        array with the oxide names given in `columns`, or a `MeltComposition`.
+        Required species: Al2O3, FeO, Fe2O3, CaO, Na2O (+ K2O if using r2013)
+    T : float or array-like
+        Temperature in degrees K
+    P : float or array-like
+        Pressure in bar
+    celsius : bool, default=False
+        If true, `T` can be given in Celsius rather than degrees Kelvin.
+    buffer : str, optional
+        The buffer the returned fO2 should be is relative to. If None, fO2
+        is returned as an absolute value (log10(fO2)).
+        One of QIF, IW, WM, IM, CoCoO, FMQ, NNO, MH.
+    force_model : str, optional
+        Forces the model used, rather than allowing selection based on
+        total FeO content. One from `kc1991` (Kress & Carmichael 1991)
+        or `r2013` (Righter et.al., 2013).
+    columns : list of str or CompositionSchema, optional
+        Names of the oxides in each column of `C`, if it is an array, or a
+        `CompositionSchema` compiled from them once for many calls.
+    return_status : bool, default=False
+        If true, rows which can't be evaluated, e.g. lacking FeO or Fe2O3
+        or holding an unknown oxide, are returned as NaN rather than
+        raising an exception, and the `RowStatus` of each row is returned
+        too.
+    check_calibration : bool, default=True
+        If true, the T and P of the rows are checked against the calibrated
+        ranges of their ferric model and of `buffer`, as for
+        `get_ironOxide_batch`.
 
+    Returns
+    -------
+    numpy.ndarray
+        fO2 of each melt as log10(fO2)
+    str
+        buffer fO2 is relative to, set with `buffer`, otherwise None.
+    numpy.ndarray
+        `RowStatus` of each row, as int8. Only returned if `return_status`
+        is true.
+    """
+
+    force_options = ['kc1991', 'r2013']
+    if force_model is not None and force_model not in force_options:
+        raise core.InputError(f"Invalid model option. Expected either {None} or one of:\
+             {force_options}")
+
+    buffer_options = list(buffers.buffer_registry)
+    if buffer is not None and buffer not in buffer_options:
+        raise core.InputError(f"Invalid buffer. Expected either {None} or one of:\
+             {buffer_options}")
+
+    clock = instrument.stopwatch()
+    summary = calibration.CalibrationSummary() if check_calibration else None
+    if return_status:
+        melt, _, unknown_rows = _status_composition(C, columns)
+    else:
+        melt, _ = _batch_composition(C, columns)
+    n = len(melt)
+
+    if celsius == True:
+        T = core.C2K(T)    # convert degrees C to K
+    T, P = np.broadcast_to(T, n), np.broadcast_to(P, n)
+
+    if not return_status:
+        fO2 = _meltfO2_rows(melt, T, P, buffer, force_model, clock, summary)
     else:
-        return absolute_fo2, None
\ No newline at end of file
+        status = _meltfO2_status(melt, unknown_rows, force_model, T, P)
+        ok = status == RowStatus.OK
+
+        if ok.all():
+            fO2 = _meltfO2_rows(melt, T, P, buffer, force_model, clock, summary)
+        else:
+            # evaluate the valid rows only, and leave the rest as NaN
+            fO2 = np.full(n, np.nan)
+            if ok.any():
+                fO2[ok] = _meltfO2_rows(MeltComposition(melt.wt[ok], melt.present), T[ok],
+                                        P[ok], buffer, force_model, clock, summary)
+
+    if summary is not None:
+        calibration.report(summary)
+
+    if return_status:
+        return fO2, buffer, status
+
+    return fO2, buffer
@@ -16,6 +16,26 @@ oxideMass = {'sio2':  60.083,
              'coo':   44.01,    #CoO
              'fe2o3': 159.687}
 
+# fixed order of the oxides in array-backed compositions
+oxides = tuple(oxideMass)
+oxideIndex = {ele: i for i, ele in enumerate(oxides)}
+
+_oxideMass_array = None
+
+def _oxide_masses():
+    """Returns the molar masses of `oxides` as an array, built on first use."""
+    global _oxideMass_array
+    if _oxideMass_array is None:
+        import numpy as np
+        _oxideMass_array = np.array([oxideMass[ele] for ele in oxides])
+    return _oxideMass_array
+
+def __getattr__(name):
+    # `oxideMass_array` imports NumPy, so it is only built when first used
+    if name == 'oxideMass_array':
+        return _oxide_masses()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # -------------CORE DEFINITIONS------------- #
 class Error(Exception):
     """Base class for exceptions in this module."""
@@ -112,3 +132,67 @@ def molOxides_to_wtOxides(Cmol:dict)->dict:
 
     return Cwt
 
+def _mass_vector(columns):
+    """Returns the molar masses of the named oxides, or of all `oxides` if None."""
+    import numpy as np
+    if columns is None:
+        return _oxide_masses()
+    for ele in columns:
+        if ele.lower() not in oxideMass:
+            raise KeyError(f"Sorry, I don't know the mass of '{ele}'.")
+    return np.array([oxideMass[ele.lower()] for ele in columns])
+
+def wtOxides_to_molOxides_array(wt, columns=None, out=None):
+    """
+    Converts an array of major element compositions from wt % to mole frac.
+
+    Parameters
+    ----------
+    wt : numpy.ndarray
+        Major element composition(s) as weight percents, of shape (K,)
+        or (N, K).
+    columns : list of str, optional
+        Names of the K oxides. Defaults to the order of `oxides`.
+    out : numpy.ndarray, optional
+        Array of the same shape as `wt` to write the result into. May be
+        `wt` itself.
+
+    Returns
+    -------
+    numpy.ndarray
+        major element composition(s) as mole fractions, normalised to 1
+    """
+    import numpy as np
+
+    out = np.divide(wt, _mass_vector(columns), out=out)
+    out /= out.sum(axis=-1, keepdims=True)
+
+    return out
+
+def molOxides_to_wtOxides_array(mol, columns=None, out=None):
+    """
+    Converts an array of major element compositions from mol frac to
+    normalised wt%.
+
+    Parameters
+    ----------
+    mol : numpy.ndarray
+        Major element composition(s) as mole fractions, of shape (K,)
+        or (N, K).
+    columns : list of str, optional
+        Names of the K oxides. Defaults to the order of `oxides`.
+    out : numpy.ndarray, optional
+        Array of the same shape as `mol` to write the result into. May be
+        `mol` itself.
+
+    Returns
+    -------
+    numpy.ndarray
+        major element composition(s) as weight percents, normalised to 100
+    """
+    import numpy as np
+
+    out = np.multiply(mol, _mass_vector(columns), out=out)
+    out *= 100/out.sum(axis=-1, keepdims=True)
+
+    return out
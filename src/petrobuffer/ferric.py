@@ -1,4 +1,12 @@
 import numpy as np
+from petrobuffer.calibration import CalibrationRange
+
+# {model: CalibrationRange}, approximately the T-P ranges of the experiments
+# each model was fitted to. Checked by the batch conversions.
+model_calibration = {
+    'kc1991': CalibrationRange(1200+273.15, 1630+273.15, 0, 3e4,
+                               'Kress and Carmichael (1991)'),
+    'r2013': CalibrationRange(1200+273.15, 1900+273.15, 0, 4e4, 'Righter et al. (2013)')}
 
 def fo2_to_iron_kc91(C,T,P,lnfo2):
     """
@@ -46,17 +54,8 @@ def fo2_to_iron_kc91(C,T,P,lnfo2):
     h = 3.85e-17                K/Pa^2        
     """
 
-    dal2o3 = -2.243
-    dfeo = -1.828
-    dcao = 3.201
-    dna2o = 5.854
-    dk2o = 6.215
-
-    T0 = 1673.0                 # K
-
-    F = np.exp(0.196*lnfo2 + 1.1492e4/T -6.675 + dal2o3*C['al2o3'] + dfeo*C['feo']
-        + dcao*C['cao'] + dna2o*C['na2o'] + dk2o*C['k2o'] - 3.36*(1.0 - T0/T
-        - np.log(T/T0)) - 7.01e-7*P/T - 1.54e-10*(T-T0)*P/T + 3.85e-17*P**2/T)
+    F = np.exp(0.196*lnfo2 + kc91_conditions_term(T, P)
+        + kc91_composition_term(C, C['feo']))
 
     return F
 
@@ -105,18 +104,10 @@ def iron_to_fo2_kc91(C,T,P):
     h = 3.85e-17                K/Pa^2        
     """
 
-    dal2o3 = -2.243
-    dfeo = -1.828
-    dcao = 3.201
-    dna2o = 5.854
-    dk2o = 6.215
-
-    T0 = 1673.0  # K
     FeOt = C['feo'] + C['fe2o3']*0.8998 # total iron as a mole fraction
 
-    FO2 = (np.log(C['fe2o3']/C['feo']) - 1.1492e4/T + 6.675 - dal2o3*C['al2o3']
-        - dfeo*(FeOt) - dcao*C['cao'] - dna2o*C['na2o'] - dk2o*C['k2o'] + 3.36*(1.0 - T0/T
-        - np.log(T/T0)) + 7.01e-7*(P/T) + 1.54e-10*(T-T0)*P/T - 3.85e-17*P**2/T)/0.196
+    FO2 = (np.log(C['fe2o3']/C['feo']) - kc91_conditions_term(T, P)
+        - kc91_composition_term(C, FeOt))/0.196
 
     return FO2
 
@@ -147,21 +138,9 @@ def fo2_to_iron_r13(C, T, P, lnfo2):
     Righter et al. (2013) Redox systematics of martian magmas with
     implications for magnetite stability.
     """
-    a = 0.22
-    b = 3800
-    c = -370
-    dfeo = -6.6
-    dal2o3 = 7.3
-    dcao = 17.3
-    dna2o = 132.3
-    dk2o = -147.8
-    dp2o5 = 0.6
-    j = -4.26       
-    
 
-    F = np.exp(a*lnfo2 + b/T + c*(P/T) + dfeo*C['feo'] + dal2o3*C['al2o3']
-        + dcao*C['cao'] + dna2o*C['na2o'] + dk2o*C['k2o'] + dp2o5*C['p2o5'] + j)
-    
+    F = np.exp(0.22*lnfo2 + r13_conditions_term(T, P) + r13_composition_term(C, C['feo']))
+
     return F
 
 def iron_to_fo2_r13(C, T, P):
@@ -189,22 +168,111 @@ def iron_to_fo2_r13(C, T, P):
     Righter et al. (2013) Redox systematics of martian magmas with 
     implications for magnetite stability.
     """
-    a = 0.22
-    b = 3800
-    c = -370
+
+    FeOt = C['feo'] + C['fe2o3']*0.8998     # total iron mole fraction
+
+    lnfo2 = (np.log(C['fe2o3']/C['feo']) - (r13_conditions_term(T, P)
+            + r13_composition_term(C, FeOt)))/0.22
+
+    return lnfo2
+
+def kc91_composition_term(C, FeOt):
+    """
+    Returns the composition term, sum(d_i*X_i), of the Kress and
+    Carmichael (1991) model.
+
+    Parameters
+    ----------
+    C : dictionary
+        Major element composition of the silicate melt as mole fractions
+        Required species: Al2O3, CaO, Na2O, K2O
+    FeOt : float
+        Total iron as a mole fraction
+
+    Returns
+    -------
+    float
+        sum(d_i*X_i)
+    """
+    dal2o3 = -2.243
+    dfeo = -1.828
+    dcao = 3.201
+    dna2o = 5.854
+    dk2o = 6.215
+
+    return (dal2o3*C['al2o3'] + dfeo*FeOt + dcao*C['cao'] + dna2o*C['na2o']
+        + dk2o*C['k2o'])
+
+def kc91_conditions_term(T, P):
+    """
+    Returns the temperature and pressure terms of the Kress and Carmichael
+    (1991) model, b/T + c + e*[1-T0/T-ln(T/T0)] + f*P/T + g*[(T-T0)*P]/T
+    + h*P^2/T.
+
+    Parameters
+    ----------
+    T : float
+        Temperature in degrees K
+    P : float
+        Pressure in pascals (Pa)
+
+    Returns
+    -------
+    float
+        Sum of the temperature and pressure terms
+    """
+    T0 = 1673.0                 # K
+
+    return (1.1492e4/T - 6.675 - 3.36*(1.0 - T0/T - np.log(T/T0)) - 7.01e-7*P/T
+        - 1.54e-10*(T-T0)*P/T + 3.85e-17*P**2/T)
+
+def r13_composition_term(C, FeOt):
+    """
+    Returns the composition term, sum(d_i*X_i), of the Righter et al.
+    (2013) model.
+
+    Parameters
+    ----------
+    C : dictionary
+        Major element composition of the silicate melt as mole fractions
+        Required species: Al2O3, CaO, Na2O, K2O, P2O5
+    FeOt : float
+        Total iron as a mole fraction
+
+    Returns
+    -------
+    float
+        sum(d_i*X_i)
+    """
     dfeo = -6.6
     dal2o3 = 7.3
     dcao = 17.3
     dna2o = 132.3
     dk2o = -147.8
     dp2o5 = 0.6
-    j = -4.26       
-    
 
-    FeOt = C['feo'] + C['fe2o3']*0.8998     # total iron mole fraction
+    return (dfeo*FeOt + dal2o3*C['al2o3'] + dcao*C['cao'] + dna2o*C['na2o']
+        + dk2o*C['k2o'] + dp2o5*C['p2o5'])
 
-    lnfo2 = (np.log(C['fe2o3']/C['feo']) - (b/T + c*(P/T) + dfeo*(FeOt)
-            + dal2o3*C['al2o3']  + dcao*C['cao'] + dna2o*C['na2o'] + dk2o*C['k2o']
-            + dp2o5*C['p2o5'] + j))/a
-    
-    return lnfo2
\ No newline at end of file
+def r13_conditions_term(T, P):
+    """
+    Returns the temperature and pressure terms of the Righter et al.
+    (2013) model, b/T + c*P/T + j.
+
+    Parameters
+    ----------
+    T : float
+        Temperature in degrees K
+    P : float
+        Pressure in gigapascals (GPa)
+
+    Returns
+    -------
+    float
+        Sum of the temperature and pressure terms
+    """
+    b = 3800
+    c = -370
+    j = -4.26
+
+    return b/T + c*(P/T) + j
@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+# the Instrumentation being recorded into, or None while instrumentation is off
+_active = None
+
+# guards updates of `_active`'s counters from several threads, e.g. the
+# chunks of `parallel.run_threaded`. Only taken while instrumentation is on.
+_lock = threading.Lock()
+
+class Instrumentation:
+    """
+    Counts of the models and buffer branches used, and the time spent in
+    each stage of the conversions, recorded inside an `instrument` block.
+
+    Attributes
+    ----------
+    models : collections.Counter
+        Number of melts evaluated with each ferric model, 'kc1991' or 'r2013'.
+    branches : collections.Counter
+        Number of points evaluated with each buffer branch, keyed on
+        (buffer name, index of the branch in `buffers.buffer_registry`).
+    times : dict
+        Total time in seconds spent in each stage: 'normalisation',
+        'mole conversion', 'buffer offset', 'model evaluation', 'range
+        check' and 'recalculation'.
+    calls : collections.Counter
+        Number of times each stage was run.
+    """
+
+    def __init__(self):
+        self.models = Counter()
+        self.branches = Counter()
+        self.times = defaultdict(float)
+        self.calls = Counter()
+
+    def update(self, other):
+        """Adds all the counts and timings of another Instrumentation."""
+        self.models.update(other.models)
+        self.branches.update(other.branches)
+        for stage, t in other.times.items():
+            self.times[stage] += t
+        self.calls.update(other.calls)
+
+    def summary(self):
+        """Returns the recorded counts and timings as a printable table."""
+        lines = ['model               melts']
+        lines += [f'  {model:<16} {n:>8}' for model, n in sorted(self.models.items())]
+        lines += ['buffer branch       points']
+        lines += [f'  {name + "[" + str(i) + "]":<16} {n:>8}'
+                  for (name, i), n in sorted(self.branches.items())]
+        lines += ['stage               calls   total (s)']
+        lines += [f'  {stage:<16} {self.calls[stage]:>8} {t:>11.6f}'
+                  for stage, t in sorted(self.times.items(), key=lambda x: -x[1])]
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return (f"Instrumentation(models={dict(self.models)}, branches={dict(self.branches)},"
+                f" times={dict(self.times)})")
+
+@contextmanager
+def instrument():
+    """
+    Records model choices, buffer branches and stage timings of every
+    conversion run inside the block.
+
+    Recording is process-wide: calls from other threads during the block
+    are recorded too, with their updates serialised by a lock. Blocks may
+    be nested, like `calibration.collect`: the inner block records what
+    runs inside it, and adds its counts to the enclosing block when it
+    ends. Outside a block the only cost is a check of whether
+    instrumentation is on.
+
+    Yields
+    ------
+    Instrumentation
+        The counts and timings, filled in as the block runs.
+
+    Examples
+    --------
+    >>> with instrument() as record:
+    ...     get_ironOxide_batch(C, -1, T, P, buffer='FMQ')
+    >>> print(record.summary())
+    """
+    global _active
+    previous, _active = _active, Instrumentation()
+    try:
+        yield _active
+    finally:
+        record, _active = _active, previous
+    if previous is not None:
+        previous.update(record)
+
+class _Stopwatch:
+    """Adds the time since the previous lap to a stage of an Instrumentation."""
+    __slots__ = ('record', 'last')
+
+    def __init__(self, record):
+        self.record = record
+        self.last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        with _lock:
+            self.record.times[stage] += now - self.last
+            self.record.calls[stage] += 1
+        self.last = now
+
+class _NoStopwatch:
+    __slots__ = ()
+
+    def lap(self, stage):
+        pass
+
+_no_stopwatch = _NoStopwatch()
+
+def enabled():
+    """Whether an `instrument` block is recording."""
+    return _active is not None
+
+def stopwatch():
+    """Returns a stopwatch timing the stages of one call, which does
+    nothing while instrumentation is off."""
+    return _no_stopwatch if _active is None else _Stopwatch(_active)
+
+def count_models(use_kc91, n=1):
+    """
+    Records the models chosen for `n` melts, given a bool or a boolean array
+    of which use Kress & Carmichael (1991).
+    """
+    if _active is None:
+        return
+    if isinstance(use_kc91, bool):
+        counts = {'kc1991' if use_kc91 else 'r2013': n}
+    else:
+        kc91 = int(use_kc91.sum())
+        counts = {'kc1991': kc91, 'r2013': use_kc91.size - kc91}
+    with _lock:
+        _active.models.update(counts)
+
+def count_branch(name, index, n=1):
+    """Records `n` points evaluated with branch `index` of buffer `name`."""
+    if _active is not None:
+        with _lock:
+            _active.branches[(name, index)] += n
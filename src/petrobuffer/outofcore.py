@@ -0,0 +1,241 @@
+import os
+
+import numpy as np
+from petrobuffer import core
+from petrobuffer import buffers
+from petrobuffer import calibration
+from petrobuffer import conversions
+from petrobuffer.schema import CompositionSchema
+
+# 2**16 float64 values (512 kB) per input array keeps each chunk in cache
+default_chunk_size = 2**16
+
+def _open_input(x):
+    """Opens a .npy path as a read-only memory map, or returns the array."""
+    if isinstance(x, (str, os.PathLike)):
+        return np.load(x, mmap_mode='r')
+    return x if isinstance(x, np.ndarray) else np.asarray(x, dtype=float)
+
+def _open_output(out, shape):
+    """Creates a .npy memory map at a path, or checks a given output array."""
+    if out is None:
+        return np.empty(shape)
+    if isinstance(out, (str, os.PathLike)):
+        return np.lib.format.open_memmap(out, mode='w+', dtype=float, shape=shape)
+    if out.shape != shape:
+        raise core.InputError(f"Expected an output array of shape {shape}, got {out.shape}.")
+    return out
+
+def _rows(arrays):
+    """Returns the number of rows shared by the inputs, ignoring scalars."""
+    rows = {len(a) for a in arrays if np.ndim(a) > 0}
+    if len(rows) > 1:
+        raise core.InputError(f"Inputs have different numbers of rows: {sorted(rows)}.")
+    return rows.pop() if rows else 1
+
+def _chunk(a, start, stop):
+    """Reads rows start:stop of an input into memory; scalars are passed through."""
+    return np.asarray(a[start:stop], dtype=float) if np.ndim(a) > 0 else a
+
+def _schema(columns):
+    """Compiles the column names of a composition input, once for all of its chunks."""
+    return columns if isinstance(columns, CompositionSchema) else CompositionSchema(columns)
+
+def _finish(out):
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
+
+def calcBuffer(name, T, P, out=None, chunk_size:int=default_chunk_size):
+    """
+    Calculates the fO2 of a buffer over 1-D arrays of T and P too large
+    to hold in memory.
+
+    Inputs are read, and results written, `chunk_size` rows at a time.
+
+    Parameters
+    ----------
+    name : str
+        Name of the buffer.
+    T : float, array-like or path
+        Temperature in degrees K, as a scalar, an array/`np.memmap`, or the
+        path to a .npy file which is memory-mapped.
+    P : float, array-like or path
+        Pressure in bar, in any of the forms of `T`.
+    out : numpy.ndarray or path, optional
+        Array, or .npy path to create as a memory map, to write the
+        results into. A new in-memory array is used if None.
+    chunk_size : int, default=65536
+        Number of rows evaluated at a time.
+
+    Returns
+    -------
+    numpy.ndarray
+        absolute fO2, as log10(fO2). This is `out` if it was given.
+    """
+    T, P = _open_input(T), _open_input(P)
+    n = _rows([T, P])
+    out = _open_output(out, (n,))
+
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        out[start:stop] = buffers.calcBuffer_array(name, _chunk(T, start, stop),
+                                                   _chunk(P, start, stop))
+
+    return _finish(out)
+
+def convert_buffer(fO2, old_buffer:str, new_buffer:str, T, P, out=None, celsius=False,
+                   chunk_size:int=default_chunk_size):
+    """
+    Translates fO2 values from one relative buffer to another, over 1-D
+    arrays too large to hold in memory.
+
+    Parameters
+    ----------
+    fO2 : float, array-like or path
+        The current fO2, relative to `old_buffer`, as a scalar, an
+        array/`np.memmap`, or the path to a .npy file which is memory-mapped.
+    old_buffer : str
+        Name of the original buffer the `fO2` is relative to.
+    new_buffer : str
+        Name of the new buffer the fO2 should be relative to.
+    T : float, array-like or path
+        Temperature in degrees K
+    P : float, array-like or path
+        Pressure in bar
+    out : numpy.ndarray or path, optional
+        Array, or .npy path to create as a memory map, to write the
+        results into. A new in-memory array is used if None.
+    celsius : bool, default=False
+        Whether temperatures are in Kelvin (`False`) or celsius (`True`)
+    chunk_size : int, default=65536
+        Number of rows evaluated at a time.
+
+    Returns
+    -------
+    numpy.ndarray
+        fO2 relative to the new buffer, given as log10(fO2)
+    """
+    fO2, T, P = _open_input(fO2), _open_input(T), _open_input(P)
+    n = _rows([fO2, T, P])
+    out = _open_output(out, (n,))
+
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        out[start:stop] = conversions.convert_buffer(_chunk(fO2, start, stop), old_buffer,
+                                                     new_buffer, _chunk(T, start, stop),
+                                                     _chunk(P, start, stop), celsius)
+
+    return _finish(out)
+
+def get_meltfO2(C, T, P, columns, out=None, celsius=False, buffer:str = None,
+                force_model:str = None, chunk_size:int=default_chunk_size):
+    """
+    Returns the fO2 of melts from an (N, K) array of compositions too
+    large to hold in memory, using `conversions.get_meltfO2_batch`.
+
+    Parameters
+    ----------
+    C : numpy.ndarray or path
+        (N, K) array of oxide wt%, as an array/`np.memmap` or the path to
+        a .npy file which is memory-mapped.
+    T : float, array-like or path
+        Temperature in degrees K
+    P : float, array-like or path
+        Pressure in bar
+    columns : list of str or CompositionSchema
+        Names of the K oxides in `C`, which are resolved once for all of the
+        chunks.
+    out : numpy.ndarray or path, optional
+        Array, or .npy path to create as a memory map, to write the
+        results into. A new in-memory array is used if None.
+    celsius, buffer, force_model
+        As for `conversions.get_meltfO2_batch`.
+    chunk_size : int, default=65536
+        Number of rows evaluated at a time.
+
+    Returns
+    -------
+    numpy.ndarray
+        fO2 of each melt as log10(fO2), relative to `buffer` if given.
+    """
+    C, T, P = _open_input(C), _open_input(T), _open_input(P)
+    n = _rows([C, T, P])
+    out = _open_output(out, (n,))
+    columns = _schema(columns)
+
+    with calibration.collect():    # one range warning for all of the chunks
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            out[start:stop], _ = conversions.get_meltfO2_batch(
+                _chunk(C, start, stop), _chunk(T, start, stop), _chunk(P, start, stop),
+                celsius, buffer, force_model, columns=columns)
+
+    return _finish(out)
+
+def get_ironOxide(C, fO2, T, P, columns, out=None, out_composition=None, celsius=False,
+                  normalised_comp=True, buffer:str = None, force_model:str = None,
+                  chunk_size:int=default_chunk_size):
+    """
+    Returns the Fe2O3/FeO mole ratios of melts from an (N, K) array of
+    compositions too large to hold in memory, using
+    `conversions.get_ironOxide_batch`.
+
+    Parameters
+    ----------
+    C : numpy.ndarray or path
+        (N, K) array of oxide wt%, as an array/`np.memmap` or the path to
+        a .npy file which is memory-mapped.
+    fO2 : float, array-like or path
+        fO2 as either an absolute value given as log10(fO2), or relative
+        to `buffer`.
+    T : float, array-like or path
+        Temperature in degrees K
+    P : float, array-like or path
+        Pressure in bar
+    columns : list of str or CompositionSchema
+        Names of the K oxides in `C`, which are resolved once for all of the
+        chunks.
+    out : numpy.ndarray or path, optional
+        Array, or .npy path to create as a memory map, to write the
+        Fe2O3/FeO ratios into. A new in-memory array is used if None.
+    out_composition : numpy.ndarray or path, optional
+        Array, or .npy path, to write the recalculated compositions into,
+        with the columns named in the returned list. Not calculated if None.
+    celsius, normalised_comp, buffer, force_model
+        As for `conversions.get_ironOxide_batch`.
+    chunk_size : int, default=65536
+        Number of rows evaluated at a time.
+
+    Returns
+    -------
+    numpy.ndarray
+        Fe2O3/FeO mole ratio of each melt
+    numpy.ndarray or None
+        The recalculated compositions, if `out_composition` was given.
+    list of str
+        Names of the columns of the recalculated compositions.
+    """
+    C, fO2, T, P = _open_input(C), _open_input(fO2), _open_input(T), _open_input(P)
+    n = _rows([C, fO2, T, P])
+    out = _open_output(out, (n,))
+    columns = _schema(columns)
+    names = conversions._iron_output_names(list(columns.columns))
+    if out_composition is not None:
+        out_composition = _open_output(out_composition, (n, len(names)))
+
+    with calibration.collect():    # one range warning for all of the chunks
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            out[start:stop], C_new = conversions.get_ironOxide_batch(
+                _chunk(C, start, stop), _chunk(fO2, start, stop), _chunk(T, start, stop),
+                _chunk(P, start, stop), celsius, normalised_comp, buffer, force_model,
+                columns=columns)
+            if out_composition is not None:
+                for i, sp in enumerate(names):
+                    out_composition[start:stop, i] = C_new[sp]
+
+    if out_composition is not None:
+        _finish(out_composition)
+
+    return _finish(out), out_composition, names
@@ -0,0 +1,275 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+from petrobuffer import calibration
+from petrobuffer import core
+from petrobuffer import conversions
+from petrobuffer.composition import MeltComposition, column_index
+
+# ----------------------- PROCESS POOL EXECUTION ---------------------------
+
+def _share(array):
+    """Copies an array into a new shared memory block."""
+    from multiprocessing import shared_memory    # Python 3.8+, only needed here
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=float, buffer=shm.buf)[...] = array
+    return shm
+
+def _attach(name, shape):
+    """Attaches to a shared memory block created by the parent process."""
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=float, buffer=shm.buf)
+
+def _meltfO2_shard(arrays, start, stop, options):
+    melt = MeltComposition(arrays['wt'][start:stop], options.pop('present'))
+    with calibration.collect(warn=False) as summary:
+        arrays['fO2'][start:stop], _ = conversions.get_meltfO2_batch(
+            melt, arrays['T'][start:stop], arrays['P'][start:stop], **options)
+    return summary
+
+def _ironOxide_shard(arrays, start, stop, options):
+    melt = MeltComposition(arrays['wt'][start:stop], options.pop('present'))
+    with calibration.collect(warn=False) as summary:
+        arrays['F'][start:stop], melt_new = conversions.get_ironOxide_batch(
+            melt, arrays['fO2'][start:stop], arrays['T'][start:stop],
+            arrays['P'][start:stop], **options)
+    arrays['wt_new'][start:stop] = melt_new.wt
+    return summary
+
+_shard_functions = {'meltfO2': _meltfO2_shard, 'ironOxide': _ironOxide_shard}
+
+def _run_shard(function, blocks, start, stop, options):
+    """
+    Runs one shard of rows in a worker process, in place in shared memory,
+    and returns the CalibrationSummary of its range checks.
+    """
+    attached, arrays = [], {}
+    try:
+        for key, (name, shape) in blocks.items():
+            shm, arrays[key] = _attach(name, shape)
+            attached.append(shm)
+        return _shard_functions[function](arrays, start, stop, dict(options))
+    finally:
+        arrays.clear()
+        for shm in attached:
+            shm.close()
+
+def _run_sharded(function, inputs, outputs, options, workers, chunk_size):
+    """
+    Shares the input and output arrays, splits their rows into shards run
+    on a process pool, and copies the outputs back out of shared memory.
+    Also returns the range checks of all the shards as one CalibrationSummary.
+    """
+    n = len(next(iter(inputs.values())))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, -(-n // (4*workers)))
+
+    created = {}
+    try:
+        for key, array in inputs.items():
+            created[key] = (_share(np.ascontiguousarray(array, dtype=float)), array.shape)
+        for key, shape in outputs.items():
+            created[key] = (_share(np.zeros(shape)), shape)
+        blocks = {key: (shm.name, shape) for key, (shm, shape) in created.items()}
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_shard, function, blocks, start,
+                                   min(start + chunk_size, n), options)
+                       for start in range(0, n, chunk_size)]
+            summary = calibration.CalibrationSummary()
+            for future in futures:
+                summary.update(future.result())
+
+        return {key: np.ndarray(shape, dtype=float, buffer=created[key][0].buf).copy()
+                for key, shape in outputs.items()}, summary
+    finally:
+        for shm, _ in created.values():
+            shm.close()
+            shm.unlink()
+
+def get_meltfO2_parallel(C, T, P, celsius=False, buffer:str = None, force_model:str = None,
+                         columns=None, workers:int=None, chunk_size:int=None):
+    """
+    Returns the fO2 of many melts, splitting the rows across a pool of
+    processes.
+
+    The compositions, T and P are placed in shared memory rather than
+    pickled to the workers, and each worker runs `get_meltfO2_batch` on
+    its shards of rows. Results are in the input row order and identical
+    to those of `get_meltfO2_batch`.
+
+    Parameters
+    ----------
+    C, T, P, celsius, buffer, force_model, columns
+        As for `conversions.get_meltfO2_batch`.
+    workers : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    chunk_size : int, optional
+        Number of rows per shard. Defaults to splitting the rows into four
+        shards per worker.
+
+    Returns
+    -------
+    numpy.ndarray
+        fO2 of each melt as log10(fO2)
+    str
+        buffer fO2 is relative to, set with `buffer`, otherwise None.
+
+    Notes
+    -----
+    Needs Python 3.8 or later, for `multiprocessing.shared_memory`.
+    """
+    melt, _ = conversions._batch_composition(C, columns)
+    n = len(melt)
+    if celsius == True:
+        T = core.C2K(T)    # convert degrees C to K
+
+    inputs = {'wt': melt.wt, 'T': np.broadcast_to(T, n), 'P': np.broadcast_to(P, n)}
+    options = {'present': melt.present, 'buffer': buffer, 'force_model': force_model}
+    outputs, summary = _run_sharded('meltfO2', inputs, {'fO2': (n,)}, options, workers,
+                                    chunk_size)
+    calibration.report(summary)
+
+    return outputs['fO2'], buffer
+
+def get_ironOxide_parallel(C, fO2, T, P, celsius=False, normalised_comp=True,
+                           buffer:str = None, force_model:str = None, columns=None,
+                           workers:int=None, chunk_size:int=None):
+    """
+    Returns the ferric/ferrous (Fe2O3/FeO) mole ratios of many melts given
+    fO2, splitting the rows across a pool of processes.
+
+    The compositions, fO2, T and P are placed in shared memory rather than
+    pickled to the workers, and each worker runs `get_ironOxide_batch` on
+    its shards of rows. Results are in the input row order and identical
+    to those of `get_ironOxide_batch`.
+
+    Parameters
+    ----------
+    C, fO2, T, P, celsius, normalised_comp, buffer, force_model, columns
+        As for `conversions.get_ironOxide_batch`.
+    workers : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    chunk_size : int, optional
+        Number of rows per shard. Defaults to splitting the rows into four
+        shards per worker.
+
+    Returns
+    -------
+    numpy.ndarray
+        Fe2O3/FeO mole ratio of each melt
+    dict or MeltComposition
+        New melt major oxide compositions as wt%, in the same form as
+        `get_ironOxide_batch` returns them.
+
+    Notes
+    -----
+    Needs Python 3.8 or later, for `multiprocessing.shared_memory`.
+    """
+    melt, names = conversions._batch_composition(C, columns)
+    n = len(melt)
+    if celsius == True:
+        T = core.C2K(T)    # convert degrees C to K
+
+    inputs = {'wt': melt.wt, 'fO2': np.broadcast_to(fO2, n), 'T': np.broadcast_to(T, n),
+              'P': np.broadcast_to(P, n)}
+    options = {'present': melt.present, 'normalised_comp': normalised_comp,
+               'buffer': buffer, 'force_model': force_model}
+    outputs, summary = _run_sharded('ironOxide', inputs, {'F': (n,), 'wt_new': melt.wt.shape},
+                                    options, workers, chunk_size)
+    calibration.report(summary)
+
+    wt_new = outputs['wt_new']
+    if names is None:
+        present = melt.present.copy()
+        present[core.oxideIndex['feo']] = present[core.oxideIndex['fe2o3']] = True
+        if isinstance(C, MeltComposition) and C.wt.ndim == 1:
+            wt_new = wt_new[0]
+        return outputs['F'], MeltComposition(wt_new, present)
+
+    out_names = conversions._iron_output_names(names)
+    return outputs['F'], {sp: wt_new[:, i] for sp, i in zip(out_names, column_index(out_names))}
+
+# ----------------------- THREAD POOL EXECUTION ----------------------------
+
+def _slice_arg(arg, start, stop):
+    """Returns rows start:stop of an array argument, or of each column of a
+    composition; any other argument is passed through unchanged."""
+    if isinstance(arg, dict):
+        return {k: _slice_arg(v, start, stop) for k, v in arg.items()}
+    if isinstance(arg, np.ndarray) and arg.ndim > 0:
+        return arg[start:stop]
+    return arg
+
+def _arg_rows(arg):
+    if isinstance(arg, dict):
+        return {n for v in arg.values() for n in _arg_rows(v)}
+    if isinstance(arg, np.ndarray) and arg.ndim > 0:
+        return {len(arg)}
+    return set()
+
+def run_threaded(kernel, *args, out=None, chunk_size:int=2**16, workers:int=None, **kwargs):
+    """
+    Evaluates an element-wise kernel over large arrays in chunks on a pool
+    of threads.
+
+    NumPy releases the GIL inside its array operations, so chunks of a
+    kernel built from them, such as `buffers.frost1991`,
+    `buffers.calcBuffer_array`, `ferric.fo2_to_iron_kc91` or
+    `ferric.iron_to_fo2_r13`, run concurrently. Each chunk is written
+    straight into its slice of `out`, so the results are not merged or
+    copied afterwards.
+
+    Parameters
+    ----------
+    kernel : callable
+        Function whose result has one value per row of its array arguments.
+    *args
+        Arguments of `kernel`. NumPy arrays are split into chunks along
+        their first axis, as are the columns of dict arguments (e.g. a
+        composition as mole fractions) and `MeltComposition` arguments.
+        Anything else, such as a buffer name or a scalar T, is passed to
+        every chunk unchanged.
+    out : numpy.ndarray, optional
+        Preallocated array for the result. A new array is used if None.
+    chunk_size : int, default=65536
+        Number of rows evaluated per task.
+    workers : int, optional
+        Number of threads. Defaults to the number of CPUs.
+    **kwargs
+        Keyword arguments of `kernel`, split in the same way as `args`.
+
+    Returns
+    -------
+    numpy.ndarray
+        The result of `kernel` for every row. This is `out` if it was given.
+    """
+    args = [a.to_dict(mol=True) if isinstance(a, MeltComposition) else
+            np.asarray(a) if isinstance(a, (list, tuple)) else a for a in args]
+    kwargs = {k: v.to_dict(mol=True) if isinstance(v, MeltComposition) else v
+              for k, v in kwargs.items()}
+
+    rows = set().union(*[_arg_rows(a) for a in list(args) + list(kwargs.values())])
+    if len(rows) > 1:
+        raise core.InputError(f"Inputs have different numbers of rows: {sorted(rows)}.")
+    n = rows.pop() if rows else 1
+
+    if out is None:
+        out = np.empty(n)
+    elif len(out) != n:
+        raise core.InputError(f"Expected an output array of {n} rows, got {len(out)}.")
+
+    def run_chunk(start):
+        stop = min(start + chunk_size, n)
+        out[start:stop] = kernel(*[_slice_arg(a, start, stop) for a in args],
+                                 **{k: _slice_arg(v, start, stop) for k, v in kwargs.items()})
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        for future in [pool.submit(run_chunk, start) for start in range(0, n, chunk_size)]:
+            future.result()
+
+    return out
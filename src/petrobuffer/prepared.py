@@ -0,0 +1,298 @@
+import numpy as np
+from petrobuffer import core
+from petrobuffer import buffers
+from petrobuffer import conversions
+from petrobuffer import ferric
+from petrobuffer.composition import MeltComposition
+
+# {model: function of (mole fractions, total FeO mole fraction)}
+_composition_terms = {'kc1991': ferric.kc91_composition_term,
+                      'r2013': ferric.r13_composition_term}
+
+# {model: function of (T in K, P in bar)}
+_conditions_terms = {'kc1991': lambda T, P: ferric.kc91_conditions_term(T, core.bar_to_pa(P)),
+                     'r2013': lambda T, P: ferric.r13_conditions_term(T, core.bar_to_gpa(P))}
+
+class PreparedMelt:
+    """
+    One or more melt compositions prepared once for repeated ferric/ferrous
+    and fO2 calculations at changing fO2, T and P.
+
+    Building a `PreparedMelt` checks the composition, picks the model of
+    each melt, converts it to mole fractions and evaluates the composition
+    terms, sum(d_i*X_i), of the Kress & Carmichael (1991) and Righter et
+    al. (2013) models. `ironOxide` and `meltfO2` then only add the
+    temperature and pressure terms, so they are cheap enough to call in the
+    inner loop of a crystallisation or degassing model.
+
+    The terms for `ironOxide` are prepared from the total iron, with any
+    Fe2O3 recast as FeO, as in `conversions.get_ironOxide`. Those for
+    `meltfO2`, which needs both FeO and Fe2O3, are prepared on its first
+    call. Results match `conversions.get_ironOxide_batch` and
+    `conversions.get_meltfO2_batch`.
+
+    Parameters
+    ----------
+    C : dict, numpy.ndarray or MeltComposition
+        Major element composition(s) of the silicate melt as weight
+        percents, in any of the forms taken by `get_ironOxide_batch`.
+    force_model : str, optional
+        Forces the model used, rather than allowing selection based on
+        total FeO content. One from `kc1991` (Kress & Carmichael 1991)
+        or `r2013` (Righter et.al., 2013).
+    columns : list of str or CompositionSchema, optional
+        Names of the oxides in each column of `C`, if it is an array, or a
+        `CompositionSchema` compiled from them.
+
+    Notes
+    -----
+    A single melt is evaluated at every value of the fO2, T and P arrays
+    given. For N melts, those arrays are broadcast against the N rows.
+    """
+
+    def __init__(self, C, force_model:str = None, columns=None):
+        force_options = ['kc1991', 'r2013']
+        if force_model is not None and force_model not in force_options:
+            raise core.InputError(f"Invalid model option. Expected either {None} or one of:\
+                 {force_options}")
+
+        self.force_model = force_model
+        self.melt, _ = conversions._batch_composition(C, columns)
+        self._single = len(self.melt) == 1
+
+        self._total, use_kc91 = conversions._total_iron_composition(self.melt, force_model)
+        self._iron_terms = self._prepare(self._total, use_kc91, self._total['feo'])
+        self._fo2_terms = None
+
+    def __len__(self):
+        return len(self.melt)
+
+    def _take(self, rows):
+        """
+        Returns the prepared melts at the given row indices, which may
+        repeat, without preparing them again.
+        """
+        new = object.__new__(PreparedMelt)
+        new.force_model = self.force_model
+        new.melt = MeltComposition(self.melt.wt[rows], self.melt.present)
+        new._total = MeltComposition(self._total.wt[rows], self._total.present)
+        new._total._mol = self._total.mol[rows]
+        new._single = False
+        new._iron_terms = tuple(np.broadcast_to(x, len(self))[rows] for x in self._iron_terms)
+        new._fo2_terms = None
+        return new
+
+    def _prepare(self, melt, use_kc91, FeOt):
+        """
+        Returns the composition terms of each melt under its model, the
+        model's fO2 coefficient, and the mask of melts using KC91.
+        """
+        terms = conversions._dispatch(use_kc91, _composition_terms, melt, FeOt)
+        if use_kc91.all():
+            a = 0.196
+        elif not use_kc91.any():
+            a = 0.22
+        else:
+            a = np.where(use_kc91, 0.196, 0.22)
+
+        if self._single:
+            use_kc91 = use_kc91[0]
+        return np.asarray(terms), a, use_kc91
+
+    def _conditions(self, use_kc91, T, P):
+        """Returns the temperature and pressure terms of each melt's model."""
+        if np.all(use_kc91):
+            return _conditions_terms['kc1991'](T, P)
+        if not np.any(use_kc91):
+            return _conditions_terms['r2013'](T, P)
+        T, P, use_kc91 = np.broadcast_arrays(T, P, use_kc91)
+        return conversions._dispatch(use_kc91, _conditions_terms, T, P)
+
+    def ironOxide(self, fO2, T, P, celsius=False, buffer:str = None):
+        """
+        Returns the ferric/ferrous (Fe2O3/FeO) mole ratio of the melt(s)
+        given fO2.
+
+        Parameters
+        ----------
+        fO2 : float or array-like
+            fO2 as either an absolute value given as log10(fO2), or relative
+            to a buffer if one is specified in the `buffer` argument.
+        T : float or array-like
+            Temperature in degrees K
+        P : float or array-like
+            Pressure in bar
+        celsius : bool, default=False
+            If true, `T` can be given in Celsius rather than degrees Kelvin.
+        buffer : str, optional
+            The buffer `fO2` is relative to if it is not an absolute value.
+
+        Returns
+        -------
+        numpy.ndarray
+            Fe2O3/FeO mole ratio
+        """
+        if celsius == True:
+            T = T + 273.15    # convert degrees C to K
+        T, P = np.asarray(T, dtype=float), np.asarray(P, dtype=float)
+
+        if buffer is not None:
+            fO2 = fO2 + buffers.calcBuffer_array(buffers.buffer_name(buffer), T, P)
+
+        terms, a, use_kc91 = self._iron_terms
+        return np.exp(a*(fO2*np.log(10)) + self._conditions(use_kc91, T, P) + terms)
+
+    def recalculate(self, F, normalised_comp=True):
+        """
+        Returns the composition(s) of the melt(s) with their iron split into
+        FeO and Fe2O3 by the Fe2O3/FeO mole ratio `F`.
+
+        The mole fraction of total Fe is held constant, so only the FeO and
+        Fe2O3 columns and the normalisation change with `F`.
+
+        Parameters
+        ----------
+        F : float or array-like
+            Fe2O3/FeO mole ratio, e.g. from `ironOxide`.
+        normalised_comp : bool, default=True
+            Selects whether the compositions being returned are normalised,
+            or if only the Fe2O3 and FeO is recalculated.
+
+        Returns
+        -------
+        MeltComposition
+            New melt major oxide compositions as wt%, one per value of `F`
+        """
+        i_feo, i_fe2o3 = core.oxideIndex['feo'], core.oxideIndex['fe2o3']
+        F = np.asarray(F, dtype=float)
+        mass = self._total.mol*core.oxideMass_array
+        if self._single:
+            mass = mass.reshape(-1)
+
+        # hold the mole fraction of total Fe constant and recalculate XFeO and XFe2O3.
+        X_feo = mass[..., i_feo]/core.oxideMass['feo']/(2*F + 1)
+        mass_feo = X_feo*core.oxideMass['feo']
+        mass_fe2o3 = X_feo*F*core.oxideMass['fe2o3']
+        scale = 100/(mass.sum(axis=-1) - mass[..., i_feo] + mass_feo + mass_fe2o3)
+
+        scale = np.asarray(scale)
+        if normalised_comp == False:
+            wt = self._total.wt.reshape(mass.shape) + np.zeros_like(scale)[..., np.newaxis]
+        else:
+            wt = mass*scale[..., np.newaxis]
+        wt[..., i_feo] = mass_feo*scale
+        wt[..., i_fe2o3] = mass_fe2o3*scale
+
+        present = self._total.present.copy()
+        present[i_fe2o3] = True
+        return MeltComposition(wt, present)
+
+    def meltfO2(self, T, P, celsius=False, buffer:str = None):
+        """
+        Returns the fO2 of the melt(s), given their FeO and Fe2O3 contents.
+
+        Parameters
+        ----------
+        T : float or array-like
+            Temperature in degrees K
+        P : float or array-like
+            Pressure in bar
+        celsius : bool, default=False
+            If true, `T` can be given in Celsius rather than degrees Kelvin.
+        buffer : str, optional
+            The buffer the returned fO2 should be is relative to. If None,
+            fO2 is returned as an absolute value (log10(fO2)).
+
+        Returns
+        -------
+        numpy.ndarray
+            fO2 as log10(fO2)
+        """
+        if self._fo2_terms is None:
+            use_kc91 = conversions._ferric_models(self.melt, self.force_model)
+            FeOt = self.melt['feo'] + self.melt['fe2o3']*0.8998
+            terms, a, use_kc91 = self._prepare(self.melt, use_kc91, FeOt)
+            ratio = np.log(self.melt['fe2o3']/self.melt['feo'])
+            self._fo2_terms = ratio - terms, a, use_kc91
+
+        if celsius == True:
+            T = T + 273.15    # convert degrees C to K
+        T, P = np.asarray(T, dtype=float), np.asarray(P, dtype=float)
+
+        terms, a, use_kc91 = self._fo2_terms
+        absolute_fo2 = (terms - self._conditions(use_kc91, T, P))/(a*np.log(10))
+
+        if buffer is not None:
+            return absolute_fo2 - buffers.calcBuffer_array(buffers.buffer_name(buffer), T, P)
+
+        return absolute_fo2
+
+    def __repr__(self):
+        return f"PreparedMelt(n={len(self)}, oxides={self.melt.oxides})"
+
+def trajectory(C, fO2, T, P, celsius=False, normalised_comp=True, buffer:str = None,
+               force_model:str = None, columns=None):
+    """
+    Returns the evolution of the Fe2O3/FeO ratio and composition of a melt
+    along a path of T and P, such as an ascent or cooling path.
+
+    The composition is either fixed along the path, or given at every step
+    (e.g. from a crystallisation model). Each run of consecutive steps with
+    an unchanged composition is prepared as a `PreparedMelt` only once, and
+    every step is then evaluated in one vectorised call.
+
+    Parameters
+    ----------
+    C : dict, numpy.ndarray or MeltComposition
+        Major element composition of the silicate melt as weight percents,
+        either a single composition or one per step of the path, in any of
+        the forms taken by `conversions.get_ironOxide_batch`.
+    fO2 : float or array-like
+        fO2 along the path as either an absolute value given as log10(fO2),
+        or an offset from a buffer if one is specified in `buffer`.
+    T : array-like
+        Temperature at each step in degrees K
+    P : array-like
+        Pressure at each step in bar
+    celsius : bool, default=False
+        If true, `T` can be given in Celsius rather than degrees Kelvin.
+    normalised_comp : bool, default=True
+        Selects whether the compositions being returned are normalised, or
+        if only the Fe2O3 and FeO is recalculated.
+    buffer : str, optional
+        The buffer `fO2` is relative to if it is not an absolute value.
+    force_model : str, optional
+        Forces the model used, rather than allowing selection based on
+        total FeO content. One from `kc1991` (Kress & Carmichael 1991)
+        or `r2013` (Righter et.al., 2013).
+    columns : list of str or CompositionSchema, optional
+        Names of the oxides in each column of `C`, if it is an array, or a
+        `CompositionSchema` compiled from them.
+
+    Returns
+    -------
+    numpy.ndarray
+        Fe2O3/FeO mole ratio at each step
+    MeltComposition
+        Melt major oxide composition as wt% at each step
+    """
+    fO2, T, P = np.broadcast_arrays(np.asarray(fO2, dtype=float),
+                                    np.asarray(T, dtype=float), np.asarray(P, dtype=float))
+    fO2, T, P = fO2.ravel(), T.ravel(), P.ravel()
+
+    melt, _ = conversions._batch_composition(C, columns)
+    if len(melt) == 1:
+        prepared = PreparedMelt(melt, force_model)
+    elif len(melt) == len(T) or len(T) == 1:
+        # prepare only the steps where the composition changes
+        changed = np.empty(len(melt), dtype=bool)
+        changed[0] = True
+        np.any(melt.wt[1:] != melt.wt[:-1], axis=1, out=changed[1:])
+        unique = MeltComposition(melt.wt[changed], melt.present)
+        prepared = PreparedMelt(unique, force_model)._take(np.cumsum(changed) - 1)
+    else:
+        raise core.InputError(f"Expected one composition or one per step of the path\
+             ({len(T)}), got {len(melt)}.")
+
+    F = prepared.ironOxide(fO2, T, P, celsius=celsius, buffer=buffer)
+    return F, prepared.recalculate(F, normalised_comp)
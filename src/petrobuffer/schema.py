@@ -0,0 +1,141 @@
+import numpy as np
+from petrobuffer import core
+from petrobuffer.composition import MeltComposition, feot_names
+
+# species required by each ferric model, besides iron
+model_species = {'kc1991': ('al2o3', 'cao', 'na2o', 'k2o'),
+                 'r2013': ('al2o3', 'cao', 'na2o', 'k2o', 'p2o5')}
+
+class CompositionSchema:
+    """
+    The column names of a dataset's compositions, resolved once against
+    `core.oxides`.
+
+    Compiling a schema matches each column name, in any case and with total
+    iron given as FeOt, FeO_t or FeO(t), to its position in `core.oxides`,
+    and works out which iron species are given and which ferric models the
+    columns allow. Batch conversions given a schema as their `columns`
+    argument reuse all of this, so each call only places the values into a
+    `MeltComposition`.
+
+    Columns naming oxides without a known mass are recorded rather than
+    rejected. The batch conversions raise a KeyError for them, unless run
+    with `return_status=True`.
+
+    Parameters
+    ----------
+    columns : list of str
+        Names of the columns of the dataset, in order.
+
+    Attributes
+    ----------
+    columns : tuple of str
+        The column names.
+    oxide_columns : tuple of str
+        Names of the columns with a known oxide, in order.
+    unknown_columns : tuple of str
+        Names of the columns without a known oxide.
+    index : numpy.ndarray
+        Position in `core.oxides` of each of `oxide_columns`.
+    present : numpy.ndarray
+        Which of `core.oxides` the columns give.
+    iron : str or None
+        The iron species given: 'FeO' (total iron, as FeO or FeOt),
+        'Fe2O3', 'FeO+Fe2O3', or None if neither is.
+    ironOxide_models : tuple of str
+        Ferric models whose species are all given, for `get_ironOxide`.
+    meltfO2_models : tuple of str
+        Ferric models whose species are all given, for `get_meltfO2`,
+        which also needs both FeO and Fe2O3.
+    """
+
+    def __init__(self, columns):
+        self.columns = tuple(columns)
+        known, index = [], []
+        for i, ele in enumerate(self.columns):
+            key = 'feo' if ele.lower() in feot_names else ele.lower()
+            if key in core.oxideIndex:
+                known.append(i)
+                index.append(core.oxideIndex[key])
+
+        if len(set(index)) != len(index):
+            raise core.InputError(f"The same oxide is given more than once in\
+                 {list(self.columns)}.")
+
+        self._known = np.array(known, dtype=int)
+        self._all_known = len(known) == len(self.columns)
+        self.oxide_columns = tuple(self.columns[i] for i in known)
+        self.unknown_columns = tuple(ele for i, ele in enumerate(self.columns)
+                                     if i not in known)
+        self.index = np.array(index, dtype=int)
+        self.present = np.zeros(len(core.oxides), dtype=bool)
+        self.present[self.index] = True
+
+        has_feo = self.present[core.oxideIndex['feo']]
+        has_fe2o3 = self.present[core.oxideIndex['fe2o3']]
+        self.iron = {(True, False): 'FeO', (False, True): 'Fe2O3',
+                     (True, True): 'FeO+Fe2O3'}.get((bool(has_feo), bool(has_fe2o3)))
+
+        possible = tuple(model for model, species in model_species.items()
+                         if all(self.present[core.oxideIndex[sp]] for sp in species))
+        self.ironOxide_models = possible if self.iron is not None else ()
+        self.meltfO2_models = possible if self.iron == 'FeO+Fe2O3' else ()
+
+    def __len__(self):
+        return len(self.columns)
+
+    def _values(self, wt):
+        """Checks the shape of an array of values for the columns."""
+        wt = np.asarray(wt, dtype=float)
+        if wt.ndim == 1:
+            wt = wt[np.newaxis, :]
+        if wt.ndim != 2 or wt.shape[1] != len(self.columns):
+            raise core.InputError(f"Expected an (N, {len(self.columns)}) array of oxides to\
+                 match `columns`, got shape {wt.shape}.")
+        return wt
+
+    def require_known(self):
+        """Raises a KeyError if any column names an oxide without a known mass."""
+        if self.unknown_columns:
+            raise KeyError(f"Sorry, I don't know the mass of '{self.unknown_columns[0]}'.")
+
+    def composition(self, wt):
+        """
+        Places an array of values for the columns into a composition,
+        leaving out any columns without a known oxide.
+
+        Parameters
+        ----------
+        wt : array-like
+            (N, K) array of oxide wt%, with the K columns of the schema. A
+            1-D array is treated as a single sample.
+
+        Returns
+        -------
+        MeltComposition
+            (N, len(core.oxides)) composition
+        """
+        wt = self._values(wt)
+        full = np.zeros((len(wt), len(core.oxides)))
+        full[:, self.index] = wt if self._all_known else wt[:, self._known]
+        return MeltComposition(full, self.present)
+
+    def unknown_rows(self, wt):
+        """Returns a mask of the rows of an (N, K) array holding a non-zero
+        amount of any oxide without a known mass."""
+        wt = self._values(wt)
+        if self._all_known:
+            return np.zeros(len(wt), dtype=bool)
+        unknown = np.delete(wt, self._known, axis=1)
+        return (np.nan_to_num(unknown) != 0).any(axis=1)
+
+    def __eq__(self, other):
+        return isinstance(other, CompositionSchema) and self.columns == other.columns
+
+    def __hash__(self):
+        return hash(self.columns)
+
+    def __repr__(self):
+        return (f"CompositionSchema(columns={list(self.columns)}, iron={self.iron!r},"
+                f" ironOxide_models={self.ironOxide_models},"
+                f" meltfO2_models={self.meltfO2_models})")
@@ -0,0 +1,396 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+from petrobuffer import buffers
+from petrobuffer import calibration
+from petrobuffer import core
+from petrobuffer import conversions
+from petrobuffer.composition import MeltComposition
+
+# coefficient of ln(fO2) in ln(Fe2O3/FeO) for each ferric model, which scales
+# a model error on ln(Fe2O3/FeO) into an error on ln(fO2)
+_lnfO2_coefficients = {'kc1991': 0.196, 'r2013': 0.22}
+
+# columns of the standard normal draws of each sample: one per oxide in
+# `core.oxides`, then T, P, fO2 and the model error
+_T, _P, _FO2, _MODEL = range(len(core.oxides), len(core.oxides) + 4)
+
+# samples are drawn in blocks of about this many perturbed rows, each block
+# from its own random stream. Chunks and worker shards are whole blocks, so
+# the draws don't depend on how the samples are split up.
+_block_draws = 2**14
+
+class Uncertainty(NamedTuple):
+    """
+    Monte Carlo estimate of the uncertainty of one result per sample.
+
+    Perturbed oxides and pressures are clipped at zero, and draws with a
+    non-finite result (e.g. where an oxide was clipped to zero) are left
+    out of the statistics. Both bias `mean` and `std` where the errors are
+    large relative to the values, so `clipped` and `valid` count how many
+    draws of each sample were affected.
+
+    Attributes
+    ----------
+    mean : numpy.ndarray
+        Mean of the draws of each sample.
+    std : numpy.ndarray
+        Standard deviation of the draws of each sample (with N-1 degrees of
+        freedom).
+    percentiles : numpy.ndarray
+        (N, len(q)) array of the percentiles of the draws of each sample,
+        interpolated linearly as by `numpy.percentile`.
+    q : tuple of float
+        The percentiles given in `percentiles`.
+    valid : numpy.ndarray
+        Number of draws of each sample with a finite result, which the
+        statistics are taken over.
+    clipped : numpy.ndarray
+        Number of draws of each sample with an oxide or the pressure
+        clipped at zero.
+    seed : int
+        Entropy of the `numpy.random.SeedSequence` the draws came from.
+        Passing it back as `seed` repeats the run exactly.
+    """
+    mean: np.ndarray
+    std: np.ndarray
+    percentiles: np.ndarray
+    q: tuple
+    valid: np.ndarray
+    clipped: np.ndarray
+    seed: int
+
+def _block_rows(draws):
+    """Number of samples in each block of draws."""
+    return max(1, _block_draws // draws)
+
+def _normals(entropy, start, stop, draws):
+    """
+    Returns the standard normal draws of samples start:stop, of shape
+    (stop - start, draws, len(core.oxides) + 4). `start` must be the first
+    sample of a block, and `stop` the end of a block or of all the samples.
+
+    Each block draws all of its samples in one call, from a stream keyed by
+    the block's position.
+    """
+    width, block = _MODEL + 1, _block_rows(draws)
+    return np.concatenate([
+        np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(first//block,)))
+        .standard_normal((min(first + block, stop) - first, draws, width))
+        for first in range(start, stop, block)])
+
+def _perturb(inputs, z):
+    """
+    Returns the perturbed compositions, T and P of a chunk of samples, with
+    one row per draw, from the standard normal draws `z`. Also returns the
+    number of draws of each sample with an oxide or P clipped at zero.
+    """
+    n_oxides = len(core.oxides)
+    wt = inputs['wt'][:, np.newaxis, :] + inputs['sigma_wt'][:, np.newaxis, :]*z[..., :n_oxides]
+    T = inputs['T'][:, np.newaxis] + inputs['sigma_T'][:, np.newaxis]*z[..., _T]
+    P = inputs['P'][:, np.newaxis] + inputs['sigma_P'][:, np.newaxis]*z[..., _P]
+    clipped = ((wt < 0).any(axis=-1) | (P < 0)).sum(axis=1)
+    return (np.maximum(wt, 0.0).reshape(-1, n_oxides), T.ravel(),
+            np.maximum(P, 0.0).ravel(), clipped)
+
+def _model_errors(use_kc91, z, model_sigma):
+    """
+    Returns the model error of each draw, from the sigma of the model it
+    uses, given a mask of the draws using the Kress & Carmichael (1991) model.
+    """
+    sigma = np.where(use_kc91, model_sigma.get('kc1991', 0.0), model_sigma.get('r2013', 0.0))
+    return sigma*z[..., _MODEL].ravel()
+
+def _meltfO2_draws(inputs, z, options):
+    """Evaluates the fO2 of every draw of a chunk of samples, as
+    `conversions._meltfO2_rows` does."""
+    wt, T, P, clipped = _perturb(inputs, z)
+    melt = MeltComposition(wt, options['present'])
+    use_kc91 = conversions._ferric_models(melt, options['force_model'])
+    lnfO2 = conversions._dispatch(use_kc91, conversions._fo2_kernels, melt, T, P)
+    if options['model_sigma']:
+        # an error eps on ln(Fe2O3/FeO) moves ln(fO2) by eps/a
+        lnfO2_sigma = {model: sigma/_lnfO2_coefficients[model]
+                       for model, sigma in options['model_sigma'].items()}
+        lnfO2 += _model_errors(use_kc91, z, lnfO2_sigma)
+
+    fO2 = lnfO2/np.log(10)
+    if isinstance(options['buffer'], str):
+        fO2 -= buffers.calcBuffer_array(options['buffer'], T, P)
+    return fO2, clipped
+
+def _ironOxide_draws(inputs, z, options):
+    """Evaluates the Fe3+/total Fe of every draw of a chunk of samples, as
+    `conversions._ironOxide_rows` does."""
+    wt, T, P, clipped = _perturb(inputs, z)
+    fO2 = (inputs['fO2'][:, np.newaxis] + inputs['sigma_fO2'][:, np.newaxis]*z[..., _FO2]).ravel()
+    melt, use_kc91 = conversions._total_iron_composition(MeltComposition(wt, options['present']),
+                                                         options['force_model'])
+    if isinstance(options['buffer'], str):
+        fO2 = fO2 + buffers.calcBuffer_array(options['buffer'], T, P)
+
+    F = conversions._dispatch(use_kc91, conversions._iron_kernels, melt, T, P, fO2*np.log(10))
+    if options['model_sigma']:
+        F = F*np.exp(_model_errors(use_kc91, z, options['model_sigma']))
+    return 2*F/(2*F + 1), clipped    # Fe2O3/FeO mole ratio to Fe3+/total Fe
+
+_draw_functions = {'meltfO2': _meltfO2_draws, 'ironOxide': _ironOxide_draws}
+
+def _reduce(values, q):
+    """
+    Returns the mean, standard deviation, percentiles `q` and number of
+    finite values of each row of a (N, draws) array, ignoring any values
+    which are not finite.
+    """
+    valid = np.isfinite(values)
+    n = valid.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(valid, values, 0.0).sum(axis=1)/n
+        deviation = np.where(valid, values - mean[:, np.newaxis], 0.0)
+        std = np.sqrt((deviation**2).sum(axis=1)/(n - 1))
+
+    # sorting puts NaN last, so the finite values of each row come first
+    ordered = np.sort(np.where(valid, values, np.nan), axis=1)
+    position = (n[:, np.newaxis] - 1)*np.asarray(q, dtype=float)/100
+    lower = np.clip(np.floor(position).astype(int), 0, None)
+    upper = np.clip(lower + 1, None, np.maximum(n - 1, 0)[:, np.newaxis])
+    below = np.take_along_axis(ordered, lower, axis=1)
+    above = np.take_along_axis(ordered, upper, axis=1)
+    percentiles = below + (above - below)*(position - lower)
+    percentiles[n == 0] = np.nan
+
+    return mean, std, percentiles, n
+
+def _run_rows(function, inputs, options, draws, q, chunk_size, entropy, first_row=0):
+    """
+    Draws and evaluates the perturbations of a block of samples, a chunk of
+    samples at a time, and reduces each chunk to its statistics before the
+    next is drawn. `first_row` must be the first sample of a block.
+    """
+    n = len(inputs['wt'])
+    block = _block_rows(draws)
+    rows = max(block, (chunk_size // draws) // block * block)
+    mean, std = np.empty(n), np.empty(n)
+    valid, clipped = np.empty(n, dtype=int), np.empty(n, dtype=int)
+    percentiles = np.empty((n, len(q)))
+
+    with np.errstate(all='ignore'):
+        for start in range(0, n, rows):
+            stop = min(start + rows, n)
+            z = _normals(entropy, first_row + start, first_row + stop, draws)
+            chunk = {key: value[start:stop] for key, value in inputs.items()}
+            values, clipped[start:stop] = _draw_functions[function](chunk, z, options)
+            (mean[start:stop], std[start:stop], percentiles[start:stop],
+             valid[start:stop]) = _reduce(values.reshape(stop - start, draws), q)
+
+    return mean, std, percentiles, valid, clipped
+
+def _run(function, inputs, options, use_kc91, draws, q, seed, chunk_size, workers):
+    """
+    Checks the unperturbed T and P of the samples against the calibrated
+    ranges of their ferric model and buffer, then runs `_run_rows` over all
+    the samples, split into shards of whole blocks across a pool of
+    processes if `workers` is more than 1.
+    """
+    if draws < 1:
+        raise core.InputError(f"Expected at least one draw per sample, got {draws}.")
+    q = tuple(float(p) for p in np.atleast_1d(q))
+    entropy = np.random.SeedSequence(seed).entropy
+    n = len(inputs['wt'])
+
+    summary = calibration.CalibrationSummary()
+    conversions._check_calibration(summary, use_kc91, options['buffer'], inputs['T'],
+                                   inputs['P'])
+    calibration.report(summary, stacklevel=3)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    block = _block_rows(draws)
+    if workers <= 1 or n <= block:
+        results = _run_rows(function, inputs, options, draws, q, chunk_size, entropy)
+    else:
+        shard = -(-n // (4*workers*block))*block
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_rows, function,
+                                   {key: value[start:start + shard] for key, value in inputs.items()},
+                                   options, draws, q, chunk_size, entropy, start)
+                       for start in range(0, n, shard)]
+            parts = [future.result() for future in futures]
+        results = tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+    mean, std, percentiles, valid, clipped = results
+    return Uncertainty(mean, std, percentiles, q, valid, clipped, entropy)
+
+def _sigma_wt(sigma_wt, melt, C, columns):
+    """
+    Returns the 1 sigma wt% uncertainty of every oxide of a batch
+    composition as an (N, len(core.oxides)) array, zero for the oxides it
+    doesn't hold.
+    """
+    n = len(melt)
+    if isinstance(sigma_wt, dict):
+        sigma = MeltComposition.from_dict(sigma_wt).wt
+    else:
+        sigma = np.asarray(sigma_wt, dtype=float)
+        if sigma.ndim == 0:
+            sigma = np.full(len(core.oxides), float(sigma))
+        elif isinstance(C, dict):
+            sigma = MeltComposition.from_array(sigma, list(C)).wt
+        elif columns is not None:
+            names = getattr(columns, 'columns', columns)
+            sigma = MeltComposition.from_array(sigma, list(names)).wt
+    try:
+        sigma = np.broadcast_to(sigma, melt.wt.shape)
+    except ValueError:
+        raise core.InputError(f"Expected `sigma_wt` to match the {n} rows and the columns of\
+             the composition, got shape {np.shape(sigma_wt)}.")
+    return sigma*melt.present
+
+def _inputs(C, T, P, celsius, sigma_wt, sigma_T, sigma_P, columns):
+    """Returns the per-sample arrays shared by both uncertainty functions."""
+    melt, _ = conversions._batch_composition(C, columns)
+    n = len(melt)
+    if celsius == True:
+        T = core.C2K(T)    # convert degrees C to K
+
+    inputs = {'wt': melt.wt, 'sigma_wt': _sigma_wt(sigma_wt, melt, C, columns)}
+    for key, value in (('T', T), ('sigma_T', sigma_T), ('P', P), ('sigma_P', sigma_P)):
+        inputs[key] = np.broadcast_to(np.asarray(value, dtype=float), n)
+    return melt, inputs
+
+def _options(melt, buffer, force_model, model_sigma):
+    """Checks the options shared by both uncertainty functions, as the batch
+    conversions do, and returns them as a dict."""
+    force_options = ['kc1991', 'r2013']
+    if force_model is not None and force_model not in force_options:
+        raise core.InputError(f"Invalid model option. Expected either {None} or one of:\
+             {force_options}")
+
+    buffer_options = list(buffers.buffer_registry)
+    if buffer is not None and buffer not in buffer_options:
+        raise core.InputError(f"Invalid buffer. Expected either {None} or one of:\
+             {buffer_options}")
+
+    return {'present': melt.present, 'buffer': buffer, 'force_model': force_model,
+            'model_sigma': _model_sigma(model_sigma)}
+
+def _model_sigma(model_sigma):
+    """Returns the model errors as {model: sigma}."""
+    if model_sigma is None:
+        return {}
+    if not isinstance(model_sigma, dict):
+        return {model: float(model_sigma) for model in _lnfO2_coefficients}
+    unknown = set(model_sigma) - set(_lnfO2_coefficients)
+    if unknown:
+        raise core.InputError(f"Invalid model in `model_sigma`: {sorted(unknown)}. Expected\
+             any of {list(_lnfO2_coefficients)}.")
+    return {model: float(sigma) for model, sigma in model_sigma.items()}
+
+def get_meltfO2_uncertainty(C, T, P, sigma_wt=0.0, sigma_T=0.0, sigma_P=0.0,
+                            model_sigma=None, draws:int=1000, celsius=False,
+                            buffer:str = None, force_model:str = None, columns=None,
+                            q=(2.5, 50, 97.5), seed:int=None, chunk_size:int=2**16,
+                            workers:int=1):
+    """
+    Propagates the uncertainties of the compositions, T and P of many melts,
+    and of the ferric models, into their fO2 by Monte Carlo.
+
+    Each sample is perturbed `draws` times with independent normal errors.
+    The perturbed rows of a chunk of samples are evaluated together with
+    the model kernels of `get_meltfO2_batch`, and reduced to their
+    statistics before the next chunk is drawn, so memory is bounded by
+    `chunk_size` whatever the number of samples. See `Uncertainty` for
+    how draws clipped at zero, or without a finite result, are counted.
+
+    Draws are reproducible: samples are drawn in blocks, each from its own
+    random stream spawned from `seed`, and chunks and worker shards are
+    whole blocks, so results are the same for any `chunk_size` or number
+    of `workers`.
+
+    Parameters
+    ----------
+    C, T, P, celsius, buffer, force_model, columns
+        As for `conversions.get_meltfO2_batch`.
+    sigma_wt : float, dict or array-like, default=0.0
+        1 sigma uncertainty of the oxides, in wt%. Either one value for
+        every oxide, a dict {oxide: float or array of N values}, or an
+        array matching the columns of `C` (or `core.oxides` if `C` is a
+        `MeltComposition`). Perturbed oxides are clipped at zero.
+    sigma_T : float or array-like, default=0.0
+        1 sigma uncertainty of T, in degrees.
+    sigma_P : float or array-like, default=0.0
+        1 sigma uncertainty of P, in bar. Perturbed pressures are clipped
+        at zero.
+    model_sigma : float or dict, optional
+        1 sigma error of ln(Fe2O3/FeO) predicted by the ferric models,
+        either one value for both or {model: float}. Not included if None.
+    draws : int, default=1000
+        Number of perturbations of each sample.
+    q : float or sequence of float, default=(2.5, 50, 97.5)
+        Percentiles of the draws to return, between 0 and 100.
+    seed : int, optional
+        Seed of the random draws. If None, fresh entropy is used, which is
+        returned as `seed` of the result.
+    chunk_size : int, default=65536
+        Number of perturbed rows (samples x draws) evaluated at once,
+        rounded down to whole blocks of up to 16384 rows, and at least one
+        block.
+    workers : int, default=1
+        Number of processes to split the samples across. Uses the number
+        of CPUs if None.
+
+    Returns
+    -------
+    Uncertainty
+        Statistics of the draws of log10(fO2), relative to `buffer` if one
+        is given, for each sample.
+
+    Notes
+    -----
+    Needs NumPy 1.17 or later, for `numpy.random.SeedSequence`.
+    """
+    melt, inputs = _inputs(C, T, P, celsius, sigma_wt, sigma_T, sigma_P, columns)
+    options = _options(melt, buffer, force_model, model_sigma)
+    use_kc91 = conversions._ferric_models(melt, force_model)
+    return _run('meltfO2', inputs, options, use_kc91, draws, q, seed, chunk_size, workers)
+
+def get_ironOxide_uncertainty(C, fO2, T, P, sigma_wt=0.0, sigma_fO2=0.0, sigma_T=0.0,
+                              sigma_P=0.0, model_sigma=None, draws:int=1000, celsius=False,
+                              buffer:str = None, force_model:str = None, columns=None,
+                              q=(2.5, 50, 97.5), seed:int=None, chunk_size:int=2**16,
+                              workers:int=1):
+    """
+    Propagates the uncertainties of the compositions, fO2, T and P of many
+    melts, and of the ferric models, into their Fe3+/total Fe by Monte Carlo.
+
+    As `get_meltfO2_uncertainty`, with the perturbed rows evaluated with
+    the model kernels of `get_ironOxide_batch`. The same `seed` gives the same oxide, T and P
+    perturbations in both functions.
+
+    Parameters
+    ----------
+    C, fO2, T, P, celsius, buffer, force_model, columns
+        As for `conversions.get_ironOxide_batch`.
+    sigma_fO2 : float or array-like, default=0.0
+        1 sigma uncertainty of fO2, in log10 units.
+    sigma_wt, sigma_T, sigma_P, model_sigma, draws, q, seed, chunk_size, workers
+        As for `get_meltfO2_uncertainty`.
+
+    Returns
+    -------
+    Uncertainty
+        Statistics of the draws of Fe3+/total Fe for each sample.
+
+    Notes
+    -----
+    Needs NumPy 1.17 or later, for `numpy.random.SeedSequence`.
+    """
+    melt, inputs = _inputs(C, T, P, celsius, sigma_wt, sigma_T, sigma_P, columns)
+    n = len(melt)
+    inputs['fO2'] = np.broadcast_to(np.asarray(fO2, dtype=float), n)
+    inputs['sigma_fO2'] = np.broadcast_to(np.asarray(sigma_fO2, dtype=float), n)
+    options = _options(melt, buffer, force_model, model_sigma)
+    _, use_kc91 = conversions._total_iron_composition(melt, force_model)
+    return _run('ironOxide', inputs, options, use_kc91, draws, q, seed, chunk_size, workers)
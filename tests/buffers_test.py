@@ -1,5 +1,6 @@
 # test_with_pytest.py
 
+import numpy as np
 import petrobuffer as pb
 import pytest
 
@@ -40,4 +41,112 @@ def test_calcBuffer_with_highT_returns_correctValue(test_buffer, expected_value)
 def test_calcBuffer_with_lowT_returns_correctValue(lowT_test_buffer, expected_value):
     assert pb.buffers.calcBuffer(lowT_test_buffer, 823.15, 1) == pytest.approx(expected_value)
 
+@pytest.mark.parametrize("test_buffer", ['QIF', 'IW', 'WM', 'IM', 'CoCoO', 'FMQ', 'NNO', 'MH'])
+def test_calcBufferArray_matches_scalarResult(test_buffer):
+    T = np.array([700, 823.15, 846.15, 900, 955.15, 1200, 1473.15])
+    P = np.array([[1], [1e4], [110000]])
+    expected = [[pb.buffers.calcBuffer(test_buffer, t, p[0]) for t in T] for p in P]
+    assert pb.buffers.calcBuffer_array(test_buffer, T, P) == pytest.approx(np.array(expected))
 
+def test_calcBuffer_with_arrayInput_returns_ndarray():
+    result = pb.buffers.calcBuffer('FMQ', np.array([800, 1200]), 1)
+    assert isinstance(result, np.ndarray)
+    assert result == pytest.approx([-22.725125, -12.178583])
+
+def test_calcBufferArray_when_bufferUnrecognised_throwException():
+    with pytest.raises(InputError) as exc:
+        pb.buffers.calcBuffer_array('BIF', np.array([1473.15]), 1)
+    assert "not recognized as a buffer" in str(exc.value)
+
+@pytest.fixture
+def registered_buffer():
+    pb.buffers.register_buffer('TestBuffer', [
+        (pb.buffers.frost1991_equation, (-20000.0, 8.0, 0.05), 1000.0),
+        (pb.buffers.frost1991_equation, (-21000.0, 9.0, 0.05))])
+    yield 'TestBuffer'
+    pb.buffers.unregister_buffer('TestBuffer')
+
+def test_registerBuffer_with_newBuffer_isUsedByCalcBuffer(registered_buffer):
+    assert pb.buffers.calcBuffer(registered_buffer, 900, 1) == pytest.approx(-20000/900 + 8)
+    assert pb.buffers.calcBuffer_array(registered_buffer, np.array([900, 1200]), 1) == pytest.approx(
+        [-20000/900 + 8, -21000/1200 + 9])
+
+def test_registerBuffer_with_newBuffer_isUsedByConversions(registered_buffer):
+    assert pb.get_relative_fo2(-10, 'testbuffer', 1200, 1) == pytest.approx(-10 + 21000/1200 - 9)
+
+def test_registerBuffer_when_nameAlreadyRegistered_throwException():
+    with pytest.raises(InputError) as exc:
+        pb.buffers.register_buffer('FMQ', [(pb.buffers.frost1991_equation, (-1.0, 1.0, 1.0))])
+    assert "already registered" in str(exc.value)
+
+def test_registerBuffer_where_overwriteInOtherCase_replacesEntry(registered_buffer):
+    pb.buffers.register_buffer('testbuffer', [(pb.buffers.frost1991_equation, (-22000.0, 7.0, 0.0))],
+                               overwrite=True)
+    assert 'testbuffer' not in pb.buffers.buffer_registry
+    assert pb.buffers.calcBuffer('TestBuffer', 1000, 1) == pytest.approx(-15)
+
+def test_unregisterBuffer_removes_everyEntry(registered_buffer):
+    branches = pb.buffers.buffer_registry[registered_buffer]
+    pb.buffers.register_buffer('OtherTestBuffer', [branches[1]], calibration=(900, 1300, 0, 1e4))
+    pb.buffers.unregister_buffer('othertestbuffer')
+    assert 'OtherTestBuffer' not in pb.buffers.buffer_registry
+    assert 'OtherTestBuffer' not in pb.buffers.buffer_calibration
+    assert (branches[0], branches[1]) in pb.buffers._difference_branches
+    pb.buffers.unregister_buffer(registered_buffer)
+    assert not any(branch in pair for pair in pb.buffers._difference_branches for branch in branches)
+    pb.buffers.register_buffer(registered_buffer, branches)
+
+def test_registerBuffer_when_lastBranchBounded_throwException():
+    with pytest.raises(InputError) as exc:
+        pb.buffers.register_buffer('BoundedBuffer', [
+            (pb.buffers.frost1991_equation, (-20000.0, 8.0, 0.05), 1000.0)])
+    assert "last branch" in str(exc.value)
+    assert 'BoundedBuffer' not in pb.buffers.buffer_registry
+
+@pytest.mark.parametrize("T, P", [
+    (np.nan, 1.0), (1500.0, np.nan), (np.inf, 1.0), (1500.0, np.inf)])
+@pytest.mark.parametrize("buffer", ['QIF', 'IW', 'FMQ', 'NNO', 'MH'])
+def test_calcBuffer_where_nanOrInfiniteConditions_returnsFloat(buffer, T, P):
+    value = pb.buffers.calcBuffer(buffer, T, P)
+    assert isinstance(value, float)
+    array_value = pb.buffers.calcBuffer_array(buffer, np.array([T]), P)[0]
+    assert value == pytest.approx(array_value, nan_ok=True)
+    if np.isnan(T) or np.isnan(P):
+        assert np.isnan(value)
+
+def test_getRelativefO2_where_nanT_returnsNan():
+    assert np.isnan(pb.get_relative_fo2(0, 'FMQ', np.nan, 1))
+
+@pytest.mark.parametrize("old_buffer", ['QIF', 'IW', 'FMQ', 'NNO', 'MH'])
+@pytest.mark.parametrize("new_buffer", ['IW', 'CoCoO', 'FMQ', 'NNO', 'MH'])
+def test_bufferDifference_matches_separateBuffers(old_buffer, new_buffer):
+    T = np.array([700, 846.15, 900, 955.15, 1200, 1800])
+    P = np.array([[1], [5e4], [1e5], [2e5]])
+    expected = (pb.buffers.calcBuffer_array(old_buffer, T, P) -
+                pb.buffers.calcBuffer_array(new_buffer, T, P))
+    assert pb.buffers.buffer_difference(old_buffer, new_buffer, T, P) == pytest.approx(expected, abs=1e-9)
+
+def test_bufferDifference_of_frost1991Pair_is_singleFrostEquation():
+    fmq, iw = pb.buffers.buffer_registry['FMQ'][1], pb.buffers.buffer_registry['IW'][0]
+    combined = pb.buffers._difference_branches[(fmq, iw)]
+    assert combined.equation is pb.buffers.frost1991_equation
+    assert combined.coefficients == pytest.approx((-25096.3 + 27489.0, 8.735 - 6.702, 0.110 - 0.055))
+
+def test_calcBuffers_matches_separateBuffers():
+    T = np.array([700, 823.15, 846.15, 900, 955.15, 1200, 1473.15, 1800])
+    P = np.array([1, 1e4, 5e4, 1e5, 110000, 2e5, 1, 3e5])
+    result = pb.buffers.calcBuffers(T, P)
+    assert result.names == tuple(pb.buffers.buffer_registry)
+    assert result.values.shape == (len(T), len(result.names))
+    for name in result.names:
+        assert result.column(name) == pytest.approx(pb.buffers.calcBuffer_array(name, T, P))
+
+def test_calcBuffers_with_names_returns_onlyThoseBuffers():
+    result = pb.buffers.calcBuffers(1200, 1, names=['fmq', 'iw'])
+    assert result.names == ('FMQ', 'IW')
+    assert result.to_dict()['FMQ'] == pytest.approx([pb.buffers.calcBuffer('FMQ', 1200, 1)])
+
+def test_calcBuffers_when_bufferUnrecognised_throwException():
+    with pytest.raises(InputError) as exc:
+        pb.buffers.calcBuffers(1200, 1, names=['BIF'])
+    assert "not recognized as a buffer" in str(exc.value)
@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import petrobuffer as pb
+import pytest
+
+from petrobuffer.cache import BufferCache
+
+@pytest.fixture
+def buffer_cache():
+    cache = pb.buffers.enable_cache(maxsize=4)
+    yield cache
+    pb.buffers.disable_cache()
+
+def test_enableCache_where_repeatedCall_counts_hit(buffer_cache):
+    first = pb.buffers.calcBuffer('FMQ', 1200, 1)
+    assert pb.buffers.calcBuffer('FMQ', 1200, 1) == first
+    assert pb.buffers.cache_info()[:2] == (1, 1)
+
+def test_enableCache_is_usedBy_convertBuffer(buffer_cache):
+    pb.convert_buffer(-2, 'FMQ', 'IW', 1473.15, 10)
+    assert pb.convert_buffer(-2, 'fmq', 'iw', 1473.15, 10) == pytest.approx(1.6575, 0.001)
+    assert pb.buffers.cache_info().hits == 2
+
+def test_enableCache_where_full_evicts_leastRecentlyUsed(buffer_cache):
+    for T in [1000, 1100, 1200, 1300]:
+        pb.buffers.calcBuffer('NNO', T, 1)
+    pb.buffers.calcBuffer('NNO', 1000, 1)
+    pb.buffers.calcBuffer('NNO', 1400, 1)
+    assert pb.buffers.cache_info().currsize == 4
+    pb.buffers.calcBuffer('NNO', 1100, 1)
+    assert pb.buffers.cache_info()[:2] == (1, 6)
+
+def test_clearCache_resets_statistics(buffer_cache):
+    pb.buffers.calcBuffer('IW', 1200, 1)
+    pb.buffers.clear_cache()
+    assert pb.buffers.cache_info() == (0, 0, 4, 0)
+
+def test_bufferCache_with_tolerance_evaluates_roundedConditions():
+    cache = BufferCache(pb.buffers.calcBuffer_scalar, T_tolerance=1, P_tolerance=10)
+    assert cache.get('MH', 1200.3, 12) == pb.buffers.calcBuffer_scalar('MH', 1200, 10)
+    assert cache.get('MH', 1199.8, 8) == pb.buffers.calcBuffer_scalar('MH', 1200, 10)
+    assert cache.info().hits == 1
+
+def test_bufferCache_with_threadPool_counts_everyCall():
+    cache = BufferCache(pb.buffers.calcBuffer_scalar, maxsize=16)
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda i: cache.get('FMQ', 1000 + i % 32, 1), range(2000)))
+    assert results[:32] == [pb.buffers.calcBuffer_scalar('FMQ', 1000 + i, 1) for i in range(32)]
+    info = cache.info()
+    assert info.hits + info.misses == 2000
+    assert info.currsize == 16
+
+@pytest.mark.parametrize("T, P", [
+    (float('nan'), 1.0), (1200.0, float('nan')), (float('inf'), 1.0), (1200.0, float('inf'))])
+def test_enableCache_with_tolerance_where_nonFiniteConditions_matches_uncached(T, P):
+    expected = pb.buffers.calcBuffer_scalar('FMQ', T, P)
+    pb.buffers.enable_cache(maxsize=4, T_tolerance=1, P_tolerance=10)
+    try:
+        for _ in range(3):
+            assert pb.buffers.calcBuffer('FMQ', T, P) == pytest.approx(expected, nan_ok=True)
+        assert pb.buffers.cache_info().currsize == 0
+    finally:
+        pb.buffers.disable_cache()
+
+def test_registerBuffer_where_overwrite_clearsCache(buffer_cache):
+    pb.buffers.register_buffer('CachedBuffer', [(pb.buffers.frost1991_equation, (-25000, 8, 0))])
+    try:
+        assert pb.buffers.calcBuffer('CachedBuffer', 1000, 1) == pytest.approx(-17)
+        pb.buffers.register_buffer('CachedBuffer', [(pb.buffers.frost1991_equation, (-20000, 8, 0))],
+                                   overwrite=True)
+        assert pb.buffers.calcBuffer('CachedBuffer', 1000, 1) == pytest.approx(-12)
+    finally:
+        pb.buffers.unregister_buffer('CachedBuffer')
@@ -0,0 +1,59 @@
+import warnings
+
+import numpy as np
+import petrobuffer as pb
+import pytest
+
+from petrobuffer.calibration import (CalibrationRange, CalibrationSummary,
+                                     CalibrationWarning, collect)
+
+def test_calibrationRange_outside_includesBoundsAndFlagsNaN():
+    calibration = CalibrationRange(1000, 2000, 0, 100)
+    T = np.array([1000, 2000, 999, 1500, np.nan])
+    P = np.array([0, 100, 50, 101, 50])
+    assert list(calibration.outside(T, P)) == [False, False, True, True, True]
+
+def test_calibrationSummary_check_where_masked_countsMaskedRowsOnly():
+    summary = CalibrationSummary()
+    T = np.array([500, 1500, 2500])
+    summary.check('model', CalibrationRange(1000, 2000, 0, 100), T, np.zeros(3),
+                  np.array([True, True, False]))
+    assert summary.counts['model'] == (2, 1)
+    assert summary.counts['model'].fraction == pytest.approx(0.5)
+
+def test_every_buffer_and_model_has_calibration():
+    assert set(pb.buffers.buffer_calibration) == set(pb.buffers.buffer_registry)
+    assert set(pb.ferric.model_calibration) == {'kc1991', 'r2013'}
+
+def test_getIronOxideBatch_where_outOfRange_warnsOncePerBatch(batch_comp):
+    comp = {k: v[[0, 0, 0, 1]] for k, v in batch_comp.items()}
+    T = np.array([1473.15, 1273.15, 1173.15, 1573.15])
+    with pytest.warns(CalibrationWarning) as record:
+        pb.get_ironOxide_batch(comp, -1, T, 1e4, buffer='FMQ')
+    assert len(record) == 1
+    counts = record[0].message.summary.counts
+    assert counts['kc1991'] == (3, 2)
+    assert counts['r2013'] == (1, 0)
+    assert counts['FMQ'] == (4, 1)
+    assert 'kc1991 2 of 3 (66.7%)' in str(record[0].message)
+
+def test_getMeltfO2Batch_where_inRange_doesNotWarn(batch_comp):
+    _, comp = pb.get_ironOxide_batch(batch_comp, -1, 1473.15, 1e4, buffer='FMQ')
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        pb.get_meltfO2_batch(comp, 1473.15, 1e4, buffer='FMQ')
+
+def test_getMeltfO2Batch_where_checkCalibrationFalse_doesNotWarn(batch_comp):
+    _, comp = pb.get_ironOxide_batch(batch_comp, -1, 1473.15, 1e4, buffer='FMQ')
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        pb.get_meltfO2_batch(comp, 900, 1e4, buffer='FMQ', check_calibration=False)
+
+def test_collect_with_severalBatches_warnsOnceWithTotals(batch_comp):
+    with pytest.warns(CalibrationWarning) as record:
+        with collect() as summary:
+            for T in [1273.15, 1473.15, 1273.15]:
+                pb.get_ironOxide_batch(batch_comp, -1, T, 1e4)
+    assert len(record) == 1
+    assert summary.counts['kc1991'] == (3, 2)
+    assert summary.counts['r2013'] == (3, 2)
@@ -0,0 +1,61 @@
+import csv
+
+import numpy as np
+import petrobuffer as pb
+import pytest
+
+from petrobuffer.cli import main
+
+@pytest.fixture
+def analyses_csv(tmp_path):
+    rows = [
+        ['sample', 'SiO2', 'TiO2', 'Al2O3', 'Fe2O3', 'FeO', 'MnO', 'MgO', 'CaO', 'Na2O', 'K2O', 'P2O5', 'T', 'P', 'fO2'],
+        ['a', 44.71, 0.13, 1.33, 0.521, 7.887, 0.13, 38.73, 3.17, 0.13, 0.006, 0.019, 1473.15, 10, -2],
+        ['b', 46.711, 0.4699, 9.9882, 4.4724, 17.0621, 0.3199, 10.3581, 7.5086, 2.5295, 0.14, 0.4399, 1679.15, 12000, -1],
+        ['c', 44.71, 0.13, 1.33, 0.6, 7.8, 0.13, 38.73, 3.17, 0.13, 0.006, 0.019, 1373.15, 1, 0],
+    ]
+    path = tmp_path / 'analyses.csv'
+    with open(path, 'w', newline='') as f:
+        csv.writer(f).writerows(rows)
+    return path
+
+def read_csv(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+def test_cli_fo2_with_smallChunks_matches_batchResult(analyses_csv, tmp_path):
+    out = tmp_path / 'out.csv'
+    assert main(['fo2', str(analyses_csv), '-o', str(out), '--buffer', 'FMQ', '--chunk-size', '2']) == 0
+    rows = read_csv(out)
+    oxides = ['SiO2', 'TiO2', 'Al2O3', 'Fe2O3', 'FeO', 'MnO', 'MgO', 'CaO', 'Na2O', 'K2O', 'P2O5']
+    C = {ox: np.array([float(r[ox]) for r in rows]) for ox in oxides}
+    T, P = np.array([float(r['T']) for r in rows]), np.array([float(r['P']) for r in rows])
+    expected, _ = pb.get_meltfO2_batch(C, T, P, buffer='FMQ')
+    assert [r['sample'] for r in rows] == ['a', 'b', 'c']
+    assert [float(r['fO2_FMQ']) for r in rows] == pytest.approx(expected)
+
+def test_cli_ironoxide_writes_ratioAndComposition(analyses_csv, tmp_path):
+    out = tmp_path / 'out.csv'
+    assert main(['ironoxide', str(analyses_csv), '-o', str(out), '--buffer', 'FMQ', '--chunk-size', '1']) == 0
+    rows = read_csv(out)
+    first = {ox: float(rows[0][ox]) for ox in ['SiO2', 'TiO2', 'Al2O3', 'Fe2O3', 'FeO', 'MnO',
+                                                 'MgO', 'CaO', 'Na2O', 'K2O', 'P2O5']}
+    F, C_new = pb.get_ironOxide_batch(first, -2, 1473.15, 10, buffer='FMQ')
+    assert float(rows[0]['Fe2O3/FeO']) == pytest.approx(F[0])
+    assert float(rows[0]['Fe2O3_new']) == pytest.approx(C_new['Fe2O3'][0])
+
+def test_cli_where_columnMissing_returns_error(analyses_csv, tmp_path, capsys):
+    assert main(['fo2', str(analyses_csv), '-o', str(tmp_path / 'out.csv'), '--T-column', 'Temp']) == 1
+    assert "Column 'Temp' not found" in capsys.readouterr().err
+
+def test_cli_where_cellNotNumber_returns_errorWithLine(analyses_csv, tmp_path, capsys):
+    text = analyses_csv.read_text().replace('4.4724', 'n.d.')
+    analyses_csv.write_text(text)
+    assert main(['fo2', str(analyses_csv), '-o', str(tmp_path / 'out.csv'), '--chunk-size', '2']) == 1
+    assert "Line 3: 'n.d.' in column 'Fe2O3' is not a number" in capsys.readouterr().err
+
+def test_cli_where_rowShort_returns_errorWithLine(analyses_csv, tmp_path, capsys):
+    with open(analyses_csv, 'a', newline='') as f:
+        csv.writer(f).writerow(['d', 44.71, 0.13])
+    assert main(['ironoxide', str(analyses_csv), '-o', str(tmp_path / 'out.csv')]) == 1
+    assert "Line 5 has 3 columns" in capsys.readouterr().err
@@ -0,0 +1,53 @@
+import warnings
+
+import numpy as np
+import petrobuffer as pb
+import pytest
+
+from petrobuffer.composition import MeltComposition
+
+def test_meltComposition_mol_matches_wtOxtoMolOx(standard_comp_lowIron):
+    melt = MeltComposition.from_dict(standard_comp_lowIron)
+    expected = pb.core.wtOxides_to_molOxides(dict(standard_comp_lowIron))
+    assert {k: melt[k] for k in expected} == pytest.approx(expected)
+    assert melt.mol.sum() == pytest.approx(1)
+
+def test_meltComposition_with_stackedInput_has_oneRowPerSample(standard_comp_lowIron):
+    stacked = {k: np.full(4, v) for k, v in standard_comp_lowIron.items()}
+    melt = MeltComposition.from_dict(stacked)
+    assert len(melt) == 4
+    assert melt.wt.shape == (4, len(pb.core.oxides))
+    assert melt['feo'] == pytest.approx(np.full(4, MeltComposition.from_dict(standard_comp_lowIron)['feo']))
+
+def test_meltComposition_where_feotAlias_storedAsFeO():
+    melt = MeltComposition.from_dict({'SiO2': 50, 'FeOt': 10})
+    assert melt.oxides == ('sio2', 'feo')
+
+def test_meltComposition_where_speciesWithoutMassListed_throwException():
+    with pytest.raises(KeyError) as exc:
+        MeltComposition.from_dict({'SiO2': 50, 'unkow3n': 10})
+    assert "Sorry, I don't know the mass of" in str(exc.value)
+
+def test_meltComposition_has_noInstanceDict(standard_comp_lowIron):
+    with pytest.raises(AttributeError):
+        MeltComposition.from_dict(standard_comp_lowIron).__dict__
+
+def test_getIronOxide_with_meltComposition_matches_dictInput(standard_comp_lowIron):
+    F, C_new = pb.get_ironOxide(dict(standard_comp_lowIron), -2, 1473.15, 10, buffer='FMQ')
+    F_melt, melt_new = pb.get_ironOxide(MeltComposition.from_dict(standard_comp_lowIron), -2,
+                                        1473.15, 10, buffer='FMQ')
+    assert F_melt == pytest.approx(F)
+    assert {k.lower(): v for k, v in C_new.items()} == pytest.approx(melt_new.to_dict())
+
+def test_getMeltfO2_with_meltComposition_matches_dictInput(standard_comp_lowIron):
+    standard_comp_lowIron['FeO'], standard_comp_lowIron['Fe2O3'] = 7.887, 0.521
+    fO2, _ = pb.get_meltfO2(standard_comp_lowIron, 1473.15, 10)
+    melt_fO2, _ = pb.get_meltfO2(MeltComposition.from_dict(standard_comp_lowIron), 1473.15, 10)
+    assert melt_fO2 == pytest.approx(fO2)
+
+def test_scalarConversions_with_meltComposition_doNot_warnOutsideCalibration(standard_comp_lowIron):
+    melt = MeltComposition.from_dict(standard_comp_lowIron)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', pb.calibration.CalibrationWarning)
+        _, melt_new = pb.get_ironOxide(melt, -2, 1000, 10, buffer='FMQ')
+        pb.get_meltfO2(melt_new, 1000, 10)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+# low and high iron melts, with total iron as FeO, shared by the tests and
+# benchmarks/benchmark.py
+low_iron = {
+            'SiO2' : 44.71,
+            'TiO2' : 0.13,
+            'Al2O3': 1.33,
+            'FeO'  : 8.06,
+            'MnO'  : 0.13,
+            'MgO'  : 38.73,
+            'CaO'  : 3.17,
+            'Na2O' : 0.13,
+            'K2O'  : 0.006,
+            'P2O5' : 0.019
+        }
+
+high_iron = {
+            'SiO2' : 46.72,
+            'TiO2' : 0.47,
+            'Al2O3': 9.99,
+            # 'FeO'  : 20.91,
+            'FeO'  : 21.09,
+            'MnO'  : 0.32,
+            'MgO'  : 10.36,
+            'CaO'  : 7.51,
+            'Na2O' : 2.53,
+            'K2O'  : 0.14,
+            'P2O5' : 0.44
+        } # 20.81, 0.72, 1.2gpa, 1406 celsius, fmq-4.68
+
+@pytest.fixture
+def standard_comp_lowIron():
+    return dict(low_iron)
+
+@pytest.fixture
+def standard_comp_highIron():
+    return dict(high_iron)
+
+@pytest.fixture
+def batch_comp():
+    """The low and high iron melts as a batch of two rows."""
+    return {k: np.array([low_iron[k], high_iron[k]]) for k in low_iron}
@@ -1,5 +1,6 @@
 # test_with_pytest.py
 
+import numpy as np
 import petrobuffer as pb
 import pytest
 
@@ -30,6 +31,13 @@ def test_getAbsolutefO2_where_valueMatchesExpected():
     assert pb.get_absolute_fo2(+3.3479, 'FMQ', 1473.15, 10) == pytest.approx(-4.95224,
                                                                              0.001)
 
+def test_getRelativefO2All_matches_getRelativefO2():
+    fO2, T, P = np.array([-8.0, -10.0, -6.5]), np.array([1200, 1050, 1400]), np.array([1, 1e4, 1e5])
+    result = pb.get_relative_fo2_all(fO2, T, P, celsius=True)
+    for name in result.names:
+        expected = [pb.get_relative_fo2(f, name, t, p, celsius=True) for f, t, p in zip(fO2, T, P)]
+        assert result.column(name) == pytest.approx(expected)
+
 @pytest.mark.parametrize("buffer_cases", [
     'iw', 'fmq', 'cocoo', 'CoCoO', 'MH'])
 def test_getAbsolutefO2_robustTo_BufferNameLowercase(buffer_cases):
@@ -54,37 +62,6 @@ def test_convertBuffer_robustTo_BufferNameLowercase(buffer_cases_start, buffer_c
     except Exception as exc:
         assert False, f"'{buffer_cases_start}' to '{buffer_cases_end}' raised an exception {exc}"
 
-@pytest.fixture
-def standard_comp_lowIron():
-    return {
-            'SiO2' : 44.71,
-            'TiO2' : 0.13,
-            'Al2O3': 1.33,
-            'FeO'  : 8.06,
-            'MnO'  : 0.13,
-            'MgO'  : 38.73,
-            'CaO'  : 3.17,
-            'Na2O' : 0.13,
-            'K2O'  : 0.006,
-            'P2O5' : 0.019
-        }
-
-@pytest.fixture
-def standard_comp_highIron():
-    return {
-            'SiO2' : 46.72,
-            'TiO2' : 0.47,
-            'Al2O3': 9.99,
-            # 'FeO'  : 20.91,
-            'FeO'  : 21.09,
-            'MnO'  : 0.32,
-            'MgO'  : 10.36,
-            'CaO'  : 7.51,
-            'Na2O' : 2.53,
-            'K2O'  : 0.14,
-            'P2O5' : 0.44
-        } # 20.81, 0.72, 1.2gpa, 1406 celsius, fmq-4.68
-
 @pytest.fixture
 def standard_comp_fe2o3_lowIron():
     return {
@@ -159,5 +136,152 @@ def test_getIronOxide_with_highFeOInput_returns_ExpectedNormalisedComposition(st
     assert pb.get_ironOxide(standard_comp_highIron, -2, 1406, pb.core.gpa_to_bar(1.2), 
                     celsius=True, buffer='FMQ')[1] == pytest.approx(standard_comp_fe2o3_highIron, 0.001)
 
+def test_getIronOxide_where_celsiusArrayT_doesNot_modifyT(standard_comp_highIron):
+    T = np.array(1406.0)
+    pb.get_ironOxide(standard_comp_highIron, -2, T, pb.core.gpa_to_bar(1.2), celsius=True,
+                     buffer='FMQ')
+    assert T == 1406.0
+
+@pytest.mark.parametrize("normalised", [True, False])
+def test_getIronOxideBatch_with_mixedIron_matches_rowResults(batch_comp, normalised):
+    T, P = np.array([1200, 1406]), np.array([10, 12000])
+    F, C_new = pb.get_ironOxide_batch(batch_comp, -2, T, P, celsius=True, buffer='FMQ',
+                                      normalised_comp=normalised)
+    for i in range(2):
+        row = {k: v[i] for k, v in batch_comp.items()}
+        f, c = pb.get_ironOxide(row, -2, T[i], P[i], celsius=True, buffer='FMQ',
+                                normalised_comp=normalised)
+        assert F[i] == pytest.approx(f)
+        assert list(C_new) == list(c)
+        assert {k: v[i] for k, v in C_new.items()} == pytest.approx(c)
+
+def test_getIronOxideBatch_with_arrayInput_matches_dictInput(batch_comp):
+    columns = list(batch_comp)
+    wt = np.column_stack([batch_comp[k] for k in columns])
+    F_dict, _ = pb.get_ironOxide_batch(batch_comp, -2, 1473.15, 10, buffer='FMQ')
+    F_array, _ = pb.get_ironOxide_batch(wt, -2, 1473.15, 10, buffer='FMQ', columns=columns)
+    assert F_array == pytest.approx(F_dict)
+
+def test_getIronOxideBatch_where_feoMissing_raiseException(batch_comp):
+    batch_comp.pop('FeO')
+    with pytest.raises(InputError) as exc:
+        pb.get_ironOxide_batch(batch_comp, -2, 1473.15, 10)
+    assert "missing total FeO" in str(exc.value)
+
+def test_getIronOxideBatch_with_returnStatus_matches_defaultResults(batch_comp):
+    F, C_new = pb.get_ironOxide_batch(batch_comp, -2, 1473.15, 10, buffer='FMQ')
+    F_status, C_status, status = pb.get_ironOxide_batch(batch_comp, -2, 1473.15, 10,
+                                                        buffer='FMQ', return_status=True)
+    assert list(status) == [pb.RowStatus.OK]*2
+    assert F_status == pytest.approx(F)
+    assert {k: list(v) for k, v in C_status.items()} == {k: list(v) for k, v in C_new.items()}
+
+def test_getIronOxideBatch_with_returnStatus_where_rowsInvalid_returnNaN(batch_comp):
+    comp = {k: np.repeat(v[:1], 6) for k, v in batch_comp.items()}
+    comp['FeO'][1] = np.nan
+    comp['FeO'][2] = 0.0
+    comp['CaO'][3] = np.nan
+    comp['MnO'][4] = np.nan
+    comp['BaO'] = np.array([0, 0, 0, 0, 0, 0.1])
+    T = np.array([1473.15, 1473.15, 1473.15, 1473.15, 1473.15, np.nan])
+    T[0] = -1.0
+
+    F, C_new, status = pb.get_ironOxide_batch(comp, -2, T, 10, buffer='FMQ',
+                                              return_status=True)
+    assert list(status) == [pb.RowStatus.INVALID_CONDITIONS, pb.RowStatus.MISSING_IRON,
+                            pb.RowStatus.NON_POSITIVE_IRON, pb.RowStatus.MISSING_SPECIES,
+                            pb.RowStatus.MISSING_VALUE, pb.RowStatus.UNKNOWN_OXIDE]
+    assert np.isnan(F).all()
+    assert 'BaO' not in C_new
+    assert np.isnan(C_new['SiO2']).all()
+
+def test_getIronOxideBatch_with_returnStatus_where_someRowsInvalid_keepValidRows(batch_comp):
+    F, C_new = pb.get_ironOxide_batch(batch_comp, -2, 1473.15, 10, buffer='FMQ')
+    comp = {k: np.append(v, v[0]) for k, v in batch_comp.items()}
+    comp['Al2O3'][2] = np.nan
+
+    F_status, C_status, status = pb.get_ironOxide_batch(comp, -2, 1473.15, 10,
+                                                        buffer='FMQ', return_status=True)
+    assert list(status) == [pb.RowStatus.OK, pb.RowStatus.OK, pb.RowStatus.MISSING_SPECIES]
+    assert F_status[:2] == pytest.approx(F)
+    assert np.isnan(F_status[2])
+    assert C_status['Fe2O3'][:2] == pytest.approx(C_new['Fe2O3'])
+
+def test_getIronOxideBatch_with_returnStatus_where_p2o5Missing_flagsHighIronRowsOnly(batch_comp):
+    batch_comp.pop('P2O5')
+    F, _, status = pb.get_ironOxide_batch(batch_comp, -2, 1473.15, 10, buffer='FMQ',
+                                          return_status=True)
+    assert list(status) == [pb.RowStatus.OK, pb.RowStatus.MISSING_SPECIES]
+    assert F[0] == pytest.approx(pb.get_ironOxide_batch(batch_comp, -2, 1473.15, 10,
+                                                        buffer='FMQ',
+                                                        force_model='kc1991')[0][0])
+
+def test_getIronOxideBatch_where_p2o5Missing_and_r2013Rows_raiseException(batch_comp):
+    batch_comp.pop('P2O5')
+    with pytest.raises(InputError) as exc:
+        pb.get_ironOxide_batch(batch_comp, -2, 1473.15, 10)
+    assert "1 rows using the r2013 model" in str(exc.value)
+
+def test_getIronOxideBatch_where_p2o5Missing_and_kc1991RowsOnly_matches_rowResults(batch_comp):
+    batch_comp.pop('P2O5')
+    low_iron = {k: v[:1] for k, v in batch_comp.items()}
+    F, _ = pb.get_ironOxide_batch(low_iron, -2, 1473.15, 10, buffer='FMQ')
+    row = {k: v[0] for k, v in low_iron.items()}
+    assert F[0] == pytest.approx(pb.get_ironOxide(row, -2, 1473.15, 10, buffer='FMQ')[0])
+
+def test_dispatch_with_mixedModels_evaluatesMinorityOnItsRowsOnly():
+    calls = {}
+    def kernel(model):
+        def run(C, T):
+            calls[model] = len(T)
+            return np.full(len(T), 1.0 if model == 'kc1991' else 2.0)
+        return run
+
+    use_kc91 = np.array([True, False, True, True])
+    melt = pb.MeltComposition(np.ones((4, len(pb.core.oxides))))
+    result = pb.conversions._dispatch(use_kc91, {m: kernel(m) for m in ['kc1991', 'r2013']},
+                                      melt, np.arange(4.0))
+    assert list(result) == [1.0, 2.0, 1.0, 1.0]
+    assert calls == {'kc1991': 4, 'r2013': 1}
+
+@pytest.mark.parametrize("buffer", [None, 'FMQ'])
+def test_getMeltfO2Batch_with_mixedIron_matches_rowResults(standard_comp_fe2o3_lowIron,
+                                                          standard_comp_fe2o3_highIron, buffer):
+    comps = [standard_comp_fe2o3_lowIron, standard_comp_fe2o3_highIron]
+    batch = {k: np.array([c[k] for c in comps]) for k in standard_comp_fe2o3_lowIron}
+    T, P = np.array([1473.15, 1679.15]), np.array([10, 12000])
+    fO2, returned_buffer = pb.get_meltfO2_batch(batch, T, P, buffer=buffer)
+    assert returned_buffer == buffer
+    for i, c in enumerate(comps):
+        assert fO2[i] == pytest.approx(pb.get_meltfO2(c, T[i], P[i], buffer=buffer)[0])
+
+def test_getMeltfO2Batch_with_lowFeOInput_returns_ExpectedRatio(standard_comp_fe2o3_lowIron):
+    columns = list(standard_comp_fe2o3_lowIron)
+    wt = np.tile([standard_comp_fe2o3_lowIron[k] for k in columns], (3, 1))
+    fO2, _ = pb.get_meltfO2_batch(wt, 1473.15, 10, buffer='FMQ', columns=columns)
+    assert fO2 == pytest.approx(np.full(3, -2), 0.001)
+
+def test_getMeltfO2Batch_with_returnStatus_where_ironInvalid_returnNaN(standard_comp_fe2o3_lowIron):
+    columns = list(standard_comp_fe2o3_lowIron) + ['UnknownOxide']
+    wt = np.tile([standard_comp_fe2o3_lowIron[k] for k in columns[:-1]] + [0.0], (4, 1))
+    wt[1, columns.index('Fe2O3')] = 0.0
+    wt[2, columns.index('FeO')] = np.nan
+    wt[3, -1] = 1.0
+
+    fO2, buffer, status = pb.get_meltfO2_batch(wt, 1473.15, 10, buffer='FMQ',
+                                               columns=columns, return_status=True)
+    assert buffer == 'FMQ'
+    assert list(status) == [pb.RowStatus.OK, pb.RowStatus.NON_POSITIVE_IRON,
+                            pb.RowStatus.MISSING_IRON, pb.RowStatus.UNKNOWN_OXIDE]
+    assert fO2[0] == pytest.approx(-2, 0.001)
+    assert np.isnan(fO2[1:]).all()
+
+def test_convertBuffer_with_arrayInput_matches_scalarResults():
+    T = np.array([800, 1200, 1473.15])
+    P = np.array([1, 1e4, 2e5])
+    result = pb.convert_buffer(np.array([-2, 0, 1]), 'fmq', 'NNO', T, P)
+    expected = [pb.convert_buffer(f, 'fmq', 'NNO', t, p) for f, t, p in zip([-2, 0, 1], T, P)]
+    assert result == pytest.approx(expected)
+
 def test_getMeltfO2_with_lowFeOInput_returns_ExpectedRatio(standard_comp_fe2o3_lowIron):
     assert pb.get_meltfO2(standard_comp_fe2o3_lowIron, 1473.15, 10, buffer='FMQ')[0] == pytest.approx(-2, 0.001)
\ No newline at end of file
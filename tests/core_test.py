@@ -1,5 +1,6 @@
 # test_with_pytest.py
 
+import numpy as np
 import petrobuffer as pb
 import pytest
 
@@ -83,6 +84,31 @@ def test_molOxtoWtOx_where_speciesWithoutMassListed_throwException():
         pb.core.molOxides_to_wtOxides(test_composition_unknown_species)
     assert "Sorry, I don't know the mass of" in str(exc.value)
 
+def test_wtOxtoMolOxArray_matches_dictConversion(test_composition_wt):
+    columns = list(test_composition_wt)
+    wt = np.array([list(test_composition_wt.values())]*3)
+    expected = pb.core.wtOxides_to_molOxides(test_composition_wt)
+    assert pb.core.wtOxides_to_molOxides_array(wt, columns) == pytest.approx(np.array([list(expected.values())]*3))
+
+def test_wtOxtoMolOxArray_with_outArray_writesInPlace(test_composition_wt):
+    wt = np.array([list(test_composition_wt.values())]*3)
+    out = np.empty_like(wt)
+    result = pb.core.wtOxides_to_molOxides_array(wt, list(test_composition_wt), out=out)
+    assert result is out
+    assert out.sum(axis=1) == pytest.approx(np.ones(3))
+
+def test_molOxtoWtOxArray_convertsCorrectly(test_composition_wt):
+    wt = np.zeros(len(pb.core.oxides))
+    for ele, v in test_composition_wt.items():
+        wt[pb.core.oxideIndex[ele]] = v
+    mol = pb.core.wtOxides_to_molOxides_array(wt)
+    assert pb.core.molOxides_to_wtOxides_array(mol, out=mol) == pytest.approx(wt*100/wt.sum())
+
+def test_molOxtoWtOxArray_where_speciesWithoutMassListed_throwException():
+    with pytest.raises(KeyError) as exc:
+        pb.core.molOxides_to_wtOxides_array(np.ones((2, 2)), ['sio2', 'unkow3n'])
+    assert "Sorry, I don't know the mass of" in str(exc.value)
+
 def test_molOxtoWtOx_where_inputCapitalisation_matchesOutputCapitalisation():
     test_composition_capitalized_species = {            
                                         'sio2' : 0.3931,
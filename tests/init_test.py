@@ -0,0 +1,31 @@
+import json
+import subprocess
+import sys
+
+import petrobuffer as pb
+import pytest
+
+_scalar_script = """
+import json, sys
+import petrobuffer
+from petrobuffer import buffers
+buffers.calcBuffer('FMQ', 1473.15, 1e4)
+print(json.dumps({'numpy': 'numpy' in sys.modules}))
+"""
+
+def _run_scalar_script():
+    result = subprocess.run([sys.executable, '-c', _scalar_script], capture_output=True,
+                            text=True, check=True)
+    return json.loads(result.stdout)
+
+def test_scalarCalcBuffer_doesNot_importNumpy():
+    assert _run_scalar_script()['numpy'] is False
+
+def test_lazyAttributes_resolve_conversionsFunctions():
+    assert pb.get_relative_fo2 is pb.conversions.get_relative_fo2
+    assert pb.calcBuffer is pb.buffers.calcBuffer
+    assert 'get_ironOxide_batch' in dir(pb)
+
+def test_lazyAttributes_when_nameUnknown_raiseAttributeError():
+    with pytest.raises(AttributeError):
+        pb.not_a_function
@@ -0,0 +1,53 @@
+import numpy as np
+import petrobuffer as pb
+import pytest
+
+from petrobuffer.instrument import instrument
+
+def test_instrument_counts_modelChoices_of_batch(batch_comp):
+    with instrument() as record:
+        pb.get_ironOxide_batch(batch_comp, -1, 1473.15, 1e4, buffer='FMQ')
+    assert record.models == {'kc1991': 1, 'r2013': 1}
+
+def test_instrument_counts_modelChoices_of_scalarCalls(batch_comp):
+    with instrument() as record:
+        for i in range(2):
+            pb.get_ironOxide({k: v[i] for k, v in batch_comp.items()}, -1, 1473.15, 1e4)
+    assert record.models == {'kc1991': 1, 'r2013': 1}
+
+def test_instrument_counts_bufferBranches():
+    T = np.array([800, 900, 1000, 1200])
+    with instrument() as record:
+        pb.buffers.calcBuffer('FMQ', T, 1)
+        pb.buffers.calcBuffer('FMQ', 1473.15, 1)
+    assert record.branches == {('FMQ', 0): 1, ('FMQ', 1): 4}
+
+def test_instrument_times_eachStage(batch_comp):
+    with instrument() as record:
+        pb.get_ironOxide_batch(batch_comp, -1, 1473.15, 1e4, buffer='FMQ')
+    assert set(record.times) == {'normalisation', 'mole conversion', 'buffer offset',
+                                 'model evaluation', 'range check', 'recalculation'}
+    assert all(t >= 0 for t in record.times.values())
+    assert 'model evaluation' in record.summary()
+
+def test_instrument_when_off_recordsNothing(batch_comp):
+    with instrument() as record:
+        pass
+    pb.get_ironOxide_batch(batch_comp, -1, 1473.15, 1e4, buffer='FMQ')
+    assert not record.models and not record.times
+
+def test_instrument_when_nested_innerCountsMergedIntoOuterBlock():
+    with instrument() as outer:
+        pb.buffers.calcBuffer('IW', 1473.15, 1)
+        with instrument() as inner:
+            pb.buffers.calcBuffer('IW', 1473.15, 1)
+            assert outer.branches == {('IW', 0): 1}
+    assert outer.branches == {('IW', 0): 2}
+    assert inner.branches == {('IW', 0): 1}
+
+def test_instrument_with_threadedChunks_countsEveryPoint():
+    T = np.full(10000, 1473.15)
+    with instrument() as record:
+        pb.parallel.run_threaded(pb.buffers.calcBuffer_array, 'FMQ', T, 1.0, chunk_size=100,
+                                 workers=4)
+    assert record.branches == {('FMQ', 1): 10000}
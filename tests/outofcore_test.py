@@ -0,0 +1,55 @@
+import numpy as np
+import petrobuffer as pb
+import pytest
+
+from petrobuffer import outofcore
+
+@pytest.fixture
+def conditions(tmp_path):
+    rng = np.random.default_rng(0)
+    T, P = rng.uniform(700, 2000, 1001), rng.uniform(1, 2e5, 1001)
+    np.save(tmp_path / 'T.npy', T)
+    np.save(tmp_path / 'P.npy', P)
+    return T, P
+
+def test_calcBuffer_with_npyPaths_writes_memmapOutput(conditions, tmp_path):
+    T, P = conditions
+    result = outofcore.calcBuffer('MH', tmp_path / 'T.npy', tmp_path / 'P.npy',
+                                  out=tmp_path / 'out.npy', chunk_size=100)
+    assert isinstance(result, np.memmap)
+    assert np.load(tmp_path / 'out.npy') == pytest.approx(pb.buffers.calcBuffer_array('MH', T, P))
+
+def test_convertBuffer_with_scalarInputs_matches_convertBuffer(conditions, tmp_path):
+    T, _ = conditions
+    result = outofcore.convert_buffer(-2, 'FMQ', 'IW', tmp_path / 'T.npy', 10, chunk_size=64)
+    assert result == pytest.approx(pb.convert_buffer(-2, 'FMQ', 'IW', T, 10))
+
+def test_getMeltfO2_with_memmapComposition_matches_batch(tmp_path):
+    columns = ['SiO2', 'TiO2', 'Al2O3', 'Fe2O3', 'FeO', 'MnO', 'MgO', 'CaO', 'Na2O', 'K2O', 'P2O5']
+    comp = [44.71, 0.13, 1.33, 0.521, 7.887, 0.13, 38.73, 3.17, 0.13, 0.006, 0.019]
+    C = np.tile(comp, (250, 1)) * np.linspace(0.9, 1.1, 250)[:, np.newaxis]
+    np.save(tmp_path / 'C.npy', C)
+    result = outofcore.get_meltfO2(tmp_path / 'C.npy', 1473.15, 10, columns,
+                                   out=tmp_path / 'fo2.npy', buffer='FMQ', chunk_size=32)
+    expected, _ = pb.get_meltfO2_batch(C, 1473.15, 10, buffer='FMQ', columns=columns)
+    assert result == pytest.approx(expected)
+
+def test_getIronOxide_with_outComposition_matches_batch(standard_comp_lowIron, tmp_path):
+    columns = ['SiO2', 'TiO2', 'Al2O3', 'FeO', 'MnO', 'MgO', 'CaO', 'Na2O', 'K2O', 'P2O5']
+    C = np.tile([standard_comp_lowIron[k] for k in columns], (100, 1))
+    fO2 = np.linspace(-3, 3, 100)
+    F, C_new, names = outofcore.get_ironOxide(C, fO2, 1473.15, 10, columns,
+                                              out_composition=tmp_path / 'comp.npy',
+                                              buffer='FMQ', chunk_size=7)
+    F_batch, C_batch = pb.get_ironOxide_batch(C, fO2, 1473.15, 10, buffer='FMQ', columns=columns)
+    assert F == pytest.approx(F_batch)
+    assert names == list(C_batch)
+    assert np.load(tmp_path / 'comp.npy') == pytest.approx(np.column_stack(list(C_batch.values())))
+
+def test_getIronOxide_where_outOfRange_warnsOnceForAllChunks(standard_comp_lowIron, tmp_path):
+    columns = ['SiO2', 'TiO2', 'Al2O3', 'FeO', 'MnO', 'MgO', 'CaO', 'Na2O', 'K2O', 'P2O5']
+    C = np.tile([standard_comp_lowIron[k] for k in columns], (100, 1))
+    with pytest.warns(pb.calibration.CalibrationWarning) as record:
+        outofcore.get_ironOxide(C, -1, 1173.15, 10, columns, buffer='FMQ', chunk_size=7)
+    assert len(record) == 1
+    assert record[0].message.summary.counts['kc1991'] == (100, 100)
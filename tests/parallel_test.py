@@ -0,0 +1,56 @@
+import numpy as np
+import petrobuffer as pb
+import pytest
+
+from petrobuffer import parallel
+
+@pytest.fixture
+def mixed_comps():
+    low = [44.71, 0.13, 1.33, 0.521, 7.887, 0.13, 38.73, 3.17, 0.13, 0.006, 0.019]
+    high = [46.711, 0.4699, 9.9882, 4.4724, 17.0621, 0.3199, 10.3581, 7.5086, 2.5295, 0.14, 0.4399]
+    columns = ['SiO2', 'TiO2', 'Al2O3', 'Fe2O3', 'FeO', 'MnO', 'MgO', 'CaO', 'Na2O', 'K2O', 'P2O5']
+    C = np.array([low, high]*50) * np.linspace(0.95, 1.05, 100)[:, np.newaxis]
+    return C, columns
+
+def test_getMeltfO2Parallel_matches_serialResult(mixed_comps):
+    C, columns = mixed_comps
+    T = np.linspace(1300, 1700, 100)
+    fO2, buffer = parallel.get_meltfO2_parallel(C, T, 1000, buffer='FMQ', columns=columns,
+                                                workers=2, chunk_size=17)
+    expected, _ = pb.get_meltfO2_batch(C, T, 1000, buffer='FMQ', columns=columns)
+    assert buffer == 'FMQ'
+    assert np.array_equal(fO2, expected)
+
+def test_getIronOxideParallel_matches_serialResult(mixed_comps):
+    C, columns = mixed_comps
+    fO2 = np.linspace(-3, 2, 100)
+    F, C_new = parallel.get_ironOxide_parallel(C, fO2, 1300, 1000, celsius=True, buffer='NNO',
+                                               columns=columns, workers=2, chunk_size=30)
+    F_serial, C_serial = pb.get_ironOxide_batch(C, fO2, 1300, 1000, celsius=True, buffer='NNO',
+                                                columns=columns)
+    assert np.array_equal(F, F_serial)
+    assert list(C_new) == list(C_serial)
+    assert all(np.array_equal(C_new[k], C_serial[k]) for k in C_serial)
+
+def test_runThreaded_with_frost1991_matches_unchunkedResult():
+    T = np.linspace(900, 1800, 1001)
+    out = np.empty_like(T)
+    result = parallel.run_threaded(pb.buffers.frost1991, 'FMQ_highT', T, 1000, out=out,
+                                   chunk_size=64, workers=4)
+    assert result is out
+    assert np.array_equal(out, pb.buffers.frost1991('FMQ_highT', T, 1000))
+
+def test_runThreaded_with_compositionDict_matches_unchunkedResult():
+    n = 500
+    C = {'sio2': np.full(n, 0.5771), 'tio2': np.full(n, 0.0102), 'al2o3': np.full(n, 0.0262),
+         'fe2o3': np.linspace(0.01, 0.05, n), 'feo': np.full(n, 0.1285), 'mno': np.full(n, 0.0023),
+         'mgo': np.full(n, 0.0785), 'cao': np.full(n, 0.1155), 'na2o': np.full(n, 0.0183),
+         'k2o': np.full(n, 0.00173), 'p2o5': np.full(n, 0.0016)}
+    T = np.linspace(1300, 1700, n)
+    result = parallel.run_threaded(pb.ferric.iron_to_fo2_r13, C, T, 1, chunk_size=33)
+    assert np.array_equal(result, pb.ferric.iron_to_fo2_r13(C, T, 1))
+
+def test_runThreaded_where_rowCountsDiffer_throwException():
+    with pytest.raises(pb.core.InputError) as exc:
+        parallel.run_threaded(pb.buffers.frost1991, 'IW', np.ones(3), np.ones(4))
+    assert "different numbers of rows" in str(exc.value)
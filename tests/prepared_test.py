@@ -0,0 +1,62 @@
+import numpy as np
+import petrobuffer as pb
+import pytest
+
+from petrobuffer.core import InputError
+from petrobuffer.prepared import PreparedMelt, trajectory
+
+def test_preparedMelt_ironOxide_matches_getIronOxideBatch(batch_comp):
+    T, P, fO2 = np.array([1473.15, 1679.15]), np.array([10, 12000]), np.array([-2, -1])
+    expected, _ = pb.get_ironOxide_batch(batch_comp, fO2, T, P, buffer='FMQ')
+    melt = PreparedMelt(batch_comp)
+    assert melt.ironOxide(fO2, T, P, buffer='fmq') == pytest.approx(expected)
+
+def test_preparedMelt_with_singleMelt_broadcastsOverConditions(batch_comp):
+    comp = {k: v[0] for k, v in batch_comp.items()}
+    T, fO2 = np.linspace(1100, 1300, 5), np.linspace(-12, -6, 5)
+    melt = PreparedMelt(comp)
+    F = melt.ironOxide(fO2, T, 1e3, celsius=True)
+    assert F.shape == (5,)
+    assert F == pytest.approx([pb.get_ironOxide(comp.copy(), f, t, 1e3, celsius=True)[0]
+                               for f, t in zip(fO2, T)])
+
+def test_preparedMelt_meltfO2_inverts_ironOxide(batch_comp):
+    T, P = np.array([1473.15, 1679.15]), np.array([10, 12000])
+    F, comp = pb.get_ironOxide_batch(batch_comp, -1.5, T, P, buffer='FMQ')
+    expected, _ = pb.get_meltfO2_batch(comp, T, P, buffer='FMQ')
+    assert PreparedMelt(comp).meltfO2(T, P, buffer='FMQ') == pytest.approx(expected)
+
+def test_preparedMelt_meltfO2_when_fe2o3Missing_throwException(batch_comp):
+    with pytest.raises(InputError) as exc:
+        PreparedMelt(batch_comp).meltfO2(1473.15, 10)
+    assert "missing an iron species" in str(exc.value)
+
+def test_preparedMelt_when_modelUnrecognised_throwException(batch_comp):
+    with pytest.raises(InputError):
+        PreparedMelt(batch_comp, force_model='kc1992')
+
+def test_trajectory_with_fixedComposition_matches_getIronOxideBatch(batch_comp):
+    comp = {k: v[0] for k, v in batch_comp.items()}
+    T, P = np.linspace(1500, 1300, 6), np.linspace(2e4, 1, 6)
+    F, path = trajectory(comp, -1, T, P, buffer='FMQ')
+    F_batch, C_batch = pb.get_ironOxide_batch({k: np.full(6, v) for k, v in comp.items()},
+                                              -1, T, P, buffer='FMQ')
+    assert F == pytest.approx(F_batch)
+    assert path.wt.shape == (6, len(pb.core.oxides))
+    for sp, values in C_batch.items():
+        assert path.to_dict()[sp.lower()] == pytest.approx(values)
+
+@pytest.mark.parametrize("normalised", [True, False])
+def test_trajectory_with_changingComposition_matches_getIronOxideBatch(batch_comp, normalised):
+    steps = {k: np.repeat(v, [3, 2]) for k, v in batch_comp.items()}
+    T, P = np.linspace(1680, 1400, 5), np.linspace(1.2e4, 1, 5)
+    F, path = trajectory(steps, -2, T, P, buffer='FMQ', normalised_comp=normalised)
+    F_batch, C_batch = pb.get_ironOxide_batch(steps, -2, T, P, buffer='FMQ',
+                                              normalised_comp=normalised)
+    assert F == pytest.approx(F_batch)
+    for sp, values in C_batch.items():
+        assert path.to_dict()[sp.lower()] == pytest.approx(values)
+
+def test_trajectory_when_stepsMismatched_throwException(batch_comp):
+    with pytest.raises(InputError):
+        trajectory(batch_comp, -2, np.linspace(1400, 1300, 3), 1)
@@ -0,0 +1,55 @@
+import numpy as np
+import petrobuffer as pb
+import pytest
+
+from petrobuffer.core import InputError
+from petrobuffer.schema import CompositionSchema
+
+columns = ['SiO2', 'TiO2', 'Al2O3', 'FeO', 'Fe2O3', 'MnO', 'MgO', 'CaO', 'Na2O', 'K2O', 'P2O5']
+wt = np.array([[46.711, 0.4699, 9.9882, 19.0, 2.3, 0.3199, 10.3581, 7.5086, 2.5295, 0.14, 0.4399],
+               [44.71, 0.13, 1.33, 7.5, 0.9, 0.13, 38.73, 3.17, 0.13, 0.006, 0.0]])
+
+def test_schema_where_aliasesAndCase_matchOxides():
+    schema = CompositionSchema(['sio2', 'FeO(t)', 'MGO'])
+    assert schema.oxide_columns == ('sio2', 'FeO(t)', 'MGO')
+    assert list(schema.index) == [pb.core.oxideIndex[sp] for sp in ('sio2', 'feo', 'mgo')]
+    assert schema.iron == 'FeO'
+
+@pytest.mark.parametrize("names, iron", [
+    (['SiO2', 'FeOt'], 'FeO'), (['SiO2', 'Fe2O3'], 'Fe2O3'),
+    (['FeO', 'Fe2O3'], 'FeO+Fe2O3'), (['SiO2', 'MgO'], None)])
+def test_schema_iron_matchesColumns(names, iron):
+    assert CompositionSchema(names).iron == iron
+
+def test_schema_models_where_p2o5Missing_onlyKC91():
+    schema = CompositionSchema([c for c in columns if c != 'P2O5'])
+    assert schema.ironOxide_models == ('kc1991',)
+    assert schema.meltfO2_models == ('kc1991',)
+    assert CompositionSchema(columns).meltfO2_models == ('kc1991', 'r2013')
+    assert CompositionSchema([c for c in columns if c != 'Fe2O3']).meltfO2_models == ()
+
+def test_schema_where_oxideRepeated_raiseException():
+    with pytest.raises(InputError):
+        CompositionSchema(['FeO', 'FeOt'])
+
+def test_schema_where_unknownColumn_recordedAndRejected():
+    schema = CompositionSchema(columns + ['Unobtanium'])
+    assert schema.unknown_columns == ('Unobtanium',)
+    rows = np.hstack([wt, [[0.0], [1.0]]])
+    assert list(schema.unknown_rows(rows)) == [False, True]
+    with pytest.raises(KeyError):
+        schema.require_known()
+
+def test_schema_composition_where_wrongWidth_raiseException():
+    with pytest.raises(InputError):
+        CompositionSchema(columns).composition(wt[:, :-1])
+
+def test_batch_where_schemaColumns_matchListColumns():
+    schema = CompositionSchema(columns)
+    fO2, _ = pb.get_meltfO2_batch(wt, 1473.15, 10, buffer='FMQ', columns=schema)
+    expected, _ = pb.get_meltfO2_batch(wt, 1473.15, 10, buffer='FMQ', columns=columns)
+    assert np.array_equal(fO2, expected)
+    F, C = pb.get_ironOxide_batch(wt[:, [0, 1, 2, 3, 5, 6, 7, 8, 9, 10]], -1, 1473.15, 10,
+                                  buffer='FMQ', columns=CompositionSchema(
+                                      [c for c in columns if c != 'Fe2O3']))
+    assert np.all(np.isfinite(F))
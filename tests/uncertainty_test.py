@@ -0,0 +1,108 @@
+import numpy as np
+import petrobuffer as pb
+import pytest
+
+from petrobuffer import uncertainty
+from petrobuffer.calibration import CalibrationWarning
+from petrobuffer.core import InputError
+
+columns = ['SiO2', 'TiO2', 'Al2O3', 'FeO', 'Fe2O3', 'MnO', 'MgO', 'CaO', 'Na2O', 'K2O', 'P2O5']
+wt = np.array([[46.711, 0.4699, 9.9882, 19.0, 2.3, 0.3199, 10.3581, 7.5086, 2.5295, 0.14, 0.4399],
+               [44.71, 0.13, 1.33, 7.5, 0.9, 0.13, 38.73, 3.17, 0.13, 0.006, 0.019],
+               [49.1, 1.2, 15.2, 8.1, 1.4, 0.17, 8.3, 11.2, 2.6, 0.3, 0.2]])
+
+def test_meltfO2Uncertainty_where_noErrors_matchesBatch():
+    result = uncertainty.get_meltfO2_uncertainty(wt, 1473.15, 1000, draws=5, columns=columns,
+                                                 buffer='FMQ')
+    expected, _ = pb.get_meltfO2_batch(wt, 1473.15, 1000, buffer='FMQ', columns=columns)
+    assert result.mean == pytest.approx(expected)
+    assert np.all(result.std == 0)
+    assert np.allclose(result.percentiles, expected[:, np.newaxis])
+    assert list(result.valid) == [5, 5, 5]
+
+def test_ironOxideUncertainty_where_noErrors_matchesBatch():
+    result = uncertainty.get_ironOxide_uncertainty(wt[:, [0, 1, 2, 3, 5, 6, 7, 8, 9, 10]], 0,
+                                                   1473.15, 1000, draws=3, buffer='FMQ',
+                                                   columns=[c for c in columns if c != 'Fe2O3'])
+    F, _ = pb.get_ironOxide_batch(wt[:, [0, 1, 2, 3, 5, 6, 7, 8, 9, 10]], 0, 1473.15, 1000,
+                                  buffer='FMQ', columns=[c for c in columns if c != 'Fe2O3'])
+    assert result.mean == pytest.approx(2*F/(2*F + 1))
+
+def test_meltfO2Uncertainty_where_sameSeed_reproducible_acrossChunksAndWorkers():
+    # 4000 draws make blocks of 4 samples, so the 9 samples span 3 blocks
+    samples = np.tile(wt, (3, 1))
+    kwargs = dict(sigma_wt=0.5, sigma_T=20, sigma_P=200, model_sigma=0.2, draws=4000,
+                  columns=columns, seed=42)
+    first = uncertainty.get_meltfO2_uncertainty(samples, 1473.15, 1000, **kwargs)
+    chunked = uncertainty.get_meltfO2_uncertainty(samples, 1473.15, 1000, chunk_size=4000,
+                                                  **kwargs)
+    workers = uncertainty.get_meltfO2_uncertainty(samples, 1473.15, 1000, workers=2, **kwargs)
+    for other in (chunked, workers):
+        assert np.array_equal(first.mean, other.mean)
+        assert np.array_equal(first.percentiles, other.percentiles)
+    assert not np.array_equal(first.mean[:3], first.mean[3:6])
+    assert first.seed == 42
+
+def test_meltfO2Uncertainty_where_seedNone_returnsReusableEntropy():
+    first = uncertainty.get_meltfO2_uncertainty(wt, 1473.15, 1000, sigma_T=20, draws=20,
+                                                columns=columns)
+    again = uncertainty.get_meltfO2_uncertainty(wt, 1473.15, 1000, sigma_T=20, draws=20,
+                                                columns=columns, seed=first.seed)
+    assert np.array_equal(first.std, again.std)
+
+def test_meltfO2Uncertainty_where_onlyModelError_stdMatchesModelSigma():
+    result = uncertainty.get_meltfO2_uncertainty(wt, 1473.15, 1000, model_sigma={'kc1991': 0.1},
+                                                 draws=4000, columns=columns, seed=1)
+    # row 0 uses r2013, which has no error here
+    assert result.std[0] == 0
+    assert result.std[1:] == pytest.approx(0.1/(0.196*np.log(10)), rel=0.05)
+
+def test_meltfO2Uncertainty_where_oxideErrorsByName_onlyPerturbThoseOxides():
+    sigma = dict.fromkeys(columns, 0.0)
+    sigma['Fe2O3'] = 0.2
+    by_name = uncertainty.get_meltfO2_uncertainty(wt, 1473.15, 1000, sigma_wt={'Fe2O3': 0.2},
+                                                  draws=30, columns=columns, seed=3)
+    by_column = uncertainty.get_meltfO2_uncertainty(wt, 1473.15, 1000,
+                                                    sigma_wt=[sigma[c] for c in columns],
+                                                    draws=30, columns=columns, seed=3)
+    assert np.array_equal(by_name.mean, by_column.mean)
+    assert np.all(by_name.std > 0)
+
+def test_reduce_matchesNumpy_ignoringNonFinite():
+    values = np.random.default_rng(0).normal(size=(4, 101))
+    values[1, :10] = np.nan
+    values[2, 5] = np.inf
+    values[3] = np.nan
+    mean, std, percentiles, n = uncertainty._reduce(values, (2.5, 50, 97.5))
+    finite = np.where(np.isfinite(values), values, np.nan)
+    assert list(n) == [101, 91, 100, 0]
+    assert mean[:3] == pytest.approx(np.nanmean(finite[:3], axis=1))
+    assert std[:3] == pytest.approx(np.nanstd(finite[:3], axis=1, ddof=1))
+    assert percentiles[:3] == pytest.approx(np.nanpercentile(finite[:3], (2.5, 50, 97.5),
+                                                             axis=1).T)
+    assert np.all(np.isnan(percentiles[3]))
+
+def test_meltfO2Uncertainty_where_outsideCalibration_warnsOnce():
+    with pytest.warns(CalibrationWarning) as record:
+        uncertainty.get_meltfO2_uncertainty(wt, 1000, 1000, sigma_T=10, draws=10,
+                                            columns=columns)
+    assert len(record) == 1
+
+def test_meltfO2Uncertainty_where_unknownModelSigma_raiseException():
+    with pytest.raises(InputError):
+        uncertainty.get_meltfO2_uncertainty(wt, 1473.15, 1000, model_sigma={'b2018': 0.1},
+                                            columns=columns)
+
+def test_meltfO2Uncertainty_where_oxidesClipped_countsClippedDraws():
+    result = uncertainty.get_meltfO2_uncertainty(wt, 1473.15, 1000, sigma_wt={'K2O': 0.5},
+                                                 draws=400, columns=columns, seed=5)
+    assert np.all(result.clipped > 100) and np.all(result.clipped < 300)
+    assert list(result.valid) == [400, 400, 400]
+    unclipped = uncertainty.get_meltfO2_uncertainty(wt, 1473.15, 1000, sigma_T=10, draws=40,
+                                                    columns=columns, seed=5)
+    assert list(unclipped.clipped) == [0, 0, 0]
+
+def test_ironOxideUncertainty_where_bufferUnrecognised_raiseException():
+    with pytest.raises(InputError):
+        uncertainty.get_ironOxide_uncertainty(wt, 0, 1473.15, 1000, buffer='BIF',
+                                              columns=columns)